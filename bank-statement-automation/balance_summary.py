@@ -0,0 +1,116 @@
+"""
+Average daily balance and tiered interest accrual for bank statement transactions.
+Expands transactions into a daily end-of-day balance series and accrues interest per day,
+using array operations so multi-year account histories stay fast.
+"""
+
+from datetime import datetime
+import argparse
+import time
+
+import numpy as np
+
+# Tiered credit interest on positive balances: (balance from, annual rate).
+# Each rate applies only to the part of the balance inside its tier.
+INTEREST_TIERS = [
+    (0, 0.0000),
+    (100_000, 0.0025),
+    (500_000, 0.0050),
+    (2_000_000, 0.0075),
+]
+
+# Debit interest charged on negative (overdrawn) balances
+OVERDRAFT_RATE = 0.0850
+
+# CHF money-market convention: actual days over a 360-day year
+DAY_COUNT = 360
+
+def daily_balances(txn_days, txn_balance_cents, opening_cents, start_day, num_days):
+    """End-of-day balance in cents for each calendar day of the period.
+
+    ``txn_days`` are the transactions' days (datetime64[D], in statement order) and
+    ``txn_balance_cents`` their running balances. Each calendar day takes the balance
+    after its last transaction, days without transactions carry the previous balance
+    forward, and days before the first transaction keep the opening balance.
+    """
+
+    calendar = np.datetime64(start_day, 'D') + np.arange(num_days)
+    last_txn = np.searchsorted(txn_days, calendar, side='right') - 1
+    if len(txn_balance_cents):
+        balances = np.asarray(txn_balance_cents, dtype=np.int64)[np.maximum(last_txn, 0)]
+    else:
+        balances = np.zeros(num_days, dtype=np.int64)
+    return calendar, np.where(last_txn >= 0, balances, opening_cents)
+
+def accrue_interest(balance_cents, tiers=INTEREST_TIERS, overdraft_rate=OVERDRAFT_RATE, day_count=DAY_COUNT):
+    """Daily interest per tier (days x tiers, credit) and daily overdraft interest (debit), in cents."""
+
+    lowers = np.array([tier[0] for tier in tiers], dtype=np.float64) * 100
+    uppers = np.append(lowers[1:], np.inf)
+    rates = np.array([tier[1] for tier in tiers], dtype=np.float64)
+
+    balance = balance_cents.astype(np.float64)[:, None]
+    tier_amounts = np.clip(balance - lowers, 0, uppers - lowers)
+    credit = tier_amounts * rates / day_count
+
+    debit = np.minimum(balance_cents, 0).astype(np.float64) * overdraft_rate / day_count
+    return credit, debit
+
+def compute_balance_summary(txn_days, txn_balance_cents, opening_balance, start_day, num_days,
+                            tiers=INTEREST_TIERS, overdraft_rate=OVERDRAFT_RATE):
+    """Average daily balance, min/max balance and interest accrued over the period."""
+
+    opening_cents = int(round(opening_balance * 100))
+    calendar, balances = daily_balances(txn_days, txn_balance_cents, opening_cents, start_day, num_days)
+    credit, debit = accrue_interest(balances, tiers, overdraft_rate)
+
+    min_day = int(np.argmin(balances))
+    max_day = int(np.argmax(balances))
+
+    return {
+        "days": num_days,
+        "average_daily_balance": balances.mean() / 100,
+        "min_balance": balances[min_day] / 100,
+        "min_date": calendar[min_day].item(),
+        "max_balance": balances[max_day] / 100,
+        "max_date": calendar[max_day].item(),
+        "tier_interest": [
+            (lower, rate, total / 100) for (lower, rate), total in zip(tiers, credit.sum(axis=0))
+        ],
+        "interest_credit": round(credit.sum() / 100, 2),
+        "interest_debit": round(abs(debit.sum()) / 100, 2),
+        "overdraft_rate": overdraft_rate,
+        "daily_dates": calendar,
+        "daily_balance_cents": balances,
+        "daily_interest_cents": credit.sum(axis=1) + debit,
+    }
+
+def _synthetic_history(years, per_day, seed):
+    """Random sorted transaction days and running balances for a multi-year history."""
+
+    rng = np.random.default_rng(seed)
+    num_days = int(years * 365)
+    counts = rng.integers(0, 2 * per_day + 1, size=num_days)
+    txn_days = np.datetime64('2015-01-01', 'D') + np.repeat(np.arange(num_days), counts)
+    amounts = rng.integers(-2_000_000, 2_000_001, size=len(txn_days))
+    return txn_days, 50_000_000 + np.cumsum(amounts), num_days
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=float, default=10, help="length of the synthetic history")
+    parser.add_argument("--per-day", type=int, default=500, help="average transactions per day")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    txn_days, balance_cents, num_days = _synthetic_history(args.years, args.per_day, args.seed)
+
+    start_time = time.perf_counter()
+    summary = compute_balance_summary(txn_days, balance_cents, 500_000.00, datetime(2015, 1, 1), num_days)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Transactions: {len(txn_days):,} over {num_days:,} days")
+    print(f"Average daily balance: {summary['average_daily_balance']:,.2f}")
+    print(f"Min balance: {summary['min_balance']:,.2f} on {summary['min_date']:%d.%m.%Y}")
+    print(f"Max balance: {summary['max_balance']:,.2f} on {summary['max_date']:%d.%m.%Y}")
+    print(f"Interest accrued: {summary['interest_credit']:,.2f} credit, {summary['interest_debit']:,.2f} debit")
+    print(f"Computed in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,317 @@
+"""
+Match bank statement lines to journal transactions by amount, date and reference.
+Both sides are reduced to NumPy columns (integer cents, day numbers, numeric references),
+bucketed by signed amount and joined in date order within each bucket, nearest date first;
+what is left over gets a bounded many-to-one search before being reported as exceptions.
+"""
+
+from datetime import datetime
+import argparse
+import csv
+import re
+import time
+
+import numpy as np
+
+# Days a bank line may be booked before or after its journal
+DATE_TOLERANCE = 3
+
+# Largest number of lines combined into one many-to-one match, and candidates searched per line:
+# pairs are a linear hash lookup, larger groups only search the nearest MAX_CANDIDATES
+MAX_GROUP = 3
+MAX_CANDIDATES = 10
+MAX_PAIR_CANDIDATES = 256
+
+# Trailing reference number in a description ("INV-2024-1234", "Order #1234"); 0 means none
+REFERENCE = re.compile(r"(\d{4,})\D*$")
+
+# Day numbers are proleptic Gregorian ordinals; NumPy day counts start at 1970-01-01
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+def _columns(dates, descriptions, amounts):
+    """Build matcher columns from parallel date labels, descriptions and signed amounts."""
+
+    days = {}
+    references = {}
+    day = []
+    ref = []
+
+    for date, description in zip(dates, descriptions):
+        value = days.get(date)
+        if value is None:
+            value = days[date] = datetime.strptime(date, "%d.%m.%Y").toordinal()
+        day.append(value)
+
+        value = references.get(description)
+        if value is None:
+            match = REFERENCE.search(description)
+            value = references[description] = int(match.group(1)) if match else 0
+        ref.append(value)
+
+    return {
+        "day": np.array(day, dtype=np.int64),
+        "amount_cents": np.rint(np.array(amounts, dtype=np.float64) * 100).astype(np.int64),
+        "ref": np.array(ref, dtype=np.int64),
+    }
+
+def bank_columns(rows):
+    """Columns for statement rows from ``generate_bank_statement_pdf`` (signed ``amount``)."""
+
+    return _columns([row["date"] for row in rows], [row["description"] for row in rows],
+                    [row["amount"] for row in rows])
+
+def ledger_columns(transactions):
+    """Columns for journal transactions from ``generate_journal_entries_excel``.
+
+    Amounts are signed from the bank's point of view: receipts positive, payments negative.
+    """
+
+    return _columns([txn["date"] for txn in transactions], [txn["description"] for txn in transactions],
+                    [txn["amount"] if txn["is_incoming"] else -txn["amount"] for txn in transactions])
+
+def _join(bank_keys, ledger_keys):
+    """Pair bank and ledger rows with equal keys, first come first served within each key.
+
+    Keys are lists of equal-length integer arrays, the first being the amount bucket. Both
+    sides are sorted together by key, so within a key the k-th bank row takes the k-th
+    ledger row. Returns ``(bank_positions, ledger_positions)`` into the key arrays.
+    """
+
+    nb = len(bank_keys[0])
+    keys = [np.concatenate([b, l]) for b, l in zip(bank_keys, ledger_keys)]
+    side = np.r_[np.zeros(nb, dtype=np.int8), np.ones(len(keys[0]) - nb, dtype=np.int8)]
+
+    order = np.lexsort([side] + keys[::-1])
+    if not len(order):
+        return order, order
+
+    sorted_keys = [key[order] for key in keys]
+    new_key = np.zeros(len(order), dtype=bool)
+    new_key[0] = True
+    for key in sorted_keys:
+        new_key[1:] |= key[1:] != key[:-1]
+
+    group = np.cumsum(new_key) - 1
+    group_start = np.flatnonzero(new_key)
+    is_bank = side[order] == 0
+    bank_count = np.bincount(group[is_bank], minlength=len(group_start))
+    ledger_count = np.bincount(group[~is_bank], minlength=len(group_start))
+
+    positions = np.flatnonzero(is_bank)
+    bank_group = group[positions]
+    rank = positions - group_start[bank_group]
+    matched = rank < ledger_count[bank_group]
+    partner = group_start[bank_group] + bank_count[bank_group] + rank
+
+    return order[positions[matched]], order[partner[matched]] - nb
+
+def _subset_sum(window, target, max_group, max_candidates, amounts):
+    """First 2..``max_group`` rows of ``window`` whose amounts sum to ``target``, smallest groups first.
+
+    The innermost level is a two-sum over a hash of amounts, so pairs cost one pass over
+    ``window`` and larger groups of ``k`` search ``max_candidates ** (k - 1)`` combinations.
+    """
+
+    def search(start, remaining, k):
+        if k == 2:
+            seen = {}
+            for row in window[start:]:
+                other = seen.get(remaining - amounts[row])
+                if other is not None:
+                    return (other, row)
+                seen.setdefault(amounts[row], row)
+            return None
+        for i in range(start, len(window) - k + 1):
+            found = search(i + 1, remaining - amounts[window[i]], k - 1)
+            if found:
+                return (window[i],) + found
+        return None
+
+    found = search(0, target, 2)
+    window = window[:max_candidates]
+    for k in range(3, max_group + 1):
+        if found:
+            break
+        found = search(0, target, k)
+    return found
+
+def _match_groups(one, many, one_rows, many_rows, date_tolerance, max_group, max_candidates):
+    """Match single rows on ``one`` to 2..``max_group`` rows on ``many`` summing to the same amount.
+
+    Candidates are unmatched rows of the same sign and a smaller amount, taken day by
+    day outwards from the row's date within ``date_tolerance`` (``MAX_PAIR_CANDIDATES``
+    at most, the nearest ``max_candidates`` for groups of three or more). Returns
+    ``(one_row, many_rows)`` tuples.
+    """
+
+    groups = []
+    if max_group < 2 or not len(one_rows) or not len(many_rows):
+        return groups
+
+    amounts = dict(zip(many_rows.tolist(), many["amount_cents"][many_rows].tolist()))
+    pools = {}
+    for row, day in zip(many_rows.tolist(), many["day"][many_rows].tolist()):
+        pools.setdefault((amounts[row] > 0, day), []).append(row)
+    offsets = [0] + [sign * days for days in range(1, date_tolerance + 1) for sign in (-1, 1)]
+
+    for row, day, target in zip(one_rows.tolist(), one["day"][one_rows].tolist(),
+                                one["amount_cents"][one_rows].tolist()):
+        if not target:
+            continue
+        window = []
+        for offset in offsets:
+            for candidate in pools.get((target > 0, day + offset), ()):
+                if abs(amounts[candidate]) < abs(target):
+                    window.append(candidate)
+                    if len(window) == MAX_PAIR_CANDIDATES:
+                        break
+            if len(window) == MAX_PAIR_CANDIDATES:
+                break
+
+        found = _subset_sum(window, target, max_group, max_candidates, amounts)
+        if found:
+            groups.append((row, found))
+            for candidate in found:
+                pools[(target > 0, int(many["day"][candidate]))].remove(candidate)
+
+    return groups
+
+def match_transactions(bank, ledger, date_tolerance=DATE_TOLERANCE, match_reference=False,
+                       max_group=MAX_GROUP, max_candidates=MAX_CANDIDATES):
+    """Match bank lines to ledger lines given as ``bank_columns()``/``ledger_columns()`` columns.
+
+    One-to-one matches come first: rows are bucketed by signed amount in cents and joined
+    on equal dates, then on dates one day apart, and so on up to ``date_tolerance``, so
+    each line takes the nearest-dated counterpart. With ``match_reference`` the
+    references must agree as well (both missing counts as agreeing). Remaining bank lines
+    are then matched to several ledger lines and remaining ledger lines to several bank
+    lines (``max_group`` at most, without reference checks).
+
+    Returns ``pairs`` (``bank``, ``ledger`` and ``day_offset`` arrays, the offset being
+    bank date minus ledger date in days), ``groups``
+    (``(bank_rows, ledger_rows)`` tuples) and the ``unmatched_bank`` and
+    ``unmatched_ledger`` row indices.
+    """
+
+    bank_open = np.arange(len(bank["day"]))
+    ledger_open = np.arange(len(ledger["day"]))
+    pairs = []
+
+    for offset in [0] + [sign * days for days in range(1, date_tolerance + 1) for sign in (1, -1)]:
+        if not len(bank_open) or not len(ledger_open):
+            break
+        bank_keys = [bank["amount_cents"][bank_open], bank["day"][bank_open]]
+        ledger_keys = [ledger["amount_cents"][ledger_open], ledger["day"][ledger_open] + offset]
+        if match_reference:
+            bank_keys.append(bank["ref"][bank_open])
+            ledger_keys.append(ledger["ref"][ledger_open])
+
+        b, l = _join(bank_keys, ledger_keys)
+        pairs.append((bank_open[b], ledger_open[l], np.full(len(b), offset, dtype=np.int64)))
+        bank_open = np.delete(bank_open, b)
+        ledger_open = np.delete(ledger_open, l)
+
+    def remaining(rows, matched):
+        return np.setdiff1d(rows, np.array(matched, dtype=np.int64))
+
+    groups = [((bank_row,), ledger_rows) for bank_row, ledger_rows in _match_groups(
+        bank, ledger, bank_open, ledger_open, date_tolerance, max_group, max_candidates)]
+    bank_open = remaining(bank_open, [rows[0] for rows, _ in groups])
+    ledger_open = remaining(ledger_open, [row for _, rows in groups for row in rows])
+
+    split_bank = [(bank_rows, (ledger_row,)) for ledger_row, bank_rows in _match_groups(
+        ledger, bank, ledger_open, bank_open, date_tolerance, max_group, max_candidates)]
+    bank_open = remaining(bank_open, [row for rows, _ in split_bank for row in rows])
+    ledger_open = remaining(ledger_open, [rows[0] for _, rows in split_bank])
+    groups += split_bank
+
+    bank_rows, ledger_rows, offsets = (np.concatenate(parts) for parts in zip(*pairs)) if pairs else (
+        np.zeros(0, dtype=np.int64),) * 3
+
+    return {
+        "pairs": {"bank": bank_rows, "ledger": ledger_rows, "day_offset": offsets},
+        "groups": groups,
+        "unmatched_bank": bank_open,
+        "unmatched_ledger": ledger_open,
+    }
+
+def write_exceptions(path, result, bank, ledger):
+    """Write unmatched bank and ledger lines to a CSV exceptions report."""
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Side", "Row", "Date", "Amount", "Reference"])
+        for side, columns, rows in (("bank", bank, result["unmatched_bank"]),
+                                    ("ledger", ledger, result["unmatched_ledger"])):
+            for row in rows.tolist():
+                writer.writerow([side, row, datetime.fromordinal(int(columns["day"][row])).strftime("%d.%m.%Y"),
+                                 f"{columns['amount_cents'][row] / 100:.2f}", int(columns["ref"][row]) or ""])
+
+def synthetic_ledger(bank, seed=None, lag_share=0.3, missing_share=0.01, extra_share=0.01, split_share=0.02):
+    """Book a bank month into a mock ledger with realistic differences, in shuffled order.
+
+    Some lines are booked up to two days off, some never booked, some booked as two
+    partial lines, and some ledger lines have no bank counterpart.
+    """
+
+    rng = np.random.default_rng(seed)
+    n = len(bank["day"])
+
+    keep = rng.random(n) >= missing_share
+    day = bank["day"] + np.where(rng.random(n) < lag_share, rng.choice([-1, 1, 2], size=n), 0)
+    amount = bank["amount_cents"].copy()
+    ref = bank["ref"].copy()
+
+    split = keep & (rng.random(n) < split_share) & (np.abs(amount) >= 2)
+    part = (amount[split] * rng.uniform(0.2, 0.8, size=int(split.sum()))).astype(np.int64)
+    amount[split] -= part
+
+    extra = int(n * extra_share)
+    ledger = {
+        "day": np.concatenate([day[keep], day[split], rng.choice(bank["day"], size=extra)]),
+        "amount_cents": np.concatenate([amount[keep], part, rng.integers(-500000, 500000, size=extra) * 100 + 1]),
+        "ref": np.concatenate([ref[keep], ref[split], np.zeros(extra, dtype=np.int64)]),
+    }
+
+    # Ledgers are not booked in bank order, so the matcher gets no pre-sorted input
+    order = rng.permutation(len(ledger["day"]))
+    return {name: values[order] for name, values in ledger.items()}
+
+if __name__ == "__main__":
+    from generate_bank_statement_pdf import generate_transactions_columnar
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic bank lines to match")
+    parser.add_argument("--days", type=int, default=365, help="days the synthetic lines are spread over")
+    parser.add_argument("--tolerance", type=int, default=DATE_TOLERANCE, help="date tolerance in days")
+    parser.add_argument("--reference", action="store_true", help="require matching references")
+    parser.add_argument("--exceptions", metavar="FILE", help="write unmatched lines to a CSV file")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    # About 70% of days carry transactions once weekends are mostly skipped
+    per_day = -(-args.rows * 10 // (7 * args.days))
+    columns, _ = generate_transactions_columnar(args.seed, days=args.days, per_day=(per_day, per_day))
+    templates = columns["template"][:args.rows]
+    bank = {
+        "day": columns["date"][:args.rows].astype(np.int64) + EPOCH_ORDINAL,
+        "amount_cents": columns["amount_cents"][:args.rows],
+        "ref": np.where(np.isin(templates, [0, 1]), columns["ref"][:args.rows], 0).astype(np.int64),
+    }
+    ledger = synthetic_ledger(bank, args.seed)
+
+    start_time = time.perf_counter()
+    result = match_transactions(bank, ledger, args.tolerance, args.reference)
+    elapsed = time.perf_counter() - start_time
+
+    pairs = result["pairs"]
+    print(f"Bank lines: {len(bank['day']):,}  Ledger lines: {len(ledger['day']):,}")
+    print(f"One-to-one matches: {len(pairs['bank']):,} "
+          f"({np.count_nonzero(pairs['day_offset']):,} with a date difference)")
+    print(f"Many-to-one matches: {len(result['groups']):,}")
+    print(f"Unmatched: {len(result['unmatched_bank']):,} bank, {len(result['unmatched_ledger']):,} ledger")
+    print(f"Matched in {elapsed:.2f}s ({(len(bank['day']) + len(ledger['day'])) / elapsed:,.0f} lines/sec)")
+
+    if args.exceptions:
+        write_exceptions(args.exceptions, result, bank, ledger)
+        print(f"Exceptions written to {args.exceptions}")
@@ -0,0 +1,56 @@
+"""
+Benchmark the openpyxl write-only journal export against the direct SpreadsheetML writer.
+Each run happens in a fresh process so peak memory is measured per writer, and prints
+lines/sec and peak RSS for both along with the speedup.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import tempfile
+import time
+
+from generate_journal_entries_excel import (
+    create_excel_streaming,
+    create_excel_write_only,
+    synthetic_journal_transactions,
+)
+from peak_memory import peak_rss_mb
+
+ROW_COUNTS = [10_000, 100_000]
+
+WRITERS = {
+    "openpyxl": create_excel_write_only,
+    "direct": create_excel_streaming,
+}
+
+def _run_writer(writer, rows, seed, output_file):
+    """Write one workbook in this (fresh) process; returns lines, seconds and peak RSS."""
+
+    start_time = time.perf_counter()
+    stats = WRITERS[writer](synthetic_journal_transactions(rows, seed), output_file, verbose=False)
+    return stats["lines"], time.perf_counter() - start_time, peak_rss_mb()
+
+def run_benchmark(row_counts=ROW_COUNTS, seed=42):
+    """Compare both writers for each transaction count (two lines per transaction)."""
+
+    print(f"{'Lines':>10} {'Writer':>9} {'Time (s)':>9} {'Lines/sec':>11} {'Peak RSS (MB)':>14} {'Size (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            results = {}
+            for writer in WRITERS:
+                output_file = os.path.join(tmp_dir, f"{writer}.xlsx")
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    lines, elapsed, peak_rss = pool.submit(_run_writer, writer, rows, seed, output_file).result()
+                results[writer] = elapsed
+                print(f"{lines:>10,} {writer:>9} {elapsed:>9.2f} {lines / elapsed:>11,.0f} {'n/a' if peak_rss is None else f'{peak_rss:,.1f}':>14} "
+                      f"{os.path.getsize(output_file) / 1e6:>10,.1f}")
+            print(f"{'':>10} {'speedup':>9} {results['openpyxl'] / results['direct']:>8.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("rows", nargs="*", type=int, default=ROW_COUNTS, help="transaction counts to benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic transactions")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.seed)
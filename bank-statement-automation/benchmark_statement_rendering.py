@@ -0,0 +1,103 @@
+"""
+Benchmark the platypus Table renderer against the canvas fast path for bank statements.
+Renders the same synthetic transactions with both and prints time, rows/sec and speedup.
+With --output-modes it instead compares file vs in-memory output and page compression.
+"""
+
+import argparse
+import io
+import math
+import os
+import tempfile
+import time
+
+import generate_bank_statement_pdf
+from generate_bank_statement_pdf import (
+    WORKING_DAYS,
+    create_pdf,
+    create_pdf_canvas,
+    generate_transactions_columnar,
+    iter_columnar_rows,
+    shared_resources,
+    statement_resources,
+)
+
+ROW_COUNTS = [1_000, 10_000, 50_000]
+
+def _time_renderer(render, path, transactions, opening_balance, resources):
+    """Render once and return elapsed seconds."""
+
+    start_time = time.perf_counter()
+    render(path, transactions=transactions, opening_balance=opening_balance, resources=resources, verbose=False)
+    return time.perf_counter() - start_time
+
+def run_benchmark(row_counts=ROW_COUNTS, seed=42):
+    """Compare both renderers for each row count."""
+
+    resources = statement_resources()
+
+    print(f"{'Rows':>10} {'Platypus (s)':>13} {'Canvas (s)':>11} {'Canvas rows/sec':>16} {'Speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            per_day = math.ceil(rows / WORKING_DAYS)
+            columns, opening_balance = generate_transactions_columnar(seed, per_day=(per_day, per_day))
+            transactions = list(iter_columnar_rows(columns))[:rows]
+
+            platypus_time = _time_renderer(create_pdf, os.path.join(tmp_dir, "platypus.pdf"),
+                                           transactions, opening_balance, resources)
+            canvas_time = _time_renderer(create_pdf_canvas, os.path.join(tmp_dir, "canvas.pdf"),
+                                         transactions, opening_balance, resources)
+
+            print(f"{rows:>10,} {platypus_time:>13.2f} {canvas_time:>11.2f} "
+                  f"{rows / canvas_time:>16,.0f} {platypus_time / canvas_time:>7.1f}x")
+
+def run_output_benchmark(rows, seed=42):
+    """Compare output size and write time for file vs stream output, with and without compression."""
+
+    per_day = math.ceil(rows / WORKING_DAYS)
+    columns, opening_balance = generate_transactions_columnar(seed, per_day=(per_day, per_day))
+    transactions = list(iter_columnar_rows(columns))[:rows]
+
+    print(f"{rows:,} rows")
+    print(f"{'Renderer':>9} {'Target':>7} {'Compression':>12} {'Resources':>10} {'Size (KB)':>10} "
+          f"{'Setup (s)':>10} {'Render (s)':>11}")
+    page_compression = generate_bank_statement_pdf.PAGE_COMPRESSION
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for render in (create_pdf, create_pdf_canvas):
+                # Baseline: uncompressed, styles rebuilt per statement, written to a file
+                cases = [("file", 0, "fresh"), ("file", 1, "fresh"), ("file", 1, "shared"), ("memory", 1, "shared")]
+                for target, compression, shared in cases:
+                    generate_bank_statement_pdf.PAGE_COMPRESSION = compression
+                    output = os.path.join(tmp_dir, "statement.pdf") if target == "file" else io.BytesIO()
+
+                    # Building the resources is timed on its own; shared ones are built only once
+                    start_time = time.perf_counter()
+                    resources = statement_resources() if shared == "fresh" else shared_resources()
+                    setup_time = time.perf_counter() - start_time
+
+                    start_time = time.perf_counter()
+                    render(output, transactions=transactions, opening_balance=opening_balance,
+                           resources=resources, verbose=False)
+                    elapsed = time.perf_counter() - start_time
+
+                    size = os.path.getsize(output) if target == "file" else len(output.getvalue())
+                    name = "platypus" if render is create_pdf else "canvas"
+                    print(f"{name:>9} {target:>7} {'on' if compression else 'off':>12} {shared:>10} "
+                          f"{size / 1024:>10,.0f} {setup_time:>10.4f} {elapsed:>11.2f}")
+    finally:
+        generate_bank_statement_pdf.PAGE_COMPRESSION = page_compression
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("rows", nargs="*", type=int, default=ROW_COUNTS, help="row counts to benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic transactions")
+    parser.add_argument("--output-modes", action="store_true",
+                        help="compare file/stream output and page compression instead of renderers")
+    args = parser.parse_args()
+
+    if args.output_modes:
+        for rows in args.rows:
+            run_output_benchmark(rows, args.seed)
+    else:
+        run_benchmark(args.rows, args.seed)
@@ -0,0 +1,139 @@
+"""
+FX rate lookup and month-end revaluation for multi-currency bank statements.
+Rates come from a local dated CSV and are looked up for whole transaction arrays at once
+with a sorted-array search, so millions of rows are revalued in a single pass.
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+# Dated FX rates: date, currency, units of the reporting currency per 1 unit of currency
+FX_RATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fx_rates_december_2024.csv")
+REPORTING_CURRENCY = "CHF"
+
+# Rate keys pack (currency index, day number) into one sortable integer
+_DAY_BITS = 32
+
+def load_fx_rates(path=FX_RATES_FILE):
+    """Load the dated rate table into sorted key/rate arrays for vectorized lookups."""
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    currencies = sorted({row["currency"] for row in rows})
+    currency_index = {code: i for i, code in enumerate(currencies)}
+
+    codes = np.array([currency_index[row["currency"]] for row in rows], dtype=np.int64)
+    days = np.array([row["date"] for row in rows], dtype="datetime64[D]").astype(np.int64)
+    rates = np.array([float(row["rate"]) for row in rows], dtype=np.float64)
+
+    keys = (codes << _DAY_BITS) + days
+    order = np.argsort(keys, kind="stable")
+
+    return {"currencies": currencies, "keys": keys[order], "rates": rates[order]}
+
+def lookup_rates(fx_rates, currency_codes, currency, days, reporting_currency=REPORTING_CURRENCY):
+    """Rate for every transaction: the latest rate on or before its day for its currency.
+
+    ``currency`` holds indices into ``currency_codes`` and ``days`` are datetime64[D]
+    values. The reporting currency always converts at 1.
+    """
+
+    rate_index = {code: i for i, code in enumerate(fx_rates["currencies"])}
+    missing = [code for code in currency_codes if code != reporting_currency and code not in rate_index]
+    if missing:
+        raise ValueError(f"No FX rates for {', '.join(missing)} in the rate table")
+
+    table_index = np.array([rate_index.get(code, -1) for code in currency_codes], dtype=np.int64)[currency]
+    is_reporting = table_index < 0
+
+    query = (table_index << _DAY_BITS) + np.asarray(days, dtype="datetime64[D]").astype(np.int64)
+    pos = np.searchsorted(fx_rates["keys"], query, side="right") - 1
+    found = (pos >= 0) & ((fx_rates["keys"][np.maximum(pos, 0)] >> _DAY_BITS) == table_index)
+
+    if not (found | is_reporting).all():
+        first = int(np.argmin(found | is_reporting))
+        raise ValueError(f"No {currency_codes[currency[first]]} rate on or before {days[first]}")
+
+    return np.where(is_reporting, 1.0, fx_rates["rates"][np.maximum(pos, 0)])
+
+def revalue(fx_rates, currency_codes, currency, days, amount_cents, reporting_currency=REPORTING_CURRENCY):
+    """Convert transaction amounts (integer cents) into reporting-currency cents."""
+
+    rates = lookup_rates(fx_rates, currency_codes, currency, days, reporting_currency)
+    return np.rint(amount_cents * rates).astype(np.int64)
+
+def revaluation_summary(fx_rates, currency_codes, currency, days, amount_cents, opening_balances,
+                        start_date, end_date, reporting_currency=REPORTING_CURRENCY):
+    """Per-currency balances in reporting currency and the month-end unrealised FX result.
+
+    Opening balances are valued at the last rate before ``start_date`` and each
+    transaction at its own day's rate; the difference between that booked value and
+    the closing balance valued at the ``end_date`` rate is the FX gain (or loss).
+    """
+
+    n = len(currency_codes)
+    index = np.arange(n)
+
+    opening_day = np.datetime64((start_date - timedelta(days=1)).date(), "D")
+    closing_day = np.datetime64(end_date.date(), "D")
+    opening_rates = lookup_rates(fx_rates, currency_codes, index, np.full(n, opening_day), reporting_currency)
+    closing_rates = lookup_rates(fx_rates, currency_codes, index, np.full(n, closing_day), reporting_currency)
+
+    opening_cents = np.array([round(opening_balances.get(code, 0) * 100) for code in currency_codes], dtype=np.int64)
+    movement_cents = np.bincount(currency, weights=amount_cents, minlength=n)
+    booked_movement = np.bincount(
+        currency, weights=revalue(fx_rates, currency_codes, currency, days, amount_cents, reporting_currency),
+        minlength=n
+    )
+
+    closing_cents = opening_cents + movement_cents
+    booked_cents = opening_cents * opening_rates + booked_movement
+    closing_value_cents = closing_cents * closing_rates
+
+    sections = []
+    for i, code in enumerate(currency_codes):
+        sections.append({
+            "currency": code,
+            "opening_balance": opening_cents[i] / 100,
+            "closing_balance": closing_cents[i] / 100,
+            "closing_rate": float(closing_rates[i]),
+            "reporting_value": round(closing_value_cents[i] / 100, 2),
+            "fx_gain": round((closing_value_cents[i] - booked_cents[i]) / 100, 2),
+        })
+
+    return {
+        "reporting_currency": reporting_currency,
+        "sections": sections,
+        "reporting_total": round(sum(section["reporting_value"] for section in sections), 2),
+        "fx_gain_total": round(sum(section["fx_gain"] for section in sections), 2),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000, help="synthetic transactions to revalue")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    fx_rates = load_fx_rates()
+    currency_codes = [REPORTING_CURRENCY] + fx_rates["currencies"]
+
+    rng = np.random.default_rng(args.seed)
+    currency = rng.integers(0, len(currency_codes), size=args.rows)
+    days = np.datetime64("2024-12-01") + np.sort(rng.integers(0, 31, size=args.rows))
+    amount_cents = rng.integers(-5_000_000, 5_000_000, size=args.rows)
+
+    start_time = time.perf_counter()
+    summary = revaluation_summary(fx_rates, currency_codes, currency, days, amount_cents, {},
+                                  datetime(2024, 12, 1), datetime(2024, 12, 31))
+    elapsed = time.perf_counter() - start_time
+
+    for section in summary["sections"]:
+        print(f"{section['currency']}: closing {section['closing_balance']:,.2f} = "
+              f"{summary['reporting_currency']} {section['reporting_value']:,.2f}, FX {section['fx_gain']:+,.2f}")
+    print(f"Revalued {args.rows:,} transactions in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/sec)")
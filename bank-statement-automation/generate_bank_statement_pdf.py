@@ -7,14 +7,37 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Frame, KeepTogether
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import io
+import itertools
+import math
+import os
 import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+from pypdf import PdfWriter
+from pypdf.generic import NameObject
+
+from balance_summary import compute_balance_summary, DAY_COUNT
+from fx_revaluation import load_fx_rates, revaluation_summary
+import output_sinks
+from peak_memory import print_peak_rss
 
 # Output file
 OUTPUT_FILE = "bank_statement_december_2024.pdf"
 
+# Flate-compress page content streams; set explicitly so a site-wide reportlab config cannot turn it off
+PAGE_COMPRESSION = 1
+
 # Mock bank details
 BANK_NAME = "Global Commerce Bank"
 BANK_ADDRESS = "123 Financial District, Zurich, Switzerland"
@@ -23,132 +46,303 @@ ACCOUNT_HOLDER = "TechFlow Industries GmbH"
 ACCOUNT_HOLDER_ADDRESS = "456 Innovation Park, Basel, Switzerland"
 CURRENCY = "CHF"
 
-# Generate mock transactions
-def generate_transactions():
-    """Generate a list of mock transactions for December 2024."""
+DEFAULT_ACCOUNT = {
+    "account_number": ACCOUNT_NUMBER,
+    "account_holder": ACCOUNT_HOLDER,
+    "address": ACCOUNT_HOLDER_ADDRESS,
+    "currency": CURRENCY,
+}
 
-    # Transaction templates with descriptions and typical amounts
-    incoming_templates = [
-        ("Payment received - INV-2024-{}", 5000, 50000),
-        ("Customer payment - Order #{}", 1000, 15000),
-        ("Intercompany transfer from TechFlow UK", 10000, 100000),
-        ("Intercompany transfer from TechFlow DE", 15000, 80000),
-        ("Refund - Vendor credit note", 500, 3000),
-        ("Interest income", 50, 500),
-        ("FX Gain adjustment", 100, 2000),
-    ]
+# Statement period
+START_DATE = datetime(2024, 12, 1)
+PERIOD_DAYS = 31
 
-    outgoing_templates = [
-        ("Supplier payment - {} Ltd", -2000, -30000),
-        ("Payroll transfer - December", -50000, -150000),
-        ("Bank charges - Monthly fee", -25, -100),
-        ("SWIFT transfer fee", -15, -50),
-        ("Intercompany payment to TechFlow US", -20000, -80000),
-        ("Rent payment - Q4", -5000, -15000),
-        ("Insurance premium", -1000, -5000),
-        ("Utility payment", -500, -2000),
-        ("Tax payment - VAT", -10000, -50000),
-        ("Professional services - Audit fee", -3000, -15000),
-    ]
+# Weekdays in the period; the synthetic generators keep every one of them, so high-volume runs
+# draw ceil(rows / WORKING_DAYS) transactions per day to be sure of at least ``rows``
+WORKING_DAYS = 22
+OPENING_BALANCE = 245678.50
 
-    transactions = []
-    start_date = datetime(2024, 12, 1)
+# Multi-currency accounts: opening balance per currency and each currency's share of activity
+OPENING_BALANCES = {"CHF": 245678.50, "EUR": 84250.00, "USD": 126400.00, "GBP": 38900.00}
+CURRENCY_WEIGHTS = [0.55, 0.2, 0.15, 0.1]
 
-    # Opening balance
-    opening_balance = 245678.50
-    running_balance = opening_balance
+# Transaction templates with descriptions and typical amounts
+INCOMING_TEMPLATES = [
+    ("Payment received - INV-2024-{}", 5000, 50000),
+    ("Customer payment - Order #{}", 1000, 15000),
+    ("Intercompany transfer from TechFlow UK", 10000, 100000),
+    ("Intercompany transfer from TechFlow DE", 15000, 80000),
+    ("Refund - Vendor credit note", 500, 3000),
+    ("Interest income", 50, 500),
+    ("FX Gain adjustment", 100, 2000),
+]
 
-    # Generate ~40 transactions spread across December
-    for day in range(1, 32):
-        if day > 31:
-            break
+# Random FX adjustment lines, left out where a proper FX revaluation is computed instead
+FX_ADJUSTMENT_TEMPLATE = "FX Gain adjustment"
+
+OUTGOING_TEMPLATES = [
+    ("Supplier payment - {} Ltd", -2000, -30000),
+    ("Payroll transfer - December", -50000, -150000),
+    ("Bank charges - Monthly fee", -25, -100),
+    ("SWIFT transfer fee", -15, -50),
+    ("Intercompany payment to TechFlow US", -20000, -80000),
+    ("Rent payment - Q4", -5000, -15000),
+    ("Insurance premium", -1000, -5000),
+    ("Utility payment", -500, -2000),
+    ("Tax payment - VAT", -10000, -50000),
+    ("Professional services - Audit fee", -3000, -15000),
+]
+
+SUPPLIER_NAMES = ["Nordic Supply", "Alpine Tech", "Central Euro", "Pacific Trade", "Atlantic Corp"]
 
+# Transaction table layout (fixed column widths and row height)
+COL_WIDTHS = [22*mm, 85*mm, 30*mm, 35*mm]
+ROW_HEIGHT = 20
+LINE_LEADING = 12
+CELL_PADDING = 6
+DESCRIPTION_WIDTH = COL_WIDTHS[1] - 2*CELL_PADDING
+TABLE_HEADER = ["Date", "Description", "Amount", "Balance"]
+
+# Columns of statement rows written to output sinks
+EXPORT_HEADER = TABLE_HEADER + ["Currency"]
+
+# Page footer: "Page X of Y" and the balance carried forward, drawn below the frame
+FOOTER_Y = 8*mm
+FOOTER_FONT = ('Helvetica', 7)
+PAGE_COUNT_FORM = "statement_page_count"
+# Drawn in the page-count form of parallel parts until the joined document's total is filled in
+PAGE_COUNT_PLACEHOLDER = "@@@@"
+
+# Generate mock transactions
+def iter_transactions(opening_balance=OPENING_BALANCE, start_date=START_DATE, days=31, per_day=(0, 3),
+                      currency=CURRENCY):
+    """Yield mock transactions one at a time, carrying the running balance."""
+
+    running_balance = opening_balance
+
+    for day in range(1, days + 1):
         current_date = start_date + timedelta(days=day-1)
 
         # Skip weekends for most transactions
         if current_date.weekday() >= 5 and random.random() > 0.2:
             continue
 
+        date_str = current_date.strftime("%d.%m.%Y")
+
         # 1-3 transactions per day
-        num_transactions = random.randint(0, 3)
+        num_transactions = random.randint(*per_day)
 
         for _ in range(num_transactions):
             # 60% incoming, 40% outgoing
             if random.random() < 0.4:
-                template, min_amt, max_amt = random.choice(incoming_templates)
+                template, min_amt, max_amt = random.choice(INCOMING_TEMPLATES)
                 amount = round(random.uniform(min_amt, max_amt), 2)
                 if "{}" in template:
                     description = template.format(random.randint(1000, 9999))
                 else:
                     description = template
             else:
-                template, min_amt, max_amt = random.choice(outgoing_templates)
+                template, min_amt, max_amt = random.choice(OUTGOING_TEMPLATES)
                 amount = round(random.uniform(min_amt, max_amt), 2)
                 if "{}" in template:
-                    companies = ["Nordic Supply", "Alpine Tech", "Central Euro", "Pacific Trade", "Atlantic Corp"]
-                    description = template.format(random.choice(companies))
+                    description = template.format(random.choice(SUPPLIER_NAMES))
                 else:
                     description = template
 
             running_balance += amount
 
-            transactions.append({
-                "date": current_date.strftime("%d.%m.%Y"),
+            yield {
+                "date": date_str,
                 "description": description,
                 "amount": amount,
-                "balance": round(running_balance, 2)
-            })
+                "balance": round(running_balance, 2),
+                "currency": currency
+            }
 
-    return transactions, opening_balance
+def generate_transactions():
+    """Generate a list of mock transactions for December 2024."""
 
-def create_pdf():
-    """Create the bank statement PDF."""
+    # Generate ~40 transactions spread across December
+    transactions = list(iter_transactions(OPENING_BALANCE))
 
-    doc = SimpleDocTemplate(
-        OUTPUT_FILE,
-        pagesize=A4,
-        rightMargin=15*mm,
-        leftMargin=15*mm,
-        topMargin=15*mm,
-        bottomMargin=15*mm
-    )
+    return transactions, OPENING_BALANCE
+
+def generate_transactions_columnar(seed=None, opening_balance=OPENING_BALANCE, start_date=START_DATE,
+                                   days=31, per_day=(0, 3), fx_adjustments=True):
+    """Generate mock transactions as NumPy columns in one vectorized pass.
+
+    Same template semantics as ``iter_transactions()`` (60/40 incoming/outgoing
+    split, weekends mostly skipped, ``per_day`` transactions per day), but amounts,
+    template indices and references are drawn in bulk and balances are a cumulative
+    sum over integer cents. Returns ``(columns, opening_balance)`` where ``columns``
+    maps column names to equal-length arrays; ``seed`` makes the month reproducible.
+    ``fx_adjustments=False`` leaves out the random FX gain adjustment lines.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Day schedule: weekend days survive with 20% probability
+    day_dates = np.datetime64(start_date.date(), 'D') + np.arange(days)
+    weekend = ((day_dates.astype('int64') + 3) % 7) >= 5  # 1970-01-01 was a Thursday
+    keep = ~weekend | (rng.random(days) <= 0.2)
+    counts = rng.integers(per_day[0], per_day[1] + 1, size=days) * keep
+    dates = np.repeat(day_dates, counts)
+    n = len(dates)
+
+    # Template indices: incoming templates first, then outgoing ones
+    num_incoming = len(INCOMING_TEMPLATES)
+    incoming_ids = np.array([i for i, t in enumerate(INCOMING_TEMPLATES)
+                             if fx_adjustments or t[0] != FX_ADJUSTMENT_TEMPLATE])
+    incoming = rng.random(n) < 0.4
+    template = np.where(
+        incoming,
+        incoming_ids[rng.integers(0, len(incoming_ids), size=n)],
+        num_incoming + rng.integers(0, len(OUTGOING_TEMPLATES), size=n)
+    ).astype(np.int16)
+
+    templates = INCOMING_TEMPLATES + OUTGOING_TEMPLATES
+    min_amounts = np.array([t[1] for t in templates], dtype=np.float64)
+    max_amounts = np.array([t[2] for t in templates], dtype=np.float64)
+    low = min_amounts[template]
+    amount_cents = np.rint((low + (max_amounts[template] - low) * rng.random(n)) * 100).astype(np.int64)
+
+    # Reference number for "{}" templates, or supplier index for supplier payments
+    ref = rng.integers(1000, 10000, size=n).astype(np.int16)
+    supplier = np.array(["Ltd" in t[0] for t in templates])[template]
+    ref[supplier] = rng.integers(0, len(SUPPLIER_NAMES), size=int(supplier.sum()))
+
+    opening_cents = int(round(opening_balance * 100))
+    columns = {
+        "date": dates,
+        "template": template,
+        "ref": ref,
+        "amount_cents": amount_cents,
+        "balance_cents": opening_cents + np.cumsum(amount_cents),
+    }
+
+    return columns, opening_balance
+
+def generate_multicurrency_columnar(seed=None, opening_balances=OPENING_BALANCES, start_date=START_DATE,
+                                    days=31, per_day=(0, 3), weights=CURRENCY_WEIGHTS):
+    """Generate a multi-currency month as NumPy columns.
+
+    Transactions come from ``generate_transactions_columnar()``, without the random FX
+    adjustments since the statement revalues each currency, and are assigned a
+    currency (an index into ``list(opening_balances)``) drawn with ``weights``.
+    Balances run per currency: a stable sort groups each currency's transactions in
+    date order and one cumulative sum is rebased at every group start.
+    """
+
+    columns, _ = generate_transactions_columnar(seed, 0, start_date, days, per_day, fx_adjustments=False)
+    rng = np.random.default_rng(None if seed is None else (seed, 1))
+
+    currency_codes = list(opening_balances)
+    n = len(columns["amount_cents"])
+    currency = rng.choice(len(currency_codes), size=n, p=weights).astype(np.int8)
+
+    order = np.argsort(currency, kind="stable")
+    sorted_currency = currency[order]
+    running = np.cumsum(columns["amount_cents"][order])
+    group_start = np.r_[True, sorted_currency[1:] != sorted_currency[:-1]] if n else np.zeros(0, dtype=bool)
+    start_offset = (running - columns["amount_cents"][order])[group_start]
+    running -= np.repeat(start_offset, np.diff(np.r_[np.flatnonzero(group_start), n]))
+
+    opening_cents = np.array([round(balance * 100) for balance in opening_balances.values()], dtype=np.int64)
+    balance_cents = np.empty(n, dtype=np.int64)
+    balance_cents[order] = opening_cents[sorted_currency] + running
+
+    columns["currency"] = currency
+    columns["balance_cents"] = balance_cents
+
+    return columns, opening_balances
+
+def _columnar_description(template, ref):
+    """Description text for a columnar transaction's template index and reference."""
+
+    description = (INCOMING_TEMPLATES + OUTGOING_TEMPLATES)[template][0]
+    if "{}" in description:
+        description = description.format(SUPPLIER_NAMES[ref] if "Ltd" in description else ref)
+    return description
+
+def iter_columnar_rows(columns, currency_codes=(CURRENCY,)):
+    """Yield columnar transactions as the row dicts ``create_pdf()`` works with.
+
+    Columns without a ``currency`` index are all in the first of ``currency_codes``.
+    """
+
+    date_labels = {}
+    currency = columns.get("currency")
+    currency = itertools.repeat(0) if currency is None else currency.tolist()
+
+    for date, template, ref, amount_cents, balance_cents, code in zip(
+            columns["date"].tolist(), columns["template"].tolist(), columns["ref"].tolist(),
+            columns["amount_cents"].tolist(), columns["balance_cents"].tolist(), currency):
+        label = date_labels.get(date)
+        if label is None:
+            label = date_labels[date] = date.strftime("%d.%m.%Y")
+
+        yield {
+            "date": label,
+            "description": _columnar_description(template, ref),
+            "amount": amount_cents / 100,
+            "balance": balance_cents / 100,
+            "currency": currency_codes[code]
+        }
+
+def _export_values(txn):
+    """Row tuple for ``EXPORT_HEADER`` from a statement row dict."""
+
+    return (txn["date"], txn["description"], txn["amount"], txn["balance"], txn["currency"])
+
+def _statement_styles():
+    """Build the paragraph styles shared by the statement layouts."""
 
     styles = getSampleStyleSheet()
 
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        alignment=TA_CENTER,
-        spaceAfter=10
-    )
+    return {
+        # Custom styles
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            alignment=TA_CENTER,
+            spaceAfter=10
+        ),
+        "header": ParagraphStyle(
+            'Header',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=TA_LEFT
+        ),
+        "address": ParagraphStyle('addr', alignment=TA_CENTER, fontSize=9),
+        "statement_title": ParagraphStyle('stitle', fontSize=14, alignment=TA_CENTER),
+        "footer": ParagraphStyle('footer', fontSize=8, alignment=TA_CENTER),
+    }
 
-    header_style = ParagraphStyle(
-        'Header',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=TA_LEFT
-    )
+def _header_elements(styles, opening_balance, account=DEFAULT_ACCOUNT):
+    """Build the bank header, account details and opening balance flowables.
+
+    Multi-currency statements pass ``opening_balance=None`` and show one opening
+    balance per currency section instead.
+    """
 
     elements = []
 
     # Bank header
-    elements.append(Paragraph(BANK_NAME, title_style))
-    elements.append(Paragraph(BANK_ADDRESS, ParagraphStyle('addr', alignment=TA_CENTER, fontSize=9)))
+    elements.append(Paragraph(BANK_NAME, styles["title"]))
+    elements.append(Paragraph(BANK_ADDRESS, styles["address"]))
     elements.append(Spacer(1, 10*mm))
 
     # Statement title
-    elements.append(Paragraph("<b>Account Statement - December 2024</b>",
-                             ParagraphStyle('stitle', fontSize=14, alignment=TA_CENTER)))
+    elements.append(Paragraph("<b>Account Statement - December 2024</b>", styles["statement_title"]))
     elements.append(Spacer(1, 8*mm))
 
     # Account details
     account_info = [
-        ["Account Holder:", ACCOUNT_HOLDER],
-        ["Address:", ACCOUNT_HOLDER_ADDRESS],
-        ["Account Number:", ACCOUNT_NUMBER],
-        ["Currency:", CURRENCY],
+        ["Account Holder:", account["account_holder"]],
+        ["Address:", account["address"]],
+        ["Account Number:", account["account_number"]],
+        ["Currency:", account["currency"]],
         ["Statement Period:", "01.12.2024 - 31.12.2024"],
     ]
 
@@ -161,37 +355,530 @@ def create_pdf():
     elements.append(account_table)
     elements.append(Spacer(1, 8*mm))
 
-    # Generate transactions
-    transactions, opening_balance = generate_transactions()
-
     # Opening balance row
-    elements.append(Paragraph(f"<b>Opening Balance: {CURRENCY} {opening_balance:,.2f}</b>", header_style))
-    elements.append(Spacer(1, 3*mm))
+    if opening_balance is not None:
+        elements.append(Paragraph(f"<b>Opening Balance: {account['currency']} {opening_balance:,.2f}</b>", styles["header"]))
+        elements.append(Spacer(1, 3*mm))
+
+    return elements
+
+def _footer_element(styles):
+    """Build the closing disclaimer paragraph."""
+
+    footer_text = """
+    <i>This statement is generated automatically. Please review all transactions and report any
+    discrepancies within 30 days. For questions, contact customer service at +41 44 123 4567.</i>
+    """
+    return Paragraph(footer_text, styles["footer"])
+
+def _summary_from_rows(transactions, opening_balance, period=(START_DATE, PERIOD_DAYS)):
+    """Balance and interest summary for transactions in the row-dict shape.
+
+    ``period`` is the (first day, number of days) the summary covers; with None it
+    runs from the first to the last transaction date, as for parsed statements.
+    """
+
+    date_values = {}
+    txn_days = np.array(
+        [date_values.setdefault(txn['date'], np.datetime64(datetime.strptime(txn['date'], "%d.%m.%Y").date(), 'D'))
+         for txn in transactions],
+        dtype='datetime64[D]'
+    )
+    balance_cents = np.array([round(txn['balance'] * 100) for txn in transactions], dtype=np.int64)
+    if period is None:
+        period = (txn_days[0], int((txn_days[-1] - txn_days[0]).astype(int)) + 1) if len(txn_days) else \
+            (START_DATE, PERIOD_DAYS)
+    return compute_balance_summary(txn_days, balance_cents, opening_balance, *period)
+
+def _balance_summary_elements(styles, summary, currency):
+    """Build the average daily balance and interest accrual block."""
+
+    summary_info = [
+        ["Average Daily Balance:", f"{currency} {summary['average_daily_balance']:,.2f}"],
+        ["Minimum Balance:", f"{currency} {summary['min_balance']:,.2f} ({summary['min_date']:%d.%m.%Y})"],
+        ["Maximum Balance:", f"{currency} {summary['max_balance']:,.2f} ({summary['max_date']:%d.%m.%Y})"],
+        ["Days in Period:", f"{summary['days']} (ACT/{DAY_COUNT})"],
+        ["Credit Interest Accrued:", f"{currency} {summary['interest_credit']:,.2f}"],
+        [f"Overdraft Interest ({summary['overdraft_rate']:.2%} p.a.):", f"{currency} {summary['interest_debit']:,.2f}"],
+    ]
+
+    summary_table = Table(summary_info, colWidths=[60*mm, 105*mm])
+    summary_table.setStyle(TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ]))
+
+    tiers = summary["tier_interest"]
+    tier_data = [["Balance Tier", "Rate p.a.", "Interest Accrued"]]
+    for i, (lower, rate, accrued) in enumerate(tiers):
+        if i + 1 < len(tiers):
+            label = f"{lower:,.2f} - {tiers[i + 1][0]:,.2f}"
+        else:
+            label = f"above {lower:,.2f}"
+        tier_data.append([label, f"{rate:.2%}", f"{accrued:,.2f}"])
+
+    tier_table = Table(tier_data, colWidths=[70*mm, 30*mm, 35*mm])
+    tier_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ]))
+
+    return [KeepTogether([
+        Paragraph("<b>Balance &amp; Interest Summary</b>", styles["header"]),
+        Spacer(1, 3*mm),
+        summary_table,
+        Spacer(1, 3*mm),
+        tier_table,
+    ])]
+
+def _statement_tail(styles, summary, currency):
+    """Flowables that follow the transaction table: balance summary and footer."""
+
+    return [
+        Spacer(1, 10*mm),
+        *_balance_summary_elements(styles, summary, currency),
+        Spacer(1, 10*mm),
+        _footer_element(styles),
+    ]
+
+# Measured word widths, keyed by (font name, font size) and then by word
+_word_widths = {}
+
+def _word_width(word, font_name, font_size):
+    """Width of ``word`` in points, measured once per font and size."""
+
+    widths = _word_widths.setdefault((font_name, font_size), {})
+    width = widths.get(word)
+    if width is None:
+        width = widths[word] = pdfmetrics.stringWidth(word, font_name, font_size)
+    return width
+
+def wrap_text(text, max_width, font_name='Helvetica', font_size=8):
+    """Greedily break ``text`` into lines no wider than ``max_width`` points.
+
+    Words that are wider than a whole line on their own (IBANs, long references)
+    are broken between characters.
+    """
+
+    space_width = _word_width(' ', font_name, font_size)
+    lines = []
+    line = []
+    line_width = 0
+
+    for word in text.split():
+        width = _word_width(word, font_name, font_size)
+
+        if width > max_width:
+            if line:
+                lines.append(' '.join(line))
+            piece = ''
+            for char in word:
+                if piece and _word_width(piece + char, font_name, font_size) > max_width:
+                    lines.append(piece)
+                    piece = ''
+                piece += char
+            line = [piece]
+            line_width = _word_width(piece, font_name, font_size)
+        elif line and line_width + space_width + width > max_width:
+            lines.append(' '.join(line))
+            line = [word]
+            line_width = width
+        else:
+            line_width += width + (space_width if line else 0)
+            line.append(word)
+
+    if line:
+        lines.append(' '.join(line))
+
+    return lines or ['']
+
+def _transaction_row(txn):
+    """Format one transaction as a table row, wrapping the description to the column width."""
+
+    return [
+        txn['date'],
+        '\n'.join(wrap_text(txn['description'], DESCRIPTION_WIDTH)),
+        f"{txn['amount']:+,.2f}",
+        f"{txn['balance']:,.2f}"
+    ]
+
+def _row_height(row):
+    """Height of a table row: one ROW_HEIGHT plus a leading per extra description line."""
+
+    return ROW_HEIGHT + LINE_LEADING * row[1].count('\n')
+
+def _transaction_table_style():
+    """Table style for the single-table layout (header, zebra rows, closing balance)."""
+
+    return TableStyle([
+        # Header
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+        # Body (top-aligned so wrapped descriptions line up with the other columns)
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ALIGN', (2, 1), (3, -1), 'RIGHT'),
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+
+        # Alternating row colors
+        ('ROWBACKGROUNDS', (0, 1), (-1, -3), [colors.white, colors.HexColor('#f8f9fa')]),
+
+        # Grid
+        ('GRID', (0, 0), (-1, -3), 0.5, colors.HexColor('#dee2e6')),
+
+        # Closing balance row
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, -1), (-1, -1), 10),
+        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+
+        # Padding
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ])
+
+class _StatementTable(Table):
+    """Transaction table whose split pieces keep their currency for the carry-forward footer."""
+
+    currency = None
+
+    def split(self, availWidth, availHeight):
+        pieces = Table.split(self, availWidth, availHeight)
+        for piece in pieces:
+            piece.currency = self.currency
+        return pieces
+
+def _transaction_table(transactions, closing_balance, table_style, currency=None):
+    """Build the transaction table with its closing balance row."""
 
-    # Transaction table
-    table_data = [["Date", "Description", "Amount", "Balance"]]
+    table_data = [TABLE_HEADER]
 
     for txn in transactions:
-        amount_str = f"{txn['amount']:+,.2f}"
-        balance_str = f"{txn['balance']:,.2f}"
-        table_data.append([
-            txn['date'],
-            txn['description'][:45],  # Truncate long descriptions
-            amount_str,
-            balance_str
-        ])
+        table_data.append(_transaction_row(txn))
 
     # Add closing balance row
+    table_data.append(["", "", "", ""])
+    table_data.append(["", "Closing Balance", "", f"{closing_balance:,.2f}"])
+
+    # Row heights are known from the wrapped descriptions, so the Table does not measure cells
+    trans_table = _StatementTable(table_data, colWidths=COL_WIDTHS, rowHeights=[_row_height(row) for row in table_data])
+    trans_table.setStyle(table_style)
+    trans_table.currency = currency
+
+    return trans_table
+
+def statement_resources():
+    """Build the paragraph and table styles once, for reuse across many statements."""
+
+    return {
+        "styles": _statement_styles(),
+        "table_style": _transaction_table_style(),
+        "stream_table_style": _stream_table_style(),
+    }
+
+# Resources shared by every statement rendered in this process, see shared_resources()
+_shared_resources = None
+
+def shared_resources():
+    """Process-wide statement resources, built on first use and reused by every renderer."""
+
+    global _shared_resources
+    if _shared_resources is None:
+        _shared_resources = statement_resources()
+    return _shared_resources
+
+class _NumberedCanvas(canvas.Canvas):
+    """Canvas that fills in the total page count once, when the document is saved.
+
+    Footers draw the count with ``doForm()`` before it is known; the form itself is
+    only defined in ``save()``, so "Page X of Y" needs no second layout pass. A part
+    of a larger document passes ``page_count_text`` to draw a placeholder instead.
+    """
+
+    def __init__(self, *args, page_count_text=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._page_count = 0
+        self._page_count_text = page_count_text
+
+    def showPage(self):
+        self._page_count += 1
+        super().showPage()
+
+    def save(self):
+        self.beginForm(PAGE_COUNT_FORM)
+        self.setFont(*FOOTER_FONT)
+        self.drawString(0, 0, self._page_count_text or str(self._page_count))
+        self.endForm()
+        super().save()
+
+class _StatementDocTemplate(SimpleDocTemplate):
+    """Document template that ends every page with a page number and carried-forward balance.
+
+    The balance comes from the last transaction table piece drawn on the page; it is
+    shown only when that table continues on the next page.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._carried = None
+
+    def build(self, flowables, canvasmaker=_NumberedCanvas, **kwargs):
+        super().build(flowables, canvasmaker=canvasmaker, **kwargs)
+
+    def afterFlowable(self, flowable):
+        if not isinstance(flowable, _StatementTable):
+            return
+
+        rows = flowable._cellvalues
+        if rows[-1][1] == "Closing Balance":
+            self._carried = None
+            return
+
+        # Last row with a balance, skipping the blank spacer row before the closing balance
+        balance = next((row[3] for row in reversed(rows) if row[3] and row[3] != TABLE_HEADER[3]), None)
+        self._carried = (flowable.currency, balance) if balance else None
+
+    def afterPage(self):
+        _draw_page_footer(self.canv, self.canv.getPageNumber(), self._carried, self.leftMargin,
+                          self.pagesize[0] - self.rightMargin)
+        self._carried = None
+
+def _draw_page_footer(c, page_number, carried, left, right):
+    """Draw "Page X of Y" and, given ``(currency, balance)`` in ``carried``, the balance carried forward."""
+
+    c.saveState()
+    c.setFont(*FOOTER_FONT)
+
+    if carried:
+        currency, balance = carried
+        label = f"{currency} {balance}" if currency else balance
+        c.drawString(left, FOOTER_Y, f"Balance carried forward: {label}")
+
+    # Room for a four-digit page count after "of "
+    x = right - c.stringWidth("9999", *FOOTER_FONT)
+    c.drawRightString(x, FOOTER_Y, f"Page {page_number} of ")
+    c.translate(x, FOOTER_Y)
+    c.doForm(PAGE_COUNT_FORM)
+    c.restoreState()
+
+def _doc_template(output_file):
+    """A4 document template with 15mm margins, compressed page streams and page footers.
+
+    ``output_file`` is a path or any writable binary stream (``io.BytesIO``, an HTTP
+    response body, ...); reportlab writes the finished PDF to it in one go.
+    """
+
+    return _StatementDocTemplate(
+        output_file,
+        pagesize=A4,
+        rightMargin=15*mm,
+        leftMargin=15*mm,
+        topMargin=15*mm,
+        bottomMargin=15*mm,
+        pageCompression=PAGE_COMPRESSION
+    )
+
+def _output_name(output_file):
+    """Printable name for an output path or stream."""
+
+    if isinstance(output_file, (str, os.PathLike)):
+        return os.fspath(output_file)
+    return getattr(output_file, "name", None) or type(output_file).__name__
+
+def create_pdf(output_file=OUTPUT_FILE, account=DEFAULT_ACCOUNT, transactions=None,
+               opening_balance=OPENING_BALANCE, resources=None, verbose=True):
+    """Create the bank statement PDF.
+
+    Without arguments this renders the December 2024 mock statement. Batch callers
+    pass their own account details, transactions and prebuilt ``resources``.
+    ``output_file`` may also be a writable binary stream, so a web handler can
+    render into ``io.BytesIO`` and send the bytes without a temporary file.
+    """
+
+    doc = _doc_template(output_file)
+
+    if resources is None:
+        resources = shared_resources()
+    styles = resources["styles"]
+
+    # Generate transactions
+    if transactions is None:
+        transactions, opening_balance = generate_transactions()
+
+    elements = _header_elements(styles, opening_balance, account)
+
+    # Closing balance
     if transactions:
         closing_balance = transactions[-1]['balance']
     else:
         closing_balance = opening_balance
 
-    table_data.append(["", "", "", ""])
-    table_data.append(["", "Closing Balance", "", f"{closing_balance:,.2f}"])
+    # Balance summary and footer
+    currency = account["currency"]
+    elements.append(_transaction_table(transactions, closing_balance, resources["table_style"], currency))
+
+    elements.extend(_statement_tail(styles, _summary_from_rows(transactions, opening_balance), currency))
+
+    # Build PDF
+    doc.build(elements)
+
+    if verbose:
+        print(f"PDF generated: {_output_name(output_file)}")
+        print(f"Total transactions: {len(transactions)}")
+        print(f"Opening balance: {currency} {opening_balance:,.2f}")
+        print(f"Closing balance: {currency} {closing_balance:,.2f}")
+
+    return {
+        "output_file": output_file,
+        "transactions": len(transactions),
+        "opening_balance": opening_balance,
+        "closing_balance": closing_balance,
+    }
+
+def _reporting_total_elements(styles, revaluation):
+    """Build the reporting-currency total: each currency's closing balance at the closing rate."""
+
+    reporting = revaluation["reporting_currency"]
+    total_data = [["Currency", "Closing Balance", "Rate 31.12.2024", f"Value {reporting}", "Unrealised FX"]]
+    for section in revaluation["sections"]:
+        total_data.append([
+            section["currency"],
+            f"{section['closing_balance']:,.2f}",
+            f"{section['closing_rate']:.4f}",
+            f"{section['reporting_value']:,.2f}",
+            f"{section['fx_gain']:+,.2f}",
+        ])
+    total_data.append(["", f"Total {reporting}", "", f"{revaluation['reporting_total']:,.2f}",
+                       f"{revaluation['fx_gain_total']:+,.2f}"])
+
+    total_table = Table(total_data, colWidths=[22*mm, 40*mm, 30*mm, 40*mm, 35*mm])
+    total_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -2), 0.5, colors.HexColor('#dee2e6')),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ]))
+
+    return [KeepTogether([
+        Paragraph(f"<b>Total in Reporting Currency ({reporting})</b>", styles["header"]),
+        Spacer(1, 3*mm),
+        total_table,
+    ])]
+
+def create_pdf_multicurrency(output_file=OUTPUT_FILE, account=DEFAULT_ACCOUNT, columns=None,
+                             opening_balances=OPENING_BALANCES, fx_rates=None, resources=None, verbose=True):
+    """Create a multi-currency statement: one section per currency plus a reporting-currency total.
+
+    ``columns`` come from ``generate_multicurrency_columnar()``; their ``currency``
+    indices refer to ``list(opening_balances)``. Balances are revalued into the
+    account's reporting currency with one vectorized rate lookup over all rows.
+    """
+
+    if resources is None:
+        resources = shared_resources()
+    styles = resources["styles"]
+
+    if columns is None:
+        columns, opening_balances = generate_multicurrency_columnar(opening_balances=opening_balances)
+    if fx_rates is None:
+        fx_rates = load_fx_rates()
+
+    currency_codes = list(opening_balances)
+    end_date = START_DATE + timedelta(days=PERIOD_DAYS - 1)
+    revaluation = revaluation_summary(
+        fx_rates, currency_codes, columns["currency"], columns["date"], columns["amount_cents"],
+        opening_balances, START_DATE, end_date, reporting_currency=account["currency"]
+    )
+
+    doc = _doc_template(output_file)
+
+    header_account = dict(account, currency=f"{', '.join(currency_codes)} (reporting: {account['currency']})")
+    elements = _header_elements(styles, None, header_account)
+
+    # One section per currency, in its own currency
+    for index, section in enumerate(revaluation["sections"]):
+        code = section["currency"]
+        transactions = list(iter_columnar_rows(
+            {name: values[columns["currency"] == index] for name, values in columns.items()}, currency_codes
+        ))
+
+        elements.append(Paragraph(f"<b>{code} Account</b>", styles["statement_title"]))
+        elements.append(Spacer(1, 4*mm))
+        elements.append(Paragraph(f"<b>Opening Balance: {code} {section['opening_balance']:,.2f}</b>", styles["header"]))
+        elements.append(Spacer(1, 3*mm))
+        elements.append(_transaction_table(transactions, section["closing_balance"], resources["table_style"], code))
+        elements.append(Spacer(1, 8*mm))
+
+    elements.extend(_reporting_total_elements(styles, revaluation))
+    elements.append(Spacer(1, 10*mm))
+    elements.append(_footer_element(styles))
+
+    doc.build(elements)
+
+    if verbose:
+        print(f"PDF generated: {_output_name(output_file)}")
+        print(f"Total transactions: {len(columns['amount_cents'])}")
+        for section in revaluation["sections"]:
+            print(f"Closing balance: {section['currency']} {section['closing_balance']:,.2f}")
+        print(f"Total ({revaluation['reporting_currency']}): {revaluation['reporting_total']:,.2f}, "
+              f"unrealised FX {revaluation['fx_gain_total']:+,.2f}")
+
+    return {
+        "output_file": output_file,
+        "transactions": len(columns["amount_cents"]),
+        "revaluation": revaluation,
+    }
+
+class _FlowableStream(list):
+    """List facade that pulls flowables from an iterator as platypus consumes them.
+
+    ``doc.build()`` only ever looks at the front of its flowable list, so keeping a
+    short lookahead is enough and the full story never has to exist in memory.
+    """
+
+    def __init__(self, flowables, lookahead=2):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                break
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
 
-    trans_table = Table(table_data, colWidths=[22*mm, 85*mm, 30*mm, 35*mm])
-    trans_table.setStyle(TableStyle([
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+def _stream_table_style():
+    """Table style for a page-sized chunk: header, brought forward, rows, carried forward."""
+
+    return TableStyle([
         # Header
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -199,43 +886,616 @@ def create_pdf():
         ('FONTSIZE', (0, 0), (-1, 0), 9),
         ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
 
-        # Body
+        # Body (top-aligned so wrapped descriptions line up with the other columns)
         ('FONTSIZE', (0, 1), (-1, -1), 8),
         ('ALIGN', (2, 1), (3, -1), 'RIGHT'),
         ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
 
         # Alternating row colors
-        ('ROWBACKGROUNDS', (0, 1), (-1, -3), [colors.white, colors.HexColor('#f8f9fa')]),
+        ('ROWBACKGROUNDS', (0, 2), (-1, -2), [colors.white, colors.HexColor('#f8f9fa')]),
 
         # Grid
-        ('GRID', (0, 0), (-1, -3), 0.5, colors.HexColor('#dee2e6')),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),
 
-        # Closing balance row
+        # Brought forward / carried forward rows
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Oblique'),
         ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, -1), (-1, -1), 10),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e9ecef')),
         ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
 
         # Padding
         ('TOPPADDING', (0, 0), (-1, -1), 4),
         ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ])
+
+def _closing_table(closing_balance):
+    """Closing balance rows, styled like the end of the single-table layout."""
+
+    closing_table = Table(
+        [["", "", "", ""], ["", "Closing Balance", "", f"{closing_balance:,.2f}"]],
+        colWidths=COL_WIDTHS,
+        rowHeights=ROW_HEIGHT
+    )
+    closing_table.setStyle(TableStyle([
+        ('ALIGN', (2, 0), (3, -1), 'RIGHT'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, -1), (-1, -1), 10),
+        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
+    return closing_table
 
-    elements.append(trans_table)
-    elements.append(Spacer(1, 10*mm))
+def _chunk_body_height(available_height):
+    """Height left for transaction rows once header, brought and carried forward rows are placed."""
 
-    # Footer
-    footer_text = """
-    <i>This statement is generated automatically. Please review all transactions and report any
-    discrepancies within 30 days. For questions, contact customer service at +41 44 123 4567.</i>
+    return max(available_height - 3 * ROW_HEIGHT, ROW_HEIGHT)
+
+def _flowables_height(flowables, width, available_height):
+    """Height the given flowables take up when stacked in a frame."""
+
+    total = 0
+    for flowable in flowables:
+        _, height = flowable.wrap(width, available_height)
+        total += height + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+    return total
+
+def _stream_chunks(transactions, opening_balance, first_height, page_height, style, stats):
+    """Cut a transaction iterator into page-sized Tables carrying the running balance.
+
+    Each chunk repeats the header row, opens with the balance brought forward and
+    closes with the page's net movement and the balance carried forward. Rows are
+    added while their wrapped heights still fit the page. Only the current chunk's
+    rows are held in memory; ``stats`` is updated as chunks are cut.
     """
-    elements.append(Paragraph(footer_text, ParagraphStyle('footer', fontSize=8, alignment=TA_CENTER)))
+
+    balance = opening_balance
+    budget = first_height
+    chunk = []
+
+    def make_table(chunk, balance):
+        page_total = round(sum(txn['amount'] for txn, _, _ in chunk), 2)
+        closing = chunk[-1][0]['balance']
+
+        table_data = [TABLE_HEADER, ["", "Brought forward", "", f"{balance:,.2f}"]]
+        table_data.extend(row for _, row, _ in chunk)
+        table_data.append(["", "Page total / carried forward", f"{page_total:+,.2f}", f"{closing:,.2f}"])
+
+        row_heights = [ROW_HEIGHT, ROW_HEIGHT] + [height for _, _, height in chunk] + [ROW_HEIGHT]
+        table = Table(table_data, colWidths=COL_WIDTHS, rowHeights=row_heights)
+        table.setStyle(style)
+
+        stats["transactions"] += len(chunk)
+        stats["pages"] += 1
+        stats["closing_balance"] = closing
+        for txn, _, _ in chunk:
+            stats["day_balances"][txn['date']] = txn['balance']
+
+        return table, closing
+
+    used = 0
+    for txn in transactions:
+        row = _transaction_row(txn)
+        height = _row_height(row)
+
+        if chunk and used + height > budget:
+            table, balance = make_table(chunk, balance)
+            yield table
+            chunk = []
+            used = 0
+            budget = page_height
+
+        chunk.append((txn, row, height))
+        used += height
+
+    if chunk:
+        table, balance = make_table(chunk, balance)
+        yield table
+
+def create_pdf_streaming(transactions, opening_balance, output_file=OUTPUT_FILE, account=DEFAULT_ACCOUNT,
+                         resources=None, period=(START_DATE, PERIOD_DAYS), verbose=True):
+    """Create the bank statement PDF from a transaction iterator in page-sized chunks.
+
+    Unlike ``create_pdf()``, the transactions are never collected into one list or
+    one Table, so memory stays flat regardless of how many rows the month has.
+    ``period`` is passed to the balance summary; None derives it from the first and
+    last transaction dates.
+    """
+
+    start_time = time.perf_counter()
+
+    doc = _doc_template(output_file)
+
+    if resources is None:
+        resources = shared_resources()
+    styles = resources["styles"]
+    header = _header_elements(styles, opening_balance, account)
+
+    # Frame height minus the default 6pt top and bottom frame padding
+    frame_height = doc.height - 12
+    first_height = _chunk_body_height(frame_height - _flowables_height(header, doc.width, frame_height))
+    page_height = _chunk_body_height(frame_height)
+
+    # End-of-day balances are all the balance summary needs, so they are kept per day, not per row
+    stats = {"transactions": 0, "pages": 0, "closing_balance": opening_balance, "day_balances": {}}
+
+    def story():
+        yield from header
+        yield from _stream_chunks(transactions, opening_balance, first_height, page_height,
+                                  resources["stream_table_style"], stats)
+        yield _closing_table(stats["closing_balance"])
+        day_rows = [{"date": date, "balance": balance} for date, balance in stats["day_balances"].items()]
+        yield from _statement_tail(styles, _summary_from_rows(day_rows, opening_balance, period), account["currency"])
 
     # Build PDF
-    doc.build(elements)
-    print(f"PDF generated: {OUTPUT_FILE}")
-    print(f"Total transactions: {len(transactions)}")
-    print(f"Opening balance: {CURRENCY} {opening_balance:,.2f}")
-    print(f"Closing balance: {CURRENCY} {closing_balance:,.2f}")
+    doc.build(_FlowableStream(story()))
+
+    elapsed = time.perf_counter() - start_time
+    rows_per_sec = stats["transactions"] / elapsed if elapsed else 0.0
+
+    if verbose:
+        print(f"PDF generated: {_output_name(output_file)}")
+        print(f"Total transactions: {stats['transactions']:,} in {stats['pages']:,} table chunks")
+        print(f"Opening balance: {account['currency']} {opening_balance:,.2f}")
+        print(f"Closing balance: {account['currency']} {stats['closing_balance']:,.2f}")
+        print(f"Throughput: {rows_per_sec:,.0f} rows/sec ({elapsed:.1f}s)")
+        print_peak_rss()
+
+    return stats
+
+# Canvas fast path geometry (matches the SimpleDocTemplate frame used above)
+PAGE_WIDTH, PAGE_HEIGHT = A4
+PAGE_MARGIN = 15*mm
+FRAME_PADDING = 6
+TABLE_LEFT = PAGE_MARGIN + FRAME_PADDING + (PAGE_WIDTH - 2*PAGE_MARGIN - 2*FRAME_PADDING - sum(COL_WIDTHS)) / 2
+COL_EDGES = [TABLE_LEFT + sum(COL_WIDTHS[:i]) for i in range(len(COL_WIDTHS) + 1)]
+TABLE_RIGHT = COL_EDGES[-1]
+FRAME_BOTTOM = PAGE_MARGIN + FRAME_PADDING
+FRAME_TOP = PAGE_HEIGHT - PAGE_MARGIN - FRAME_PADDING
+
+HEADER_BACKGROUND = colors.HexColor('#2c3e50')
+ZEBRA_BACKGROUND = colors.HexColor('#f8f9fa')
+GRID_COLOR = colors.HexColor('#dee2e6')
+
+def _new_frame():
+    """Frame with the same geometry SimpleDocTemplate uses for the statement pages."""
+
+    return Frame(PAGE_MARGIN, PAGE_MARGIN, PAGE_WIDTH - 2*PAGE_MARGIN, PAGE_HEIGHT - 2*PAGE_MARGIN)
+
+def _draw_cell_text(text_obj, value, col, baseline, font, size):
+    """Place one cell string with the alignment the platypus table style gives its column."""
+
+    if col == 1 or not value:
+        x = COL_EDGES[col] + CELL_PADDING
+        for line in value.split('\n'):
+            text_obj.setTextOrigin(x, baseline)
+            text_obj.textOut(line)
+            baseline -= LINE_LEADING
+        return
+    elif col == 0:
+        x = (COL_EDGES[0] + COL_EDGES[1] - pdfmetrics.stringWidth(value, font, size)) / 2
+    else:
+        x = COL_EDGES[col + 1] - CELL_PADDING - pdfmetrics.stringWidth(value, font, size)
+    text_obj.setTextOrigin(x, baseline)
+    text_obj.textOut(value)
+
+def _draw_table_page(c, rows, heights, first_index, top, grid_rows):
+    """Draw a page worth of table rows starting at ``top``.
+
+    ``rows`` are formatted table rows with their precomputed ``heights``,
+    ``first_index`` is the index of the first one within the full table (0 is the
+    header) and ``grid_rows`` is the number of rows covered by the grid, zebra fill
+    and body font: header plus transactions.
+    """
+
+    row_tops = [top]
+    for height in heights:
+        row_tops.append(row_tops[-1] - height)
+
+    # Backgrounds: header fill and every other transaction row. Like a split platypus
+    # Table, the zebra cycle restarts with a white row at the top of every page.
+    first_body = max(first_index, 1)
+    for i, index in enumerate(range(first_index, first_index + len(rows))):
+        if index == 0:
+            c.setFillColor(HEADER_BACKGROUND)
+            c.rect(TABLE_LEFT, row_tops[i + 1], TABLE_RIGHT - TABLE_LEFT, heights[i], stroke=0, fill=1)
+        elif index < grid_rows and (index - first_body) % 2 == 1:
+            c.setFillColor(ZEBRA_BACKGROUND)
+            c.rect(TABLE_LEFT, row_tops[i + 1], TABLE_RIGHT - TABLE_LEFT, heights[i], stroke=0, fill=1)
+
+    # Text: one text object per page instead of a drawString call per cell
+    text_obj = c.beginText()
+    current_font = None
+    for i, (index, row) in enumerate(zip(range(first_index, first_index + len(rows)), rows)):
+        if index == 0:
+            font, size, color = 'Helvetica-Bold', 9, colors.white
+        elif index == grid_rows + 1:
+            font, size, color = 'Helvetica-Bold', 10, colors.black
+        else:
+            font, size, color = 'Helvetica', 8, colors.black
+        if (font, size, color) != current_font:
+            text_obj.setFont(font, size)
+            text_obj.setFillColor(color)
+            current_font = (font, size, color)
+
+        # Top-aligned cell text, as in the platypus Table (padding 4)
+        baseline = row_tops[i] - 4 - size
+        for col, value in enumerate(row):
+            if index == 0:
+                x = (COL_EDGES[col] + COL_EDGES[col + 1] - pdfmetrics.stringWidth(value, font, size)) / 2
+                text_obj.setTextOrigin(x, baseline)
+                text_obj.textOut(value)
+            else:
+                _draw_cell_text(text_obj, value, col, baseline, font, size)
+    c.drawText(text_obj)
+
+    # Grid lines over the header and transaction rows on this page
+    grid_count = max(0, min(first_index + len(rows), grid_rows) - first_index)
+    if grid_count:
+        grid_bottom = row_tops[grid_count]
+        c.setLineWidth(0.5)
+        c.setStrokeColor(GRID_COLOR)
+        lines = [(TABLE_LEFT, y, TABLE_RIGHT, y) for y in row_tops[:grid_count + 1]]
+        lines.extend((x, top, x, grid_bottom) for x in COL_EDGES)
+        c.lines(lines)
+
+    # Closing balance rule
+    closing_index = grid_rows + 1
+    if first_index <= closing_index < first_index + len(rows):
+        y = row_tops[closing_index - first_index]
+        c.setLineWidth(1)
+        c.setStrokeColor(colors.black)
+        c.line(TABLE_LEFT, y, TABLE_RIGHT, y)
+
+def _draw_header_block(c, styles, opening_balance, account):
+    """Lay out the statement header through a Frame; return the y it ends at."""
+
+    frame = _new_frame()
+    frame.addFromList(_header_elements(styles, opening_balance, account), c)
+    return frame._y
+
+def _paginate(heights, top):
+    """Yield (start, end, top, new_page) for the row slices that fill successive pages.
+
+    The first slice goes on the current page from ``top`` unless not even one row
+    fits there; every other slice starts a new page.
+    """
+
+    start = 0
+    new_page = False
+    while start < len(heights):
+        end = start
+        y = top
+        while end < len(heights) and y - heights[end] >= FRAME_BOTTOM - 1e-6:
+            y -= heights[end]
+            end += 1
+        if end == start and top < FRAME_TOP:
+            # Nothing fits under what is already on this page
+            top = FRAME_TOP
+            new_page = True
+            continue
+        end = max(end, start + 1)
+        yield start, end, top, new_page
+        start = end
+        top = FRAME_TOP
+        new_page = True
+
+def _page_ender(currency, page_offset=0):
+    """``end_page(c, carried=None)``: draw the page footer, then start a new page.
+
+    ``carried`` is the formatted balance carried forward, if the table continues;
+    ``page_offset`` counts the pages of a larger document before this canvas.
+    """
+
+    def end_page(c, carried=None):
+        _draw_page_footer(c, c.getPageNumber() + page_offset, (currency, carried) if carried else None,
+                          PAGE_MARGIN, PAGE_WIDTH - PAGE_MARGIN)
+        c.showPage()
+
+    return end_page
+
+def _draw_table_rows(c, rows, heights, first_index, top, grid_rows, end_page):
+    """Draw table rows from ``top`` down, ending full pages with ``end_page``.
+
+    Returns the y below the rows and the balance to carry forward from the last page,
+    or None once the closing balance row is drawn.
+    """
+
+    carried = None
+    for start, end, page_top, new_page in _paginate(heights, top):
+        if new_page:
+            end_page(c, carried)
+        _draw_table_page(c, rows[start:end], heights[start:end], first_index + start, page_top, grid_rows)
+        top = page_top - sum(heights[start:end])
+
+        # The closing balance row has index grid_rows + 1
+        if first_index + end > grid_rows + 1:
+            carried = None
+        else:
+            carried = next((row[3] for row in reversed(rows[start:end]) if row[3] and row[3] != TABLE_HEADER[3]),
+                           carried)
+    return top, carried
+
+def _draw_tail(c, tail, top, end_page):
+    """Draw the flowables that follow the table, moving to a new page when they do not fit.
+
+    KeepTogether groups are only honoured by a doc template, so here they are
+    measured as a whole and their contents added to the frame one by one.
+    """
+
+    frame_width = PAGE_WIDTH - 2*PAGE_MARGIN - 2*FRAME_PADDING
+    frame = _new_frame()
+    frame._y = top
+    frame._atTop = 0
+
+    for flowable in tail:
+        group = list(flowable._content) if isinstance(flowable, KeepTogether) else [flowable]
+        if _flowables_height(group, frame_width, FRAME_TOP - FRAME_BOTTOM) > frame._y - FRAME_BOTTOM:
+            end_page(c)
+            frame = _new_frame()
+        frame.addFromList(group, c)
+
+def create_pdf_canvas(output_file=OUTPUT_FILE, account=DEFAULT_ACCOUNT, transactions=None,
+                      opening_balance=OPENING_BALANCE, resources=None, verbose=True):
+    """Create the bank statement PDF, drawing the transaction grid straight onto the canvas.
+
+    Produces the same pages as ``create_pdf()``, footers included, but skips platypus Table
+    layout: row heights are known up front and every column has a fixed width, so
+    row positions and page breaks are plain arithmetic. The header block, balance
+    summary and footer still go through a Frame so they look exactly the same.
+    """
+
+    if resources is None:
+        resources = shared_resources()
+    styles = resources["styles"]
+
+    # Generate transactions
+    if transactions is None:
+        transactions, opening_balance = generate_transactions()
+
+    if transactions:
+        closing_balance = transactions[-1]['balance']
+    else:
+        closing_balance = opening_balance
+
+    rows = [TABLE_HEADER]
+    rows.extend(_transaction_row(txn) for txn in transactions)
+    grid_rows = len(rows)
+    rows.append(["", "", "", ""])
+    rows.append(["", "Closing Balance", "", f"{closing_balance:,.2f}"])
+
+    currency = account["currency"]
+    c = _NumberedCanvas(output_file, pagesize=A4, pageCompression=PAGE_COMPRESSION)
+    end_page = _page_ender(currency)
+
+    # Bank header, account details and opening balance, laid out by a regular frame
+    top = _draw_header_block(c, styles, opening_balance, account)
+    top, _ = _draw_table_rows(c, rows, [_row_height(row) for row in rows], 0, top, grid_rows, end_page)
+    summary = _summary_from_rows(transactions, opening_balance)
+    _draw_tail(c, _statement_tail(styles, summary, currency), top, end_page)
+
+    end_page(c)
+    c.save()
+
+    if verbose:
+        print(f"PDF generated: {_output_name(output_file)}")
+        print(f"Total transactions: {len(transactions)}")
+        print(f"Opening balance: {currency} {opening_balance:,.2f}")
+        print(f"Closing balance: {currency} {closing_balance:,.2f}")
+
+    return {
+        "output_file": output_file,
+        "transactions": len(transactions),
+        "opening_balance": opening_balance,
+        "closing_balance": closing_balance,
+    }
+
+def _plan_page_ranges(heights, first_top, pages_per_range):
+    """Split table row indices into (start, end, first_page) ranges of ``pages_per_range`` whole pages.
+
+    ``first_page`` is the number of the range's first page in the joined document.
+    """
+
+    slices = list(_paginate(heights, first_top))
+    page_starts = [start for start, _, _, _ in slices]
+    boundaries = page_starts[::pages_per_range] + [len(heights)]
+
+    # If not even the header row fits under the header block, the table starts on page 2
+    table_first_page = 2 if slices and slices[0][3] else 1
+    first_pages = [1] + [table_first_page + part * pages_per_range for part in range(1, len(boundaries) - 1)]
+    return list(zip(boundaries[:-1], boundaries[1:], first_pages))
+
+def _fill_page_count(writer, num_pages):
+    """Write the joined document's page count into every part's page-count form."""
+
+    filled = set()
+    for page in writer.pages:
+        xobjects = page["/Resources"].get("/XObject", {})
+        form = xobjects.get(f"/FormXob.{PAGE_COUNT_FORM}")
+        if form is None or form.idnum in filled:
+            continue
+        filled.add(form.idnum)
+
+        form = form.get_object()
+        data = form.get_data().replace(f"({PAGE_COUNT_PLACEHOLDER})".encode(), f"({num_pages})".encode())
+        # pypdf only re-encodes Flate streams; reportlab also applies ASCII85
+        form[NameObject("/Filter")] = NameObject("/FlateDecode")
+        form.set_data(data)
+
+def _columnar_row_heights(columns):
+    """Table row heights for columnar transactions, wrapping each distinct description once."""
+
+    keys = columns["template"].astype(np.int64) * 10000 + columns["ref"]
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    line_counts = np.array([
+        len(wrap_text(_columnar_description(int(key // 10000), int(key % 10000)), DESCRIPTION_WIDTH))
+        for key in unique_keys
+    ], dtype=np.int64)
+    return ROW_HEIGHT + LINE_LEADING * (line_counts[inverse] - 1)
+
+def _render_page_range(part_file, columns, carried_cents, start, end, first_page, num_txns, closing_balance,
+                       opening_balance, account, summary):
+    """Render table rows [start, end) of a statement into ``part_file``; runs in a worker process.
+
+    ``columns`` holds only this range's transactions and ``carried_cents`` is the
+    balance brought into the range, so balances are rebuilt locally from amounts.
+    Pages are numbered from ``first_page``; the page count is left as a placeholder
+    for ``_fill_page_count()``.
+    """
+
+    columns = dict(columns, balance_cents=carried_cents + np.cumsum(columns["amount_cents"]))
+
+    rows = [TABLE_HEADER] if start == 0 else []
+    rows.extend(_transaction_row(txn) for txn in iter_columnar_rows(columns))
+    grid_rows = num_txns + 1
+    if end > grid_rows:
+        rows.append(["", "", "", ""])
+    if end > grid_rows + 1:
+        rows.append(["", "Closing Balance", "", f"{closing_balance:,.2f}"])
+
+    styles = shared_resources()["styles"]
+    c = _NumberedCanvas(part_file, pagesize=A4, pageCompression=PAGE_COMPRESSION,
+                        page_count_text=PAGE_COUNT_PLACEHOLDER)
+    end_page = _page_ender(account["currency"], first_page - 1)
+
+    if start == 0:
+        top = _draw_header_block(c, styles, opening_balance, account)
+    else:
+        top = FRAME_TOP
+    top, carried = _draw_table_rows(c, rows, [_row_height(row) for row in rows], start, top, grid_rows, end_page)
+    if end == grid_rows + 2:
+        _draw_tail(c, _statement_tail(styles, summary, account["currency"]), top, end_page)
+
+    end_page(c, carried)
+    c.save()
+    return part_file
+
+def create_pdf_parallel(columns, opening_balance, output_file=OUTPUT_FILE, account=DEFAULT_ACCOUNT,
+                        workers=None, pages_per_range=50, verbose=True):
+    """Create a large bank statement PDF by rendering page ranges in parallel.
+
+    The transaction table is cut into ranges of ``pages_per_range`` pages using the
+    precomputed row heights, each range is rendered with the canvas fast path in its
+    own process with the running balance carried into it, and the parts are then
+    joined page by page into one document. Each part numbers its pages from its
+    planned first page; the "of Y" total is written in after the join.
+    """
+
+    start_time = time.perf_counter()
+
+    num_txns = len(columns["amount_cents"])
+    opening_cents = int(round(opening_balance * 100))
+    balance_before = opening_cents + np.concatenate(([0], np.cumsum(columns["amount_cents"])))
+    closing_balance = int(balance_before[-1]) / 100
+
+    # Only the scalar results travel to the worker that draws the summary
+    summary = compute_balance_summary(columns["date"], balance_before[1:], opening_balance, START_DATE, PERIOD_DAYS)
+    summary = {key: value for key, value in summary.items() if not key.startswith("daily_")}
+
+    # Table rows: header, transactions, blank spacer row, closing balance
+    heights = [ROW_HEIGHT] + _columnar_row_heights(columns).tolist() + [ROW_HEIGHT, ROW_HEIGHT]
+    first_top = _draw_header_block(canvas.Canvas(io.BytesIO(), pagesize=A4), shared_resources()["styles"],
+                                   opening_balance, account)
+    ranges = _plan_page_ranges(heights, first_top, pages_per_range)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for part, (start, end, first_page) in enumerate(ranges):
+            # Row r (1..num_txns) holds transaction r - 1
+            txn_start = min(max(start - 1, 0), num_txns)
+            txn_end = min(max(end - 1, 0), num_txns)
+            part_columns = {name: columns[name][txn_start:txn_end] for name in ("date", "template", "ref", "amount_cents")}
+            futures.append(pool.submit(
+                _render_page_range, os.path.join(tmp_dir, f"part_{part:05d}.pdf"), part_columns,
+                int(balance_before[txn_start]), start, end, first_page, num_txns, closing_balance, opening_balance,
+                account, summary
+            ))
+
+        # Join the parts in range order at the page-object level
+        writer = PdfWriter()
+        for future in futures:
+            writer.append(future.result())
+
+        # Page totals are only known once the parts are joined
+        num_pages = len(writer.pages)
+        _fill_page_count(writer, num_pages)
+        writer.write(output_file)
+
+    elapsed = time.perf_counter() - start_time
+
+    if verbose:
+        print(f"PDF generated: {_output_name(output_file)}")
+        print(f"Total transactions: {num_txns:,} on {num_pages:,} pages ({len(ranges)} ranges)")
+        print(f"Opening balance: {account['currency']} {opening_balance:,.2f}")
+        print(f"Closing balance: {account['currency']} {closing_balance:,.2f}")
+        print(f"Throughput: {num_txns / elapsed if elapsed else 0.0:,.0f} rows/sec ({elapsed:.1f}s)")
+
+    return {
+        "output_file": output_file,
+        "transactions": num_txns,
+        "pages": num_pages,
+        "opening_balance": opening_balance,
+        "closing_balance": closing_balance,
+    }
+
+def synthetic_transactions(rows, opening_balance=OPENING_BALANCE, seed=None):
+    """Iterate ``rows`` mock December transactions for high-volume accounts."""
+
+    per_day = math.ceil(rows / WORKING_DAYS)
+    columns, _ = generate_transactions_columnar(seed, opening_balance, per_day=(per_day, per_day))
+    return itertools.islice(iter_columnar_rows(columns), rows)
 
 if __name__ == "__main__":
-    create_pdf()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stream", type=int, metavar="ROWS",
+                        help="render ROWS synthetic transactions in streaming mode")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="output PDF path")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible synthetic months")
+    parser.add_argument("--canvas", action="store_true", help="draw the transaction table directly on the canvas")
+    parser.add_argument("--parallel", type=int, metavar="ROWS",
+                        help="render ROWS synthetic transactions as page ranges on a process pool")
+    parser.add_argument("--workers", type=int, help="worker processes for --parallel (default: CPU count)")
+    parser.add_argument("--pages-per-range", type=int, default=50, help="pages rendered per worker task")
+    parser.add_argument("--input", metavar="FILE",
+                        help="render an MT940 or camt.053 statement file in streaming mode")
+    parser.add_argument("--multicurrency", action="store_true",
+                        help="render a multi-currency statement with a reporting-currency total")
+    parser.add_argument("--sink", action="append", metavar="FILE",
+                        help="with --stream or --input, also write the statement rows to a .csv, .npz or "
+                             ".parquet file (repeatable)")
+    args = parser.parse_args()
+
+    if args.sink and not (args.stream or args.input):
+        parser.error("--sink needs --stream or --input")
+    sinks = [output_sinks.open_sink(path, EXPORT_HEADER) for path in args.sink or []]
+
+    def exported(rows):
+        return output_sinks.tee_to_sinks(rows, sinks, _export_values) if sinks else rows
+
+    if args.input:
+        from statement_parsers import parse_statement_file
+
+        rows = parse_statement_file(args.input)
+        first = next(rows, None)
+        if first is None:
+            sys.exit(f"No entries in {args.input}")
+        opening_balance = round(first["balance"] - first["amount"], 2)
+        account = dict(DEFAULT_ACCOUNT, currency=first["currency"])
+        create_pdf_streaming(exported(itertools.chain([first], rows)), opening_balance, args.output, account,
+                             period=None)
+    elif args.stream:
+        create_pdf_streaming(exported(synthetic_transactions(args.stream, seed=args.seed)), OPENING_BALANCE,
+                             args.output)
+    elif args.parallel:
+        per_day = math.ceil(args.parallel / WORKING_DAYS)
+        columns, opening_balance = generate_transactions_columnar(args.seed, per_day=(per_day, per_day))
+        columns = {name: values[:args.parallel] for name, values in columns.items()}
+        create_pdf_parallel(columns, opening_balance, args.output, workers=args.workers,
+                            pages_per_range=args.pages_per_range)
+    elif args.multicurrency:
+        create_pdf_multicurrency(args.output, columns=generate_multicurrency_columnar(args.seed)[0])
+    elif args.canvas:
+        create_pdf_canvas(args.output)
+    else:
+        create_pdf(args.output)
@@ -0,0 +1,121 @@
+"""
+Generate month-end bank statement PDFs for many accounts in parallel.
+Reads an account list from CSV and renders one statement per account on a process pool,
+reusing the layout from generate_bank_statement_pdf.py.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import argparse
+import csv
+import os
+import time
+import zlib
+
+from generate_bank_statement_pdf import (
+    OPENING_BALANCE,
+    create_pdf,
+    generate_transactions_columnar,
+    iter_columnar_rows,
+    statement_resources,
+)
+
+# Input / output
+ACCOUNTS_FILE = "accounts_december_2024.csv"
+OUTPUT_DIR = "statements_december_2024"
+
+# Styles are built once per worker process by _init_worker()
+_worker_resources = None
+
+def read_accounts(path):
+    """Yield account dicts from a CSV with account_number, account_holder, address, currency columns."""
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield {
+                "account_number": row["account_number"],
+                "account_holder": row["account_holder"],
+                "address": row["address"],
+                "currency": row.get("currency") or "CHF",
+                "opening_balance": float(row.get("opening_balance") or OPENING_BALANCE),
+            }
+
+def _init_worker():
+    """Build the paragraph and table styles once for this worker process."""
+
+    global _worker_resources
+    _worker_resources = statement_resources()
+
+def _render_account(account, output_dir):
+    """Render one account's statement; runs inside a worker process."""
+
+    # Seed from the account number so each account gets its own, reproducible month
+    seed = zlib.crc32(account["account_number"].encode())
+    columns, opening_balance = generate_transactions_columnar(seed, account["opening_balance"])
+
+    file_name = "statement_" + "".join(ch for ch in account["account_number"] if ch.isalnum()) + ".pdf"
+
+    return create_pdf(
+        output_file=os.path.join(output_dir, file_name),
+        account=account,
+        transactions=list(iter_columnar_rows(columns)),
+        opening_balance=opening_balance,
+        resources=_worker_resources,
+        verbose=False
+    )
+
+def generate_statements(accounts_file=ACCOUNTS_FILE, output_dir=OUTPUT_DIR, workers=None, max_in_flight=None):
+    """Render statements for every account in ``accounts_file`` on a process pool.
+
+    At most ``max_in_flight`` accounts are submitted at a time (default: twice the
+    worker count), so huge account lists are read lazily instead of queued up front.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    os.makedirs(output_dir, exist_ok=True)
+
+    start_time = time.perf_counter()
+    rendered = 0
+    failed = []
+
+    def collect(futures):
+        nonlocal rendered
+        for future in futures:
+            account_number = in_flight.pop(future)
+            try:
+                future.result()
+                rendered += 1
+            except Exception as exc:
+                failed.append((account_number, exc))
+
+    in_flight = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for account in read_accounts(accounts_file):
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight[pool.submit(_render_account, account, output_dir)] = account["account_number"]
+
+        done, _ = wait(in_flight)
+        collect(done)
+
+    elapsed = time.perf_counter() - start_time
+    accounts_per_sec = rendered / elapsed if elapsed else 0.0
+
+    print(f"Statements generated: {rendered} in {output_dir}/")
+    print(f"Workers: {workers}, max in flight: {max_in_flight}")
+    print(f"Throughput: {accounts_per_sec:,.1f} accounts/sec ({elapsed:.1f}s)")
+    for account_number, exc in failed:
+        print(f"FAILED {account_number}: {exc}")
+
+    return rendered, failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("accounts_file", nargs="?", default=ACCOUNTS_FILE, help="CSV account list")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="directory for the statement PDFs")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, help="accounts submitted at once (default: 2x workers)")
+    args = parser.parse_args()
+
+    generate_statements(args.accounts_file, args.output_dir, args.workers, args.max_in_flight)
@@ -4,10 +4,25 @@ This creates accounting journal entries from bank transactions (two rows per tra
 """
 
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
 from openpyxl.utils import get_column_letter
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import itertools
+import math
+import os
 import random
+import tempfile
+import time
+
+import numpy as np
+
+import output_sinks
+from generate_bank_statement_pdf import WORKING_DAYS
+from peak_memory import print_peak_rss
+import xlsx_stream_writer as xlsx
 
 # Output file
 OUTPUT_FILE = "journal_entries_december_2024.xlsx"
@@ -30,55 +45,116 @@ GL_ACCOUNTS = {
     "professional_fees": {"code": "66000", "name": "Professional Services"},
 }
 
-def generate_transactions():
-    """Generate mock transactions for journal entries."""
+# Transaction templates: (description, category, min_amount, max_amount, is_incoming)
+TRANSACTION_TYPES = [
+    ("Customer payment - INV-{}", "ar", 5000, 45000, True),
+    ("Payment received - Order #{}", "ar", 1000, 12000, True),
+    ("Intercompany transfer from TechFlow UK", "interco_receivable", 15000, 80000, True),
+    ("Intercompany transfer from TechFlow DE", "interco_receivable", 20000, 60000, True),
+    ("Interest income - December", "interest_income", 100, 800, True),
+    ("FX Gain adjustment", "fx_gain_loss", 200, 1500, True),
+    ("Supplier payment - Nordic Supply Ltd", "ap", 3000, 25000, False),
+    ("Supplier payment - Alpine Systems AG", "ap", 2000, 18000, False),
+    ("Supplier payment - Central Trading Co", "ap", 5000, 30000, False),
+    ("Payroll transfer - December", "payroll", 80000, 120000, False),
+    ("Bank charges - Monthly fee", "bank_fees", 35, 75, False),
+    ("SWIFT transfer fee", "bank_fees", 20, 45, False),
+    ("Intercompany payment to TechFlow US", "interco_payable", 25000, 70000, False),
+    ("Rent payment - Office Q4", "rent", 8000, 12000, False),
+    ("Insurance premium - Annual", "insurance", 2500, 5000, False),
+    ("Utility payment - December", "utilities", 800, 2000, False),
+    ("Tax payment - VAT Q4", "tax_payable", 15000, 45000, False),
+    ("Audit fee - Year end", "professional_fees", 5000, 12000, False),
+]
+
+# Integer codes for GL_ACCOUNTS categories (used by the columnar generator)
+CATEGORY_KEYS = list(GL_ACCOUNTS)
+
+# Lookup arrays indexed by category code, for the columnar posting engine
+GL_CODES = np.array([GL_ACCOUNTS[key]["code"] for key in CATEGORY_KEYS])
+GL_NAMES = np.array([GL_ACCOUNTS[key]["name"] for key in CATEGORY_KEYS])
+BANK_CATEGORY = CATEGORY_KEYS.index("bank")
+
+# Memo kinds of posted lines
+MEMO_RECEIPT, MEMO_PAYMENT, MEMO_OFFSET = 0, 1, 2
+
+# Worksheet layout shared by all export paths
+HEADERS = ["Journal No", "Date", "GL Account", "Account Name", "Description", "Debit", "Credit", "Memo"]
+COLUMN_WIDTHS = [12, 12, 12, 25, 40, 15, 15, 25]
+CURRENCY_FORMAT = '#,##0.00'
+
+# Trial balance sheet column widths
+TRIAL_BALANCE_WIDTHS = [12, 30, 18, 18, 18]
+
+# Header, blank and totals rows on every journal sheet
+SHARD_OVERHEAD_ROWS = 3
+
+# Rows converted from NumPy columns to Python values at a time
+ROW_BLOCK = 65536
+
+def fx_revaluation_entries(revaluation, journal_number, date):
+    """Month-end FX revaluation journals, one per currency with an unrealised result.
+
+    ``revaluation`` is the result of ``fx_revaluation.revaluation_summary()``; gains
+    are booked as receipts and losses as payments against the FX Gain/Loss account.
+    """
+
+    entries = []
+
+    for section in revaluation["sections"]:
+        if not section["fx_gain"]:
+            continue
+
+        entries.append({
+            "journal_no": f"JE-{journal_number}",
+            "date": date.strftime("%d.%m.%Y"),
+            "description": f"FX revaluation {section['currency']} @ {section['closing_rate']:.4f}",
+            "category": "fx_gain_loss",
+            "amount": abs(section["fx_gain"]),
+            "is_incoming": section["fx_gain"] > 0
+        })
+        journal_number += 1
+
+    return entries
+
+def generate_transactions(fx_revaluation=False, seed=None):
+    """Generate mock transactions for journal entries.
+
+    With ``fx_revaluation``, the month-end FX revaluation journals computed from these
+    transactions by ``month_end_revaluation()`` are appended after the last day's
+    transactions and replace the random FX gain adjustments, which are then not drawn.
+    ``seed`` makes the month reproducible.
+    """
+
+    rng = random.Random(seed)
+    templates = TRANSACTION_TYPES
+    if fx_revaluation:
+        templates = [t for t in TRANSACTION_TYPES if t[1] != "fx_gain_loss"]
 
     transactions = []
     start_date = datetime(2024, 12, 1)
 
-    # Transaction templates: (description, category, min_amount, max_amount, is_incoming)
-    transaction_types = [
-        ("Customer payment - INV-{}", "ar", 5000, 45000, True),
-        ("Payment received - Order #{}", "ar", 1000, 12000, True),
-        ("Intercompany transfer from TechFlow UK", "interco_receivable", 15000, 80000, True),
-        ("Intercompany transfer from TechFlow DE", "interco_receivable", 20000, 60000, True),
-        ("Interest income - December", "interest_income", 100, 800, True),
-        ("FX Gain adjustment", "fx_gain_loss", 200, 1500, True),
-        ("Supplier payment - Nordic Supply Ltd", "ap", 3000, 25000, False),
-        ("Supplier payment - Alpine Systems AG", "ap", 2000, 18000, False),
-        ("Supplier payment - Central Trading Co", "ap", 5000, 30000, False),
-        ("Payroll transfer - December", "payroll", 80000, 120000, False),
-        ("Bank charges - Monthly fee", "bank_fees", 35, 75, False),
-        ("SWIFT transfer fee", "bank_fees", 20, 45, False),
-        ("Intercompany payment to TechFlow US", "interco_payable", 25000, 70000, False),
-        ("Rent payment - Office Q4", "rent", 8000, 12000, False),
-        ("Insurance premium - Annual", "insurance", 2500, 5000, False),
-        ("Utility payment - December", "utilities", 800, 2000, False),
-        ("Tax payment - VAT Q4", "tax_payable", 15000, 45000, False),
-        ("Audit fee - Year end", "professional_fees", 5000, 12000, False),
-    ]
-
     journal_number = 1001
 
     for day in range(1, 32):
         current_date = start_date + timedelta(days=day-1)
 
         # Skip weekends occasionally
-        if current_date.weekday() >= 5 and random.random() > 0.3:
+        if current_date.weekday() >= 5 and rng.random() > 0.3:
             continue
 
         # 1-4 transactions per day
-        num_transactions = random.randint(1, 4)
+        num_transactions = rng.randint(1, 4)
 
         for _ in range(num_transactions):
-            template = random.choice(transaction_types)
+            template = rng.choice(templates)
             description, category, min_amt, max_amt, is_incoming = template
 
-            amount = round(random.uniform(min_amt, max_amt), 2)
+            amount = round(rng.uniform(min_amt, max_amt), 2)
 
             # Format description with random numbers if needed
             if "{}" in description:
-                desc = description.format(random.randint(1000, 9999))
+                desc = description.format(rng.randint(1000, 9999))
             else:
                 desc = description
 
@@ -93,10 +169,728 @@ def generate_transactions():
 
             journal_number += 1
 
+    if fx_revaluation:
+        transactions.extend(fx_revaluation_entries(month_end_revaluation(transactions, seed), journal_number,
+                                                   current_date))
+
     return transactions
 
-def create_excel():
-    """Create the Excel file with journal entries in debit/credit format."""
+def generate_transactions_columnar(seed=None, start_date=datetime(2024, 12, 1), days=31, per_day=(1, 4)):
+    """Generate mock journal transactions as NumPy columns in one vectorized pass.
+
+    Same template semantics as ``generate_transactions()`` (weekends mostly skipped,
+    ``per_day`` transactions per day, one journal number per transaction), with
+    templates, amounts and references drawn in bulk. ``category`` holds indices into
+    ``CATEGORY_KEYS`` and amounts are integer cents; ``seed`` makes runs reproducible.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Day schedule: weekend days survive with 30% probability
+    day_dates = np.datetime64(start_date.date(), 'D') + np.arange(days)
+    weekend = ((day_dates.astype('int64') + 3) % 7) >= 5  # 1970-01-01 was a Thursday
+    keep = ~weekend | (rng.random(days) <= 0.3)
+    counts = rng.integers(per_day[0], per_day[1] + 1, size=days) * keep
+    dates = np.repeat(day_dates, counts)
+    n = len(dates)
+
+    template = rng.integers(0, len(TRANSACTION_TYPES), size=n).astype(np.int16)
+
+    category_codes = np.array([CATEGORY_KEYS.index(t[1]) for t in TRANSACTION_TYPES], dtype=np.int8)
+    min_amounts = np.array([t[2] for t in TRANSACTION_TYPES], dtype=np.float64)
+    max_amounts = np.array([t[3] for t in TRANSACTION_TYPES], dtype=np.float64)
+    incoming_flags = np.array([t[4] for t in TRANSACTION_TYPES])
+
+    low = min_amounts[template]
+    amount_cents = np.rint((low + (max_amounts[template] - low) * rng.random(n)) * 100).astype(np.int64)
+
+    return {
+        "journal_no": 1001 + np.arange(n, dtype=np.int64),
+        "date": dates,
+        "template": template,
+        "ref": rng.integers(1000, 10000, size=n).astype(np.int16),
+        "category": category_codes[template],
+        "amount_cents": amount_cents,
+        "is_incoming": incoming_flags[template],
+    }
+
+def _column_blocks(columns, names, block_size=ROW_BLOCK):
+    """Yield row tuples of the named columns, converting one block at a time to Python values."""
+
+    for start in range(0, len(columns[names[0]]), block_size):
+        yield from zip(*(columns[name][start:start + block_size].tolist() for name in names))
+
+def iter_columnar_rows(columns):
+    """Yield columnar transactions as the row dicts ``create_excel()`` works with."""
+
+    date_labels = {}
+
+    for journal_no, date, template, ref, amount_cents in _column_blocks(
+            columns, ("journal_no", "date", "template", "ref", "amount_cents")):
+        label = date_labels.get(date)
+        if label is None:
+            label = date_labels[date] = date.strftime("%d.%m.%Y")
+
+        description, category, _, _, is_incoming = TRANSACTION_TYPES[template]
+        if "{}" in description:
+            description = description.format(ref)
+
+        yield {
+            "journal_no": f"JE-{journal_no}",
+            "date": label,
+            "description": description,
+            "category": category,
+            "amount": amount_cents / 100,
+            "is_incoming": is_incoming
+        }
+
+def columns_from_rows(transactions):
+    """Convert row transaction dicts to the columns ``post_journal_lines()`` expects.
+
+    The inverse of ``iter_columnar_rows()`` for any source of rows, e.g. parsed bank
+    files: free-text descriptions go into a ``description`` column instead of
+    ``template`` and ``ref``. Journal numbers must be "JE-" followed by digits.
+    """
+
+    journal_no, dates, descriptions, category, amount_cents, incoming = [], [], [], [], [], []
+    category_codes = {key: code for code, key in enumerate(CATEGORY_KEYS)}
+
+    for txn in transactions:
+        prefix, _, number = txn["journal_no"].partition("-")
+        if prefix != "JE" or not number.isdigit():
+            raise ValueError(f"Journal number {txn['journal_no']!r} is not of the form JE-<digits>")
+        journal_no.append(int(number))
+        dates.append(datetime.strptime(txn["date"], "%d.%m.%Y"))
+        descriptions.append(txn["description"])
+        category.append(category_codes[txn["category"]])
+        amount_cents.append(round(txn["amount"] * 100))
+        incoming.append(txn["is_incoming"])
+
+    return {
+        "journal_no": np.array(journal_no, dtype=np.int64),
+        "date": np.array(dates, dtype="datetime64[D]"),
+        "description": np.array(descriptions, dtype=object),
+        "category": np.array(category, dtype=np.int8),
+        "amount_cents": np.array(amount_cents, dtype=np.int64),
+        "is_incoming": np.array(incoming, dtype=bool),
+    }
+
+def iter_journal_lines(transactions):
+    """Yield the two double-entry lines of each transaction as worksheet row values.
+
+    Receipts debit the bank and credit the offset account; payments the reverse.
+    Empty debit/credit cells are ``None``.
+    """
+
+    bank_account = GL_ACCOUNTS["bank"]
+
+    for txn in transactions:
+        offset_account = GL_ACCOUNTS[txn["category"]]
+        journal_no, date, description, amount = txn["journal_no"], txn["date"], txn["description"], txn["amount"]
+
+        if txn["is_incoming"]:
+            yield (journal_no, date, bank_account["code"], bank_account["name"], description,
+                   amount, None, f"Bank receipt - {date}")
+            yield (journal_no, date, offset_account["code"], offset_account["name"], description,
+                   None, amount, "Offset entry")
+        else:
+            yield (journal_no, date, bank_account["code"], bank_account["name"], description,
+                   None, amount, f"Bank payment - {date}")
+            yield (journal_no, date, offset_account["code"], offset_account["name"], description,
+                   amount, None, "Offset entry")
+
+def post_journal_lines(columns):
+    """Expand N columnar transactions into 2N debit/credit lines with array operations.
+
+    Line ``2i`` is the bank line of transaction ``i`` and line ``2i + 1`` its offset
+    line. Receipts debit the bank and credit the offset account, payments the
+    reverse. Returns a struct of arrays: ``journal_no``, ``date``, ``template``
+    and ``ref`` (or ``description`` for columns from ``columns_from_rows()``),
+    ``category`` (index into ``CATEGORY_KEYS``, ``GL_CODES`` and ``GL_NAMES``),
+    ``debit_cents``, ``credit_cents`` (0 where empty) and ``memo``
+    (``MEMO_RECEIPT``, ``MEMO_PAYMENT`` or ``MEMO_OFFSET``).
+    """
+
+    n = len(columns["journal_no"])
+    amount_cents = columns["amount_cents"]
+    incoming = columns["is_incoming"]
+
+    category = np.empty(2 * n, dtype=np.int8)
+    category[0::2] = BANK_CATEGORY
+    category[1::2] = columns["category"]
+
+    bank_debit = np.where(incoming, amount_cents, 0)
+    bank_credit = amount_cents - bank_debit
+
+    debit_cents = np.empty(2 * n, dtype=np.int64)
+    credit_cents = np.empty(2 * n, dtype=np.int64)
+    debit_cents[0::2] = bank_debit
+    debit_cents[1::2] = bank_credit
+    credit_cents[0::2] = bank_credit
+    credit_cents[1::2] = bank_debit
+
+    memo = np.full(2 * n, MEMO_OFFSET, dtype=np.int8)
+    memo[0::2] = np.where(incoming, MEMO_RECEIPT, MEMO_PAYMENT)
+
+    lines = {name: np.repeat(columns[name], 2)
+             for name in ("journal_no", "date", "template", "ref", "description") if name in columns}
+    lines.update(category=category, debit_cents=debit_cents, credit_cents=credit_cents, memo=memo)
+    return lines
+
+def _line_descriptions(lines):
+    """Yield the description of each posted line, given or built from its template and reference."""
+
+    if "description" in lines:
+        for (description,) in _column_blocks(lines, ("description",)):
+            yield description
+        return
+
+    descriptions = {}
+    for template, ref in _column_blocks(lines, ("template", "ref")):
+        description = descriptions.get((template, ref))
+        if description is None:
+            description = TRANSACTION_TYPES[template][0]
+            if "{}" in description:
+                description = description.format(ref)
+            descriptions[(template, ref)] = description
+        yield description
+
+def iter_posted_lines(lines):
+    """Yield posted lines as the worksheet row values ``iter_journal_lines()`` produces.
+
+    The amount goes on the side ``iter_journal_lines()`` puts it, even when it is zero:
+    a bank line is a debit for receipts and its offset line (which follows it) a credit.
+    """
+
+    date_labels = {}
+    codes = GL_CODES.tolist()
+    names = GL_NAMES.tolist()
+    receipt = True
+
+    for description, (journal_no, date, category, debit_cents, credit_cents, memo) in zip(
+            _line_descriptions(lines),
+            _column_blocks(lines, ("journal_no", "date", "category", "debit_cents", "credit_cents", "memo"))):
+        label = date_labels.get(date)
+        if label is None:
+            label = date_labels[date] = date.strftime("%d.%m.%Y")
+
+        if memo == MEMO_OFFSET:
+            memo_text = "Offset entry"
+            is_debit = not receipt
+        else:
+            receipt = is_debit = memo == MEMO_RECEIPT
+            memo_text = f"Bank receipt - {label}" if receipt else f"Bank payment - {label}"
+
+        yield (f"JE-{journal_no}", label, codes[category], names[category], description,
+               debit_cents / 100 if is_debit else None, None if is_debit else credit_cents / 100, memo_text)
+
+def validate_journal_lines(lines, report):
+    """Pass journal lines through, checking each journal and building a trial balance.
+
+    Lines of one journal must be consecutive, as every export writes them. Amounts
+    are compared in integer cents; every journal whose debits differ from its
+    credits is appended to ``report["unbalanced"]`` as ``(journal_no, debit_cents,
+    credit_cents)``. ``report["trial_balance"]`` maps each GL code to
+    ``[name, debit_cents, credit_cents]``. Both are complete once ``lines`` is exhausted.
+    """
+
+    trial_balance = report.setdefault("trial_balance", {})
+    unbalanced = report.setdefault("unbalanced", [])
+    journals = 0
+    current = None
+    journal_debit = 0
+    journal_credit = 0
+
+    for line in lines:
+        journal_no, _, code, name, _, debit, credit, _ = line
+
+        if journal_no != current:
+            if current is not None and journal_debit != journal_credit:
+                unbalanced.append((current, journal_debit, journal_credit))
+            current = journal_no
+            journal_debit = journal_credit = 0
+            journals += 1
+
+        debit_cents = round(debit * 100) if debit is not None else 0
+        credit_cents = round(credit * 100) if credit is not None else 0
+        journal_debit += debit_cents
+        journal_credit += credit_cents
+
+        account = trial_balance.get(code)
+        if account is None:
+            account = trial_balance[code] = [name, 0, 0]
+        account[1] += debit_cents
+        account[2] += credit_cents
+
+        yield line
+
+    if current is not None and journal_debit != journal_credit:
+        unbalanced.append((current, journal_debit, journal_credit))
+    report["journals"] = report.get("journals", 0) + journals
+
+def merge_validation(reports):
+    """Combine validation reports from separately written shards."""
+
+    merged = {"trial_balance": {}, "unbalanced": [], "journals": 0}
+
+    for report in reports:
+        for code, (name, debit_cents, credit_cents) in report["trial_balance"].items():
+            account = merged["trial_balance"].setdefault(code, [name, 0, 0])
+            account[1] += debit_cents
+            account[2] += credit_cents
+        merged["unbalanced"].extend(report["unbalanced"])
+        merged["journals"] += report["journals"]
+
+    return merged
+
+def trial_balance_table(report):
+    """Trial balance as plain rows: header, one row per GL code, totals and unbalanced journals.
+
+    Returns ``(header, rows, totals, unbalanced)``; amounts are in currency units.
+    """
+
+    header = ["GL Account", "Account Name", "Debit", "Credit", "Balance"]
+    rows = [
+        (code, name, debit_cents / 100, credit_cents / 100, (debit_cents - credit_cents) / 100)
+        for code, (name, debit_cents, credit_cents) in sorted(report["trial_balance"].items())
+    ]
+    total_debit = sum(account[1] for account in report["trial_balance"].values())
+    total_credit = sum(account[2] for account in report["trial_balance"].values())
+    totals = (None, "TOTALS", total_debit / 100, total_credit / 100, (total_debit - total_credit) / 100)
+    unbalanced = [
+        (journal_no, "Unbalanced journal", debit_cents / 100, credit_cents / 100, (debit_cents - credit_cents) / 100)
+        for journal_no, debit_cents, credit_cents in report["unbalanced"]
+    ]
+
+    return header, rows, totals, unbalanced
+
+def synthetic_journal_transactions(rows, seed=None):
+    """Iterate ``rows`` mock December journal transactions for high-volume runs."""
+
+    per_day = math.ceil(rows / WORKING_DAYS)
+    columns = generate_transactions_columnar(seed, per_day=(per_day, per_day))
+    return itertools.islice(iter_columnar_rows(columns), rows)
+
+def create_excel_write_only(transactions, output_file=OUTPUT_FILE, verbose=True):
+    """Write journal lines to a write-only workbook in constant memory.
+
+    ``transactions`` may be a generator; each line is serialized as soon as it is
+    appended. Every column has one pre-styled ``WriteOnlyCell`` whose value is
+    swapped per row, so no style objects are created per cell. Values match
+    ``create_excel()`` cell for cell, journal numbers included ("JE-1001" strings).
+    One sheet holds at most ``EXCEL_MAX_ROWS``; larger runs raise ValueError and
+    belong in ``create_excel_sharded()``.
+    """
+
+    start_time = time.perf_counter()
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Journal Entries")
+
+    # Layout must be set before the first row is written
+    for i, width in enumerate(COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    ws.freeze_panes = "A2"
+
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center_align = Alignment(horizontal='center', vertical='center')
+    right_align = Alignment(horizontal='right', vertical='center')
+
+    def styled_cell(value=None, font=None, fill=None, border=None, alignment=None, number_format=None):
+        cell = WriteOnlyCell(ws, value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if border:
+            cell.border = border
+        if alignment:
+            cell.alignment = alignment
+        if number_format:
+            cell.number_format = number_format
+        return cell
+
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+    ws.append([styled_cell(header, header_font, header_fill, thin_border, center_align) for header in HEADERS])
+
+    # One template per column: journal no, date and GL code centred, amounts right-aligned
+    line_cells = [
+        styled_cell(border=thin_border, alignment=center_align),
+        styled_cell(border=thin_border, alignment=center_align),
+        styled_cell(border=thin_border, alignment=center_align),
+        styled_cell(border=thin_border),
+        styled_cell(border=thin_border),
+        styled_cell(border=thin_border, alignment=right_align, number_format=CURRENCY_FORMAT),
+        styled_cell(border=thin_border, alignment=right_align, number_format=CURRENCY_FORMAT),
+        styled_cell(border=thin_border),
+    ]
+
+    lines = 0
+    total_debits = 0
+    total_credits = 0
+    report = {}
+
+    for line in validate_journal_lines(iter_journal_lines(transactions), report):
+        if lines + 1 + SHARD_OVERHEAD_ROWS > xlsx.EXCEL_MAX_ROWS:
+            raise ValueError("Journal lines exceed Excel's row limit; use create_excel_sharded()")
+
+        # Empty debit/credit cells hold "", as in create_excel()
+        for cell, value in zip(line_cells, line):
+            cell.value = "" if value is None else value
+        ws.append(line_cells)
+
+        if line[5] is not None:
+            total_debits += line[5]
+        if line[6] is not None:
+            total_credits += line[6]
+        lines += 1
+
+    # Totals row after a blank row
+    total_debits = round(total_debits, 2)
+    total_credits = round(total_credits, 2)
+    bold = Font(bold=True)
+    ws.append([])
+    ws.append([None, None, None, None,
+               styled_cell("TOTALS", bold),
+               styled_cell(total_debits, bold, alignment=right_align, number_format=CURRENCY_FORMAT),
+               styled_cell(total_credits, bold, alignment=right_align, number_format=CURRENCY_FORMAT)])
+
+    # Trial balance from the same pass, on its own sheet
+    header, rows, totals, unbalanced = trial_balance_table(report)
+    tb = wb.create_sheet("Trial Balance")
+    for i, width in enumerate(TRIAL_BALANCE_WIDTHS, 1):
+        tb.column_dimensions[get_column_letter(i)].width = width
+    tb.freeze_panes = "A2"
+    tb.append([styled_cell(value, header_font, header_fill, thin_border, center_align) for value in header])
+
+    def account_row(values):
+        return ([styled_cell(values[0], border=thin_border, alignment=center_align),
+                 styled_cell(values[1], border=thin_border)]
+                + [styled_cell(value, border=thin_border, alignment=right_align, number_format=CURRENCY_FORMAT)
+                   for value in values[2:]])
+
+    for values in rows:
+        tb.append(account_row(values))
+    tb.append([])
+    tb.append([None, styled_cell(totals[1], bold)]
+              + [styled_cell(value, bold, alignment=right_align, number_format=CURRENCY_FORMAT) for value in totals[2:]])
+    if unbalanced:
+        tb.append([])
+        for values in unbalanced:
+            tb.append(account_row(values))
+
+    wb.save(output_file)
+
+    stats = {"output_file": output_file, "lines": lines, "total_debits": total_debits, "total_credits": total_credits,
+             "validation": report}
+    if verbose:
+        _print_export_stats(stats, time.perf_counter() - start_time)
+    return stats
+
+def _journal_sheet(name, lines, stats):
+    """Sheet spec for ``xlsx_stream_writer`` with journal lines and a totals row.
+
+    Line count and debit/credit totals are accumulated into ``stats`` while the rows
+    are written, and the totals row is built from them once the body is done. The
+    lines are validated on the way through; ``stats["validation"]`` holds the report.
+    """
+
+    stats.update(lines=0, total_debits=0, total_credits=0, validation={})
+    lines = validate_journal_lines(lines, stats["validation"])
+
+    def rows():
+        total_debits = 0
+        total_credits = 0
+        count = 0
+        for line in lines:
+            if line[5] is not None:
+                total_debits += line[5]
+            if line[6] is not None:
+                total_credits += line[6]
+            count += 1
+            yield line
+        stats.update(lines=count, total_debits=round(total_debits, 2), total_credits=round(total_credits, 2))
+
+    def totals():
+        # Blank row, then the totals
+        return [
+            (None, None),
+            ([None, None, None, None, "TOTALS", stats["total_debits"], stats["total_credits"]],
+             [0, 0, 0, 0, xlsx.STYLE_BOLD, xlsx.STYLE_BOLD_AMOUNT, xlsx.STYLE_BOLD_AMOUNT]),
+        ]
+
+    return {
+        "name": name,
+        "header": HEADERS,
+        "column_widths": COLUMN_WIDTHS,
+        "column_styles": [xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_TEXT,
+                          xlsx.STYLE_TEXT, xlsx.STYLE_AMOUNT, xlsx.STYLE_AMOUNT, xlsx.STYLE_TEXT],
+        "rows": rows(),
+        "footer": totals,
+    }
+
+def _trial_balance_sheet(report):
+    """Sheet spec for the trial balance; rows are read from ``report`` only when the sheet is written."""
+
+    amount_styles = [xlsx.STYLE_CENTER, xlsx.STYLE_TEXT, xlsx.STYLE_AMOUNT, xlsx.STYLE_AMOUNT, xlsx.STYLE_AMOUNT]
+
+    def rows():
+        yield from trial_balance_table(report)[1]
+
+    def footer():
+        _, _, totals, unbalanced = trial_balance_table(report)
+        footer_rows = [(None, None), (totals, [0, xlsx.STYLE_BOLD] + [xlsx.STYLE_BOLD_AMOUNT] * 3)]
+        if unbalanced:
+            footer_rows.append((None, None))
+            footer_rows.extend((row, amount_styles) for row in unbalanced)
+        return footer_rows
+
+    return {
+        "name": "Trial Balance",
+        "header": trial_balance_table({"trial_balance": {}, "unbalanced": []})[0],
+        "column_widths": TRIAL_BALANCE_WIDTHS,
+        "column_styles": amount_styles,
+        "rows": rows(),
+        "footer": footer,
+    }
+
+def create_excel_streaming(transactions, output_file=OUTPUT_FILE, verbose=True, sinks=()):
+    """Write journal lines with the direct SpreadsheetML writer in ``xlsx_stream_writer``.
+
+    Same layout as ``create_excel()`` (styled header, frozen pane, column widths,
+    bordered lines, totals row), but rows are formatted straight into the sheet XML
+    without any per-cell Python objects. The same lines are written in batches to any
+    ``output_sinks`` given in ``sinks``.
+    """
+
+    start_time = time.perf_counter()
+    stats = {"output_file": output_file}
+
+    lines = iter_journal_lines(transactions)
+    if sinks:
+        lines = output_sinks.tee_to_sinks(lines, sinks)
+    journal_sheet = _journal_sheet("Journal Entries", lines, stats)
+    xlsx.write_workbook(output_file, [journal_sheet, _trial_balance_sheet(stats["validation"])])
+
+    if verbose:
+        _print_export_stats(stats, time.perf_counter() - start_time)
+        for sink in sinks:
+            print(f"Also written to: {sink.path}")
+    return stats
+
+def export_journal(transactions, output_files, verbose=True):
+    """Write journal lines to CSV, .npz or .parquet files (by extension) in one pass.
+
+    Every file is fed from the same line stream through ``output_sinks``; the lines
+    are validated on the way, as in the workbook exports.
+    """
+
+    start_time = time.perf_counter()
+    report = {}
+
+    sinks = [output_sinks.open_sink(path, HEADERS) for path in output_files]
+    lines = output_sinks.write_to_sinks(validate_journal_lines(iter_journal_lines(transactions), report), sinks)
+    elapsed = time.perf_counter() - start_time
+
+    if verbose:
+        for path in output_files:
+            print(f"Journal lines written: {path}")
+        print(f"Total rows (debit + credit lines): {lines:,}")
+        _print_validation(report)
+        print(f"Throughput: {lines / elapsed if elapsed else 0.0:,.0f} lines/sec ({elapsed:.1f}s)")
+        print_peak_rss()
+    return {"output_files": output_files, "lines": lines, "validation": report}
+
+def plan_shards(line_counts, max_rows=xlsx.EXCEL_MAX_ROWS):
+    """Cut journals into shards of at most ``max_rows`` worksheet rows.
+
+    ``line_counts`` holds the number of lines per journal, in order. A journal is
+    never split across shards, and every shard keeps room for its header and
+    totals rows. Returns ``(start, end)`` journal index ranges.
+    """
+
+    capacity = max_rows - SHARD_OVERHEAD_ROWS
+    line_counts = np.asarray(line_counts)
+    if line_counts.max(initial=0) > capacity:
+        raise ValueError(f"A journal has more lines than fit on a {max_rows:,}-row sheet")
+
+    cumulative = np.cumsum(line_counts)
+    shards = []
+    start = 0
+    written = 0
+
+    while start < len(line_counts):
+        end = int(np.searchsorted(cumulative, written + capacity, side="right"))
+        shards.append((start, end))
+        written = int(cumulative[end - 1])
+        start = end
+
+    return shards
+
+def _write_shard(part_file, columns, sheet_name, as_workbook):
+    """Write one shard as a sheet part (or a whole workbook); runs inside a worker process."""
+
+    stats = {}
+    sheet = _journal_sheet(sheet_name, iter_posted_lines(post_journal_lines(columns)), stats)
+    if as_workbook:
+        xlsx.write_workbook(part_file, [sheet])
+    else:
+        xlsx.write_sheet_part(part_file, sheet)
+    return stats
+
+def _index_sheet(shards):
+    """Index sheet listing each shard's location, journal and date ranges and totals."""
+
+    rows = [
+        (i, shard["location"], shard["first_journal"], shard["last_journal"], shard["first_date"],
+         shard["last_date"], shard["lines"], shard["total_debits"], shard["total_credits"])
+        for i, shard in enumerate(shards, 1)
+    ]
+    total_debits = round(sum(shard["total_debits"] for shard in shards), 2)
+    total_credits = round(sum(shard["total_credits"] for shard in shards), 2)
+
+    return {
+        "name": "Index",
+        "header": ["Shard", "Location", "First Journal", "Last Journal", "First Date", "Last Date",
+                   "Lines", "Total Debits", "Total Credits"],
+        "column_widths": [8, 36, 14, 14, 12, 12, 12, 18, 18],
+        "column_styles": [xlsx.STYLE_CENTER, xlsx.STYLE_TEXT, xlsx.STYLE_CENTER, xlsx.STYLE_CENTER,
+                          xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_AMOUNT,
+                          xlsx.STYLE_AMOUNT],
+        "rows": rows,
+        "footer": [
+            (None, None),
+            ([None, "TOTALS", None, None, None, None, sum(shard["lines"] for shard in shards),
+              total_debits, total_credits],
+             [0, xlsx.STYLE_BOLD, 0, 0, 0, 0, xlsx.STYLE_BOLD, xlsx.STYLE_BOLD_AMOUNT, xlsx.STYLE_BOLD_AMOUNT]),
+        ],
+    }
+
+def create_excel_sharded(columns, output_file=OUTPUT_FILE, max_rows=xlsx.EXCEL_MAX_ROWS,
+                         split_files=False, workers=None, verbose=True):
+    """Write a journal run of any size as row-limited shards, rendered in parallel.
+
+    ``columns`` come from ``generate_transactions_columnar()``; row transaction dicts
+    (parsed bank files, ``generate_transactions()``) are converted with
+    ``columns_from_rows()``. Journals are cut into
+    shards with ``plan_shards()``; each shard repeats the header and ends with its
+    own totals. Shards are rendered on a process pool, then either assembled as
+    sheets of one workbook behind an Index sheet, or (``split_files``) written as
+    separate workbooks next to ``output_file``, which then holds only the index.
+    """
+
+    start_time = time.perf_counter()
+    if not isinstance(columns, dict):
+        columns = columns_from_rows(columns)
+
+    # Every journal posts one debit and one credit line
+    shard_ranges = plan_shards(np.full(len(columns["journal_no"]), 2), max_rows)
+    base, ext = os.path.splitext(output_file)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        shards = []
+        for i, (start, end) in enumerate(shard_ranges, 1):
+            name = f"Journal Entries {i}"
+            if split_files:
+                part_file = location = f"{base}_part{i:03d}{ext}"
+            else:
+                part_file = os.path.join(tmp_dir, f"sheet{i}.xml")
+                location = f"Sheet '{name}'"
+
+            futures.append(pool.submit(
+                _write_shard, part_file, {key: values[start:end] for key, values in columns.items()},
+                name, split_files
+            ))
+            shards.append({
+                "name": name,
+                "part": part_file,
+                "location": os.path.basename(location),
+                "first_journal": f"JE-{columns['journal_no'][start]}",
+                "last_journal": f"JE-{columns['journal_no'][end - 1]}",
+                "first_date": f"{columns['date'][start].item():%d.%m.%Y}",
+                "last_date": f"{columns['date'][end - 1].item():%d.%m.%Y}",
+            })
+
+        for shard, future in zip(shards, futures):
+            shard.update(future.result())
+
+        # Journals never span shards, so the per-shard checks together cover every journal
+        validation = merge_validation(shard["validation"] for shard in shards)
+
+        sheets = [_index_sheet(shards)]
+        if not split_files:
+            sheets.extend({"name": shard["name"], "part": shard["part"]} for shard in shards)
+        sheets.append(_trial_balance_sheet(validation))
+        xlsx.write_workbook(output_file, sheets)
+
+    stats = {
+        "output_file": output_file,
+        "shards": len(shards),
+        "lines": sum(shard["lines"] for shard in shards),
+        "total_debits": sum(shard["total_debits"] for shard in shards),
+        "total_credits": sum(shard["total_credits"] for shard in shards),
+        "validation": validation,
+    }
+    if verbose:
+        _print_export_stats(stats, time.perf_counter() - start_time)
+        print(f"Shards: {len(shards)} {'files' if split_files else 'sheets'} of at most {max_rows:,} rows")
+    return stats
+
+def _print_validation(report):
+    """Print the per-journal check, listing every unbalanced journal."""
+
+    unbalanced = report["unbalanced"]
+    if not unbalanced:
+        print(f"Journal check: all {report['journals']:,} journals balanced")
+        return
+
+    print(f"Journal check: {len(unbalanced):,} of {report['journals']:,} journals UNBALANCED")
+    for journal_no, debit_cents, credit_cents in unbalanced:
+        print(f"  {journal_no}: debits {debit_cents / 100:,.2f}, credits {credit_cents / 100:,.2f}, "
+              f"difference {(debit_cents - credit_cents) / 100:+,.2f}")
+
+def _print_export_stats(stats, elapsed):
+    """Print the summary shared by the high-volume export paths."""
+
+    lines = stats["lines"]
+    total_debits = stats["total_debits"]
+    total_credits = stats["total_credits"]
+
+    print(f"Excel file generated: {stats['output_file']}")
+    print(f"Total journal entries: {lines // 2:,}")
+    print(f"Total rows (debit + credit lines): {lines:,}")
+    print(f"Total Debits: CHF {total_debits:,.2f}")
+    print(f"Total Credits: CHF {total_credits:,.2f}")
+    print(f"Balance check: {'BALANCED' if abs(total_debits - total_credits) < 0.01 else 'UNBALANCED'}")
+    _print_validation(stats["validation"])
+    print(f"Throughput: {lines / elapsed if elapsed else 0.0:,.0f} lines/sec ({elapsed:.1f}s)")
+    print_peak_rss()
+
+def classify_transactions(transactions, classifier):
+    """Yield transactions with the GL category ``classifier`` picks from each description.
+
+    Transactions no rule matches keep the category they have.
+    """
+
+    for txn in transactions:
+        yield dict(txn, category=classifier.classify(txn["description"]) or txn["category"])
+
+def create_excel(fx_revaluation=False, transactions=None, output_file=OUTPUT_FILE, classifier=None, seed=None):
+    """Create the Excel file with journal entries in debit/credit format.
+
+    ``transactions`` may be any iterable of journal transaction dicts, e.g. parsed
+    bank files passed through ``statement_parsers.iter_journal_rows()``. With a
+    ``gl_classifier.GLClassifier`` each transaction's GL category is picked from its
+    description, keeping the category it has where no rule matches. Runs too large for
+    one sheet are handed to ``create_excel_sharded()``.
+    """
 
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -113,21 +907,10 @@ def create_excel():
     )
     center_align = Alignment(horizontal='center', vertical='center')
     right_align = Alignment(horizontal='right', vertical='center')
-    currency_format = '#,##0.00'
+    currency_format = CURRENCY_FORMAT
 
     # Headers
-    headers = [
-        "Journal No",
-        "Date",
-        "GL Account",
-        "Account Name",
-        "Description",
-        "Debit",
-        "Credit",
-        "Memo"
-    ]
-
-    for col, header in enumerate(headers, 1):
+    for col, header in enumerate(HEADERS, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
         cell.fill = header_fill
@@ -135,97 +918,43 @@ def create_excel():
         cell.alignment = center_align
 
     # Generate transactions
-    transactions = generate_transactions()
+    if transactions is None:
+        transactions = generate_transactions(fx_revaluation, seed)
+    if classifier is not None:
+        transactions = classify_transactions(transactions, classifier)
+    transactions = list(transactions)
+
+    if 2 * len(transactions) + SHARD_OVERHEAD_ROWS > xlsx.EXCEL_MAX_ROWS:
+        print(f"{len(transactions):,} journals exceed Excel's row limit; writing row-limited shards")
+        return create_excel_sharded(transactions, output_file)
 
     row = 2
     total_debits = 0
     total_credits = 0
 
-    for txn in transactions:
-        # For each transaction, we create TWO rows (double-entry bookkeeping)
-        # Row 1: Bank account entry
-        # Row 2: Offset account entry
-
-        bank_account = GL_ACCOUNTS["bank"]
-        offset_account = GL_ACCOUNTS[txn["category"]]
+    # Two rows per transaction (double-entry bookkeeping): bank account, then offset account
+    report = {}
+    for line in validate_journal_lines(iter_journal_lines(transactions), report):
+        for col, value in enumerate(line, 1):
+            cell = ws.cell(row=row, column=col, value="" if value is None else value)
+            cell.border = thin_border
+            if col <= 3:
+                cell.alignment = center_align
+            elif col in (6, 7) and value is not None:
+                cell.number_format = currency_format
+                cell.alignment = right_align
 
-        if txn["is_incoming"]:
-            # Money coming in: Debit Bank, Credit offset
-            # Row 1: Debit Bank
-            ws.cell(row=row, column=1, value=txn["journal_no"]).alignment = center_align
-            ws.cell(row=row, column=2, value=txn["date"]).alignment = center_align
-            ws.cell(row=row, column=3, value=bank_account["code"]).alignment = center_align
-            ws.cell(row=row, column=4, value=bank_account["name"])
-            ws.cell(row=row, column=5, value=txn["description"])
-            debit_cell = ws.cell(row=row, column=6, value=txn["amount"])
-            debit_cell.number_format = currency_format
-            debit_cell.alignment = right_align
-            ws.cell(row=row, column=7, value="")  # Credit is empty
-            ws.cell(row=row, column=8, value=f"Bank receipt - {txn['date']}")
-
-            total_debits += txn["amount"]
-
-            for col in range(1, 9):
-                ws.cell(row=row, column=col).border = thin_border
-
-            row += 1
-
-            # Row 2: Credit offset account
-            ws.cell(row=row, column=1, value=txn["journal_no"]).alignment = center_align
-            ws.cell(row=row, column=2, value=txn["date"]).alignment = center_align
-            ws.cell(row=row, column=3, value=offset_account["code"]).alignment = center_align
-            ws.cell(row=row, column=4, value=offset_account["name"])
-            ws.cell(row=row, column=5, value=txn["description"])
-            ws.cell(row=row, column=6, value="")  # Debit is empty
-            credit_cell = ws.cell(row=row, column=7, value=txn["amount"])
-            credit_cell.number_format = currency_format
-            credit_cell.alignment = right_align
-            ws.cell(row=row, column=8, value="Offset entry")
-
-            total_credits += txn["amount"]
-
-        else:
-            # Money going out: Credit Bank, Debit offset
-            # Row 1: Credit Bank
-            ws.cell(row=row, column=1, value=txn["journal_no"]).alignment = center_align
-            ws.cell(row=row, column=2, value=txn["date"]).alignment = center_align
-            ws.cell(row=row, column=3, value=bank_account["code"]).alignment = center_align
-            ws.cell(row=row, column=4, value=bank_account["name"])
-            ws.cell(row=row, column=5, value=txn["description"])
-            ws.cell(row=row, column=6, value="")  # Debit is empty
-            credit_cell = ws.cell(row=row, column=7, value=txn["amount"])
-            credit_cell.number_format = currency_format
-            credit_cell.alignment = right_align
-            ws.cell(row=row, column=8, value=f"Bank payment - {txn['date']}")
-
-            total_credits += txn["amount"]
-
-            for col in range(1, 9):
-                ws.cell(row=row, column=col).border = thin_border
-
-            row += 1
-
-            # Row 2: Debit offset account
-            ws.cell(row=row, column=1, value=txn["journal_no"]).alignment = center_align
-            ws.cell(row=row, column=2, value=txn["date"]).alignment = center_align
-            ws.cell(row=row, column=3, value=offset_account["code"]).alignment = center_align
-            ws.cell(row=row, column=4, value=offset_account["name"])
-            ws.cell(row=row, column=5, value=txn["description"])
-            debit_cell = ws.cell(row=row, column=6, value=txn["amount"])
-            debit_cell.number_format = currency_format
-            debit_cell.alignment = right_align
-            ws.cell(row=row, column=7, value="")  # Credit is empty
-            ws.cell(row=row, column=8, value="Offset entry")
-
-            total_debits += txn["amount"]
-
-        for col in range(1, 9):
-            ws.cell(row=row, column=col).border = thin_border
+        if line[5] is not None:
+            total_debits += line[5]
+        if line[6] is not None:
+            total_credits += line[6]
 
         row += 1
 
     # Add totals row
     row += 1
+    total_debits = round(total_debits, 2)
+    total_credits = round(total_credits, 2)
     ws.cell(row=row, column=5, value="TOTALS").font = Font(bold=True)
     total_debit_cell = ws.cell(row=row, column=6, value=total_debits)
     total_debit_cell.number_format = currency_format
@@ -238,21 +967,175 @@ def create_excel():
     total_credit_cell.alignment = right_align
 
     # Adjust column widths
-    column_widths = [12, 12, 12, 25, 40, 15, 15, 25]
-    for i, width in enumerate(column_widths, 1):
+    for i, width in enumerate(COLUMN_WIDTHS, 1):
         ws.column_dimensions[get_column_letter(i)].width = width
 
     # Freeze header row
     ws.freeze_panes = "A2"
 
+    # Trial balance, built while the lines were written
+    tb = wb.create_sheet("Trial Balance")
+    header, rows, totals, unbalanced = trial_balance_table(report)
+
+    for col, value in enumerate(header, 1):
+        cell = tb.cell(row=1, column=col, value=value)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = thin_border
+        cell.alignment = center_align
+
+    def write_account_row(tb_row, values, font=None, border=thin_border):
+        for col, value in enumerate(values, 1):
+            if value is None:
+                continue
+            cell = tb.cell(row=tb_row, column=col, value=value)
+            if border:
+                cell.border = border
+            if font:
+                cell.font = font
+            if col == 1:
+                cell.alignment = center_align
+            elif col >= 3:
+                cell.number_format = currency_format
+                cell.alignment = right_align
+
+    tb_row = 2
+    for values in rows:
+        write_account_row(tb_row, values)
+        tb_row += 1
+    write_account_row(tb_row + 1, totals, font=Font(bold=True), border=None)
+    tb_row += 3
+    for values in unbalanced:
+        write_account_row(tb_row, values)
+        tb_row += 1
+
+    for i, width in enumerate(TRIAL_BALANCE_WIDTHS, 1):
+        tb.column_dimensions[get_column_letter(i)].width = width
+    tb.freeze_panes = "A2"
+
     # Save
-    wb.save(OUTPUT_FILE)
-    print(f"Excel file generated: {OUTPUT_FILE}")
+    wb.save(output_file)
+    print(f"Excel file generated: {output_file}")
     print(f"Total journal entries: {len(transactions)}")
     print(f"Total rows (debit + credit lines): {(row - 3)}")
     print(f"Total Debits: CHF {total_debits:,.2f}")
     print(f"Total Credits: CHF {total_credits:,.2f}")
     print(f"Balance check: {'BALANCED' if abs(total_debits - total_credits) < 0.01 else 'UNBALANCED'}")
+    _print_validation(report)
+    if classifier is not None:
+        classified = classifier.report()
+        print(f"Classified: {classified['classified']:,} descriptions, "
+              f"{classified['unmatched']:,} unmatched ({classified['unmatched_rate']:.1%})")
+
+def month_end_revaluation(transactions, seed=None):
+    """Revalue the bank account behind ``transactions`` at the December closing rates.
+
+    The bank account is the multi-currency account of the statements: each
+    transaction is assigned one of its currencies with the statement's activity
+    weights, and its CHF journal amount is the amount in that currency booked at the
+    day's rate. The unrealised FX result is then the difference to the closing rates.
+    """
+
+    from fx_revaluation import load_fx_rates, lookup_rates, revaluation_summary
+    from generate_bank_statement_pdf import CURRENCY_WEIGHTS, OPENING_BALANCES, START_DATE, PERIOD_DAYS
+
+    columns = columns_from_rows(transactions)
+    currency_codes = list(OPENING_BALANCES)
+    rng = np.random.default_rng(None if seed is None else (seed, 2))
+    currency = rng.choice(len(currency_codes), size=len(columns["amount_cents"]), p=CURRENCY_WEIGHTS)
+
+    fx_rates = load_fx_rates()
+    signed_cents = np.where(columns["is_incoming"], columns["amount_cents"], -columns["amount_cents"])
+    rates = lookup_rates(fx_rates, currency_codes, currency, columns["date"])
+    amount_cents = np.rint(signed_cents / rates).astype(np.int64)
+
+    return revaluation_summary(
+        fx_rates, currency_codes, currency, columns["date"], amount_cents, OPENING_BALANCES, START_DATE,
+        START_DATE + timedelta(days=PERIOD_DAYS - 1)
+    )
 
 if __name__ == "__main__":
-    create_excel()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--write-only", type=int, metavar="ROWS",
+                        help="write ROWS synthetic transactions (2 lines each) in constant-memory write-only mode; "
+                             "runs past Excel's row limit (524,286 transactions) are written as --sharded shards")
+    parser.add_argument("--streaming", type=int, metavar="ROWS",
+                        help="write ROWS synthetic transactions with the direct SpreadsheetML writer")
+    parser.add_argument("--sharded", type=int, metavar="ROWS",
+                        help="write ROWS synthetic transactions as row-limited shards in parallel")
+    parser.add_argument("--max-rows", type=int, default=xlsx.EXCEL_MAX_ROWS, help="rows per shard for --sharded")
+    parser.add_argument("--split-files", action="store_true", help="write --sharded shards as separate workbooks")
+    parser.add_argument("--workers", type=int, help="worker processes for --sharded (default: CPU count)")
+    parser.add_argument("--post", type=int, metavar="ROWS",
+                        help="time the columnar posting engine on ROWS synthetic transactions")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="output workbook path")
+    parser.add_argument("--sink", action="append", metavar="FILE",
+                        help="write the journal lines to a .csv, .npz or .parquet file (repeatable): alongside "
+                             "the --streaming workbook, or instead of the December journal workbook")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible synthetic months")
+    parser.add_argument("--fx-revaluation", action="store_true",
+                        help="book month-end FX revaluation journals instead of the random FX gain adjustments")
+    parser.add_argument("--statement", metavar="FILE",
+                        help="post an MT940 or camt.053 bank file instead of the synthetic December journal")
+    parser.add_argument("--classify", action="store_true",
+                        help="pick GL categories from the descriptions with the rules in --rules")
+    parser.add_argument("--rules", help="rules CSV for --classify (default: gl_classification_rules.csv)")
+    args = parser.parse_args()
+
+    modes = [name for name in ("write_only", "streaming", "sharded", "post") if getattr(args, name)]
+    if len(modes) > 1:
+        parser.error(" and ".join(f"--{name.replace('_', '-')}" for name in modes) + " cannot be combined")
+    if args.sink and modes and modes != ["streaming"]:
+        parser.error("--sink works with --streaming or the December journal only")
+    if modes and (args.statement or args.classify or args.fx_revaluation):
+        parser.error("--statement, --classify and --fx-revaluation apply to the December journal only")
+    if args.statement and args.fx_revaluation:
+        parser.error("--fx-revaluation applies to the synthetic December journal, not to --statement")
+    if not args.sharded and (args.split_files or args.workers or args.max_rows != xlsx.EXCEL_MAX_ROWS):
+        parser.error("--max-rows, --split-files and --workers apply to --sharded only")
+
+    if args.post:
+        per_day = math.ceil(args.post / WORKING_DAYS)
+        columns = generate_transactions_columnar(args.seed, per_day=(per_day, per_day))
+        columns = {name: values[:args.post] for name, values in columns.items()}
+        start_time = time.perf_counter()
+        lines = post_journal_lines(columns)
+        elapsed = time.perf_counter() - start_time
+        num_txns = len(columns["journal_no"])
+        print(f"Posted {num_txns:,} transactions into {len(lines['journal_no']):,} lines in {elapsed:.2f}s "
+              f"({num_txns / elapsed:,.0f} transactions/sec)")
+        print(f"Balance check: {'BALANCED' if lines['debit_cents'].sum() == lines['credit_cents'].sum() else 'UNBALANCED'}")
+        print_peak_rss()
+    elif args.sharded:
+        per_day = math.ceil(args.sharded / WORKING_DAYS)
+        columns = generate_transactions_columnar(args.seed, per_day=(per_day, per_day))
+        columns = {name: values[:args.sharded] for name, values in columns.items()}
+        create_excel_sharded(columns, args.output, args.max_rows, args.split_files, args.workers)
+    elif args.streaming:
+        create_excel_streaming(synthetic_journal_transactions(args.streaming, args.seed), args.output,
+                               sinks=[output_sinks.open_sink(path, HEADERS) for path in args.sink or []])
+    elif args.write_only and 2 * args.write_only + SHARD_OVERHEAD_ROWS > xlsx.EXCEL_MAX_ROWS:
+        print(f"{args.write_only:,} journals exceed Excel's row limit; writing row-limited shards")
+        per_day = math.ceil(args.write_only / WORKING_DAYS)
+        columns = generate_transactions_columnar(args.seed, per_day=(per_day, per_day))
+        create_excel_sharded({name: values[:args.write_only] for name, values in columns.items()}, args.output)
+    elif args.write_only:
+        create_excel_write_only(synthetic_journal_transactions(args.write_only, args.seed), args.output)
+    else:
+        classifier = None
+        if args.classify:
+            from gl_classifier import GLClassifier, load_rules
+            classifier = GLClassifier(load_rules(args.rules) if args.rules else None)
+        transactions = None
+        if args.statement:
+            from statement_parsers import iter_journal_rows, parse_statement_file
+            transactions = iter_journal_rows(parse_statement_file(args.statement))
+
+        if args.sink:
+            if transactions is None:
+                transactions = generate_transactions(args.fx_revaluation, args.seed)
+            if classifier is not None:
+                transactions = classify_transactions(transactions, classifier)
+            export_journal(transactions, args.sink)
+        else:
+            create_excel(args.fx_revaluation, transactions, args.output, classifier, args.seed)
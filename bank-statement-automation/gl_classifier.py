@@ -0,0 +1,147 @@
+"""
+Rule-based classifier from bank statement descriptions to GL_ACCOUNTS categories.
+Keyword and regex rules are read from a local CSV and compiled into one alternation, so each
+description is scanned once; results are memoized in an LRU cache because bank descriptions
+repeat heavily.
+"""
+
+import argparse
+import csv
+import functools
+import itertools
+import os
+import re
+import time
+
+from generate_journal_entries_excel import GL_ACCOUNTS
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gl_classification_rules.csv")
+
+# Memoized descriptions kept, least recently used evicted first (bounds memory on unique references)
+CACHE_SIZE = 1 << 16
+
+# Regex constructs that change meaning or fail inside the shared alternation: backreferences,
+# named groups (their names must be unique across rules), conditionals and global inline flags
+_STANDALONE_CONSTRUCTS = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(|\(\?[aiLmsux]+\)")
+
+def load_rules(path=RULES_FILE):
+    """Read ``(match, pattern, category)`` rules; ``match`` is "keyword" or "regex"."""
+
+    rules = []
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, row in enumerate(csv.DictReader(f), 2):
+            match, pattern, category = row["match"].strip(), row["pattern"], row["category"].strip()
+            if match not in ("keyword", "regex"):
+                raise ValueError(f"{path}:{line_no}: unknown match type {match!r}")
+            if category not in GL_ACCOUNTS:
+                raise ValueError(f"{path}:{line_no}: unknown GL category {category!r}")
+            rules.append((match, pattern, category))
+
+    return rules
+
+def compile_rules(rules):
+    """Compile the rules into one case-insensitive alternation with a named group per rule.
+
+    Keywords match on word boundaries. Regex rules with backreferences, named groups,
+    conditionals or global inline flags are compiled on their own instead, as
+    ``(index, pattern, category)``. The leftmost match in a description wins; at the
+    same position the rule listed first wins. Returns ``(pattern, categories,
+    standalone)``, where ``pattern`` is None when no rule is in the alternation.
+    """
+
+    alternatives = []
+    categories = {}
+    standalone = []
+
+    for i, (match, pattern, category) in enumerate(rules):
+        if match == "keyword":
+            pattern = r"\b" + re.escape(pattern.strip()) + r"\b"
+        try:
+            compiled = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"rule {i + 1} ({pattern!r}): invalid regex: {e}") from None
+
+        if match == "regex" and _STANDALONE_CONSTRUCTS.search(pattern):
+            standalone.append((i, compiled, category))
+        else:
+            alternatives.append(f"(?P<r{i}>{pattern})")
+            categories[f"r{i}"] = category
+
+    combined = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+    return combined, categories, standalone
+
+class GLClassifier:
+    """Classify descriptions with compiled rules, memoizing results and counting matches."""
+
+    def __init__(self, rules=None, cache_size=CACHE_SIZE):
+        self.pattern, self.categories, self.standalone = compile_rules(load_rules() if rules is None else rules)
+        self._cached_match = functools.lru_cache(maxsize=cache_size)(self._match)
+        self.classified = 0
+        self.unmatched = 0
+        self.unmatched_examples = {}
+
+    def _match(self, description):
+        """Category of the leftmost matching rule, the first listed on ties."""
+
+        best, category = None, None
+
+        match = self.pattern.search(description) if self.pattern is not None else None
+        if match:
+            best, category = (match.start(), int(match.lastgroup[1:])), self.categories[match.lastgroup]
+
+        for index, pattern, rule_category in self.standalone:
+            match = pattern.search(description)
+            if match and (best is None or (match.start(), index) < best):
+                best, category = (match.start(), index), rule_category
+
+        return category
+
+    def classify(self, description):
+        """GL category for ``description``, or ``None`` when no rule matches."""
+
+        category = self._cached_match(description)
+
+        self.classified += 1
+        if category is None:
+            self.unmatched += 1
+            if len(self.unmatched_examples) < 20:
+                self.unmatched_examples[description] = self.unmatched_examples.get(description, 0) + 1
+
+        return category
+
+    def report(self):
+        """Counts and rates for the descriptions classified so far."""
+
+        return {
+            "classified": self.classified,
+            "unmatched": self.unmatched,
+            "unmatched_rate": self.unmatched / self.classified if self.classified else 0.0,
+            "cache_hit_rate": self._cached_match.cache_info().hits / self.classified if self.classified else 0.0,
+            "unmatched_examples": dict(self.unmatched_examples),
+        }
+
+if __name__ == "__main__":
+    from generate_bank_statement_pdf import synthetic_transactions
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="synthetic bank descriptions to classify")
+    parser.add_argument("--rules", default=RULES_FILE, help="rules CSV (match, pattern, category)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    descriptions = [txn["description"] for txn in synthetic_transactions(args.rows, seed=args.seed)]
+    classifier = GLClassifier(load_rules(args.rules))
+
+    start_time = time.perf_counter()
+    for description in descriptions:
+        classifier.classify(description)
+    elapsed = time.perf_counter() - start_time
+
+    report = classifier.report()
+    print(f"Classified {report['classified']:,} descriptions in {elapsed:.2f}s "
+          f"({report['classified'] / elapsed * 60:,.0f} lines/min)")
+    print(f"Unmatched: {report['unmatched']:,} ({report['unmatched_rate']:.2%}), "
+          f"cache hit rate {report['cache_hit_rate']:.1%}")
+    for description, count in itertools.islice(report["unmatched_examples"].items(), 10):
+        print(f"  unmatched: {description!r} ({count:,})")
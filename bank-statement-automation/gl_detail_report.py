@@ -0,0 +1,217 @@
+"""
+General-ledger detail report: posted journal lines grouped by GL account with running balances.
+Lines from the posting engine are ordered by one stable sort on (GL code, date, journal number)
+and balanced with one cumulative sum rebased at each account's opening balance, then written
+with one sheet per account (continued on further sheets past Excel's row limit).
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+import xlsx_stream_writer as xlsx
+from peak_memory import print_peak_rss
+from generate_bank_statement_pdf import WORKING_DAYS
+from generate_journal_entries_excel import (
+    CATEGORY_KEYS,
+    GL_CODES,
+    GL_NAMES,
+    _column_blocks,
+    _line_descriptions,
+    generate_transactions_columnar,
+    post_journal_lines,
+)
+
+OUTPUT_FILE = "gl_detail_december_2024.xlsx"
+
+# Opening balances per GL code (debit positive); the bank account opens at the statement balance
+OPENING_BALANCES = {"10100": 245678.50}
+
+DETAIL_HEADERS = ["Journal No", "Date", "Description", "Debit", "Credit", "Balance"]
+DETAIL_WIDTHS = [12, 12, 40, 15, 15, 18]
+SUMMARY_HEADERS = ["GL Account", "Account Name", "Opening Balance", "Debits", "Credits", "Closing Balance", "Lines"]
+SUMMARY_WIDTHS = [12, 30, 18, 18, 18, 18, 10]
+
+# Rows around each account sheet's lines: header, opening row, blank row, totals and closing rows
+SHEET_OVERHEAD_ROWS = 5
+
+def gl_detail(lines, opening_balances=OPENING_BALANCES):
+    """Order posted lines by account and compute running balances.
+
+    ``lines`` is the struct of arrays from ``post_journal_lines()``. Returns ``order``
+    (line indices in report order), ``balance_cents`` (running balance after each
+    line in that order) and ``accounts``: one dict per account with postings, holding
+    ``category``, ``code``, ``name``, the ``start``/``end`` slice into ``order`` and
+    ``opening``, ``debits``, ``credits`` and ``closing`` in cents.
+    """
+
+    code_rank = np.argsort(np.argsort(GL_CODES, kind="stable"), kind="stable")
+    order = np.lexsort((lines["journal_no"], lines["date"], code_rank[lines["category"]]))
+
+    category = lines["category"][order]
+    debit_cents = lines["debit_cents"][order]
+    credit_cents = lines["credit_cents"][order]
+    n = len(order)
+
+    starts = np.flatnonzero(np.r_[True, category[1:] != category[:-1]]) if n else np.zeros(0, dtype=np.int64)
+    ends = np.r_[starts[1:], n].astype(np.int64)
+    account_category = category[starts]
+
+    opening_cents = np.array([round(opening_balances.get(code, 0) * 100) for code in GL_CODES.tolist()],
+                             dtype=np.int64)[account_category]
+
+    # One cumulative sum over all accounts, rebased to each account's opening balance
+    running = np.cumsum(debit_cents - credit_cents)
+    before_account = np.r_[0, running[ends[:-1] - 1]] if n else np.zeros(0, dtype=np.int64)
+    balance_cents = running + np.repeat(opening_cents - before_account, ends - starts)
+
+    debits = np.add.reduceat(debit_cents, starts) if n else starts
+    credits = np.add.reduceat(credit_cents, starts) if n else starts
+
+    accounts = [
+        {
+            "category": CATEGORY_KEYS[cat],
+            "code": GL_CODES[cat],
+            "name": GL_NAMES[cat],
+            "start": start,
+            "end": end,
+            "opening": opening,
+            "debits": debit,
+            "credits": credit,
+            "closing": opening + debit - credit,
+        }
+        for cat, start, end, opening, debit, credit in zip(
+            account_category.tolist(), starts.tolist(), ends.tolist(), opening_cents.tolist(),
+            debits.tolist(), credits.tolist())
+    ]
+
+    return {"order": order, "balance_cents": balance_cents, "accounts": accounts}
+
+def _detail_rows(lines, detail, start, end):
+    """Worksheet rows for report positions ``start:end``, converted one block at a time."""
+
+    date_labels = {}
+    index = detail["order"][start:end]
+    columns = {name: lines[name][index] for name in ("journal_no", "date", "debit_cents", "credit_cents")}
+    columns.update({name: lines[name][index] for name in ("description", "template", "ref") if name in lines})
+    columns["balance_cents"] = detail["balance_cents"][start:end]
+
+    for description, (journal_no, date, debit_cents, credit_cents, balance_cents) in zip(
+            _line_descriptions(columns),
+            _column_blocks(columns, ("journal_no", "date", "debit_cents", "credit_cents", "balance_cents"))):
+        label = date_labels.get(date)
+        if label is None:
+            label = date_labels[date] = date.strftime("%d.%m.%Y")
+
+        yield (f"JE-{journal_no}", label, description, debit_cents / 100 if debit_cents else None,
+               credit_cents / 100 if credit_cents else None, balance_cents / 100)
+
+def _account_sheets(lines, detail, account, max_rows):
+    """Sheet specs for one account, split into continuation sheets past ``max_rows`` rows."""
+
+    body_rows = max_rows - SHEET_OVERHEAD_ROWS
+    parts = max(1, math.ceil((account["end"] - account["start"]) / body_rows))
+    title = f"{account['code']} {account['name']}".replace("/", "-")
+    sheets = []
+
+    for part in range(parts):
+        start = account["start"] + part * body_rows
+        end = min(start + body_rows, account["end"])
+        opening = account["opening"] if start == account["start"] else int(detail["balance_cents"][start - 1])
+        suffix = f" ({part + 1})" if parts > 1 else ""
+        label = "Opening balance" if part == 0 else "Balance brought forward"
+        closing_label = "Closing balance" if end == account["end"] else "Balance carried forward"
+
+        def footer(start=start, end=end, closing_label=closing_label):
+            debits = int(lines["debit_cents"][detail["order"][start:end]].sum())
+            credits = int(lines["credit_cents"][detail["order"][start:end]].sum())
+            closing = int(detail["balance_cents"][end - 1]) if end > start else account["opening"]
+            return [
+                (None, None),
+                ([None, None, "TOTALS", debits / 100, credits / 100, None],
+                 [0, 0, xlsx.STYLE_BOLD, xlsx.STYLE_BOLD_AMOUNT, xlsx.STYLE_BOLD_AMOUNT, 0]),
+                ([None, None, closing_label, None, None, closing / 100],
+                 [0, 0, xlsx.STYLE_BOLD, 0, 0, xlsx.STYLE_BOLD_AMOUNT]),
+            ]
+
+        def rows(start=start, end=end, opening=opening, label=label):
+            yield (None, None, label, None, None, opening / 100)
+            yield from _detail_rows(lines, detail, start, end)
+
+        sheets.append({
+            "name": title[:31 - len(suffix)] + suffix,
+            "header": DETAIL_HEADERS,
+            "column_widths": DETAIL_WIDTHS,
+            "column_styles": [xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_TEXT, xlsx.STYLE_AMOUNT,
+                              xlsx.STYLE_AMOUNT, xlsx.STYLE_AMOUNT],
+            "rows": rows(),
+            "footer": footer,
+        })
+
+    return sheets
+
+def _summary_sheet(detail):
+    """Sheet spec listing every account's opening, movements and closing balance."""
+
+    accounts = detail["accounts"]
+    totals = [sum(account[key] for account in accounts) / 100 for key in ("opening", "debits", "credits", "closing")]
+
+    return {
+        "name": "Summary",
+        "header": SUMMARY_HEADERS,
+        "column_widths": SUMMARY_WIDTHS,
+        "column_styles": [xlsx.STYLE_CENTER, xlsx.STYLE_TEXT] + [xlsx.STYLE_AMOUNT] * 4 + [xlsx.STYLE_CENTER],
+        "rows": [
+            (account["code"], account["name"], account["opening"] / 100, account["debits"] / 100,
+             account["credits"] / 100, account["closing"] / 100, account["end"] - account["start"])
+            for account in accounts
+        ],
+        "footer": [
+            (None, None),
+            ([None, "TOTALS"] + totals, [0, xlsx.STYLE_BOLD] + [xlsx.STYLE_BOLD_AMOUNT] * 4),
+        ],
+    }
+
+def create_gl_detail_report(lines, output_file=OUTPUT_FILE, opening_balances=OPENING_BALANCES,
+                            max_rows=xlsx.EXCEL_MAX_ROWS, verbose=True):
+    """Write the GL detail report: a summary sheet, then one sheet per account."""
+
+    start_time = time.perf_counter()
+    detail = gl_detail(lines, opening_balances)
+    sort_time = time.perf_counter() - start_time
+
+    sheets = [_summary_sheet(detail)]
+    for account in detail["accounts"]:
+        sheets.extend(_account_sheets(lines, detail, account, max_rows))
+    xlsx.write_workbook(output_file, sheets)
+    elapsed = time.perf_counter() - start_time
+
+    if verbose:
+        num_lines = len(detail["order"])
+        print(f"GL detail report generated: {output_file}")
+        print(f"Accounts: {len(detail['accounts'])}  Sheets: {len(sheets)}  Lines: {num_lines:,}")
+        for account in detail["accounts"]:
+            print(f"  {account['code']} {account['name']:<25} {account['opening'] / 100:>18,.2f} "
+                  f"-> {account['closing'] / 100:>18,.2f}")
+        print(f"Sorted and balanced in {sort_time:.2f}s; written in {elapsed:.1f}s "
+              f"({num_lines / elapsed if elapsed else 0.0:,.0f} lines/sec)")
+        print_peak_rss()
+    return detail
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, help="synthetic transactions (2 lines each; default: one mock month)")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="output workbook path")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible synthetic months")
+    args = parser.parse_args()
+
+    if args.rows:
+        per_day = math.ceil(args.rows / WORKING_DAYS)
+        columns = generate_transactions_columnar(args.seed, per_day=(per_day, per_day))
+        columns = {name: values[:args.rows] for name, values in columns.items()}
+    else:
+        columns = generate_transactions_columnar(args.seed)
+
+    create_gl_detail_report(post_journal_lines(columns), args.output)
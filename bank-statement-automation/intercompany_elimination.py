@@ -0,0 +1,259 @@
+"""
+Consolidation stage: match intercompany postings between TechFlow entities and eliminate them.
+Journal lines from each entity are reduced to their Intercompany Receivable/Payable postings,
+hash-joined with the counterparty's opposite posting on (entity pair, period, amount), and
+written out as elimination entries plus a report of the postings left unmatched.
+"""
+
+from calendar import monthrange
+from datetime import datetime, timedelta
+import argparse
+import random
+import re
+import time
+
+import xlsx_stream_writer as xlsx
+from generate_journal_entries_excel import GL_ACCOUNTS, TRANSACTION_TYPES, iter_journal_lines
+
+OUTPUT_FILE = "intercompany_eliminations_december_2024.xlsx"
+
+# Group entities; the reporting entity is the Swiss holding company
+ENTITIES = ["TechFlow CH", "TechFlow UK", "TechFlow DE", "TechFlow US"]
+
+INTERCO_CODES = {GL_ACCOUNTS["interco_receivable"]["code"], GL_ACCOUNTS["interco_payable"]["code"]}
+INTERCO_NAMES = {GL_ACCOUNTS[key]["code"]: GL_ACCOUNTS[key]["name"]
+                 for key in ("interco_receivable", "interco_payable")}
+
+# Open counterparty postings within this share of the amount are reported as amount differences
+AMOUNT_TOLERANCE = 0.01
+
+# Counterparty named in an intercompany description ("Intercompany payment to TechFlow US")
+COUNTERPARTY = re.compile(r"TechFlow \w+")
+
+ELIMINATION_HEADERS = ["Journal No", "Date", "Entity", "GL Account", "Account Name", "Description",
+                       "Debit", "Credit"]
+ELIMINATION_WIDTHS = [12, 12, 16, 12, 25, 50, 15, 15]
+UNMATCHED_HEADERS = ["Entity", "Counterparty", "Period", "Journal No", "Date", "GL Account", "Description",
+                     "Amount", "Reason"]
+UNMATCHED_WIDTHS = [16, 16, 10, 12, 12, 12, 40, 15, 40]
+
+def intercompany_postings(entity, lines):
+    """Intercompany Receivable/Payable lines of one entity's journal lines.
+
+    ``lines`` are worksheet row values as ``iter_journal_lines()`` yields them. Each
+    posting is ``(entity, counterparty, period, signed_cents, line)`` with the amount
+    signed debit-positive and ``period`` as "MM.YYYY"; the counterparty is ``None``
+    when the description names none.
+    """
+
+    postings = []
+    counterparties = {}
+
+    for line in lines:
+        if line[2] not in INTERCO_CODES:
+            continue
+        description = line[4]
+        counterparty = counterparties.get(description, "")
+        if counterparty == "":
+            match = COUNTERPARTY.search(description)
+            counterparty = counterparties[description] = match.group(0) if match else None
+        signed_cents = round(line[5] * 100) if line[5] is not None else -round(line[6] * 100)
+        postings.append((entity, counterparty, line[1][3:], signed_cents, line))
+
+    return postings
+
+def match_intercompany(postings):
+    """Pair each intercompany posting with its counterparty's opposite posting.
+
+    Postings are keyed on (entity pair, period, amount signed from the pair's first
+    entity); one side of every pair is loaded into a hash table and the other side
+    probes it, taking counterparts in posting order. Returns ``(matches, unmatched)``:
+    matches are ``(posting, counterpart)`` tuples and unmatched postings come with a
+    reason.
+    """
+
+    table = {}
+    probes = []
+    unmatched = []
+
+    for posting in postings:
+        entity, counterparty, period, signed_cents, _ = posting
+        if counterparty is None or counterparty == entity:
+            unmatched.append((posting, "No intercompany counterparty in description"))
+        elif entity < counterparty:
+            table.setdefault((entity, counterparty, period, signed_cents), []).append(posting)
+        else:
+            probes.append(posting)
+
+    matches = []
+    leftover = []
+    for posting in probes:
+        entity, counterparty, period, signed_cents, _ = posting
+        candidates = table.get((counterparty, entity, period, -signed_cents))
+        if candidates:
+            matches.append((candidates.pop(0), posting))
+        else:
+            leftover.append(posting)
+    leftover.extend(posting for candidates in table.values() for posting in candidates)
+
+    # Explain what is left: the counterparty booked a slightly different amount, nothing
+    # at all, or is not one of the entities whose postings were given
+    entities = {posting[0] for posting in postings}
+    open_amounts = {}
+    for entity, counterparty, period, signed_cents, _ in leftover:
+        open_amounts.setdefault((entity, counterparty, period), []).append(signed_cents)
+    for posting in leftover:
+        entity, counterparty, period, signed_cents, _ = posting
+        nearest = min(open_amounts.get((counterparty, entity, period), ()),
+                      key=lambda cents: abs(cents + signed_cents), default=None)
+        if nearest is not None and abs(nearest + signed_cents) <= AMOUNT_TOLERANCE * abs(signed_cents):
+            unmatched.append((posting, f"Counterparty booked {nearest / 100:,.2f} "
+                                       f"(difference {(nearest + signed_cents) / 100:,.2f})"))
+        elif counterparty not in entities:
+            unmatched.append((posting, "Counterparty outside the consolidated group"))
+        else:
+            unmatched.append((posting, "No matching posting by counterparty"))
+
+    return matches, unmatched
+
+def elimination_entries(matches, first_journal_no=1):
+    """Elimination journal lines reversing both sides of each matched pair at period end."""
+
+    period_ends = {}
+
+    for journal_no, pair in enumerate(matches, first_journal_no):
+        period = pair[0][2]
+        date = period_ends.get(period)
+        if date is None:
+            month, year = int(period[:2]), int(period[3:])
+            date = period_ends[period] = f"{monthrange(year, month)[1]:02d}.{period}"
+
+        description = f"Elimination {pair[0][0]} / {pair[1][0]} {period}"
+        for entity, _, _, signed_cents, line in pair:
+            amount = abs(signed_cents) / 100
+            yield (f"IC-{journal_no}", date, entity, line[2], INTERCO_NAMES[line[2]], description,
+                   amount if signed_cents < 0 else None, amount if signed_cents > 0 else None)
+
+def _unmatched_rows(unmatched):
+    """Unmatched-intercompany report rows, sorted by entity pair and period."""
+
+    for (entity, counterparty, period, signed_cents, line), reason in sorted(
+            unmatched, key=lambda item: (item[0][0], item[0][1] or "", item[0][2][3:], item[0][2])):
+        yield (entity, counterparty or "", period, line[0], line[1], line[2], line[4], signed_cents / 100, reason)
+
+def write_elimination_workbook(output_file, matches, unmatched):
+    """Write the elimination entries and the unmatched-intercompany report as one workbook."""
+
+    totals = {"debit": 0, "credit": 0}
+
+    def elimination_rows():
+        for line in elimination_entries(matches):
+            totals["debit"] += line[6] or 0
+            totals["credit"] += line[7] or 0
+            yield line
+
+    def elimination_footer():
+        return [
+            (None, None),
+            ([None, None, None, None, None, "TOTALS", round(totals["debit"], 2), round(totals["credit"], 2)],
+             [0, 0, 0, 0, 0, xlsx.STYLE_BOLD, xlsx.STYLE_BOLD_AMOUNT, xlsx.STYLE_BOLD_AMOUNT]),
+        ]
+
+    return xlsx.write_workbook(output_file, [
+        {
+            "name": "Eliminations",
+            "header": ELIMINATION_HEADERS,
+            "column_widths": ELIMINATION_WIDTHS,
+            "column_styles": [xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_TEXT, xlsx.STYLE_CENTER,
+                              xlsx.STYLE_TEXT, xlsx.STYLE_TEXT, xlsx.STYLE_AMOUNT, xlsx.STYLE_AMOUNT],
+            "rows": elimination_rows(),
+            "footer": elimination_footer,
+        },
+        {
+            "name": "Unmatched Intercompany",
+            "header": UNMATCHED_HEADERS,
+            "column_widths": UNMATCHED_WIDTHS,
+            "column_styles": [xlsx.STYLE_TEXT, xlsx.STYLE_TEXT, xlsx.STYLE_CENTER, xlsx.STYLE_CENTER,
+                              xlsx.STYLE_CENTER, xlsx.STYLE_CENTER, xlsx.STYLE_TEXT, xlsx.STYLE_AMOUNT,
+                              xlsx.STYLE_TEXT],
+            "rows": _unmatched_rows(unmatched),
+        },
+    ])
+
+def synthetic_group(entity_count=len(ENTITIES), flows=1000, ordinary=1000, seed=None, start_date=datetime(2024, 12, 1),
+                    days=31, missing_share=0.01, short_paid_share=0.005):
+    """Mock December books for a group of entities, as transaction dicts per entity.
+
+    Each intercompany flow is a payment in the payer's books and a transfer received
+    in the payee's; a share of receipts is never booked and a share arrives short by a
+    bank fee. ``ordinary`` non-intercompany transactions are added per entity.
+    """
+
+    rng = random.Random(seed)
+    entities = ENTITIES[:entity_count] + [f"TechFlow E{n:02d}" for n in range(len(ENTITIES) + 1, entity_count + 1)]
+    books = {entity: [] for entity in entities}
+    dates = [(start_date + timedelta(days=day)).strftime("%d.%m.%Y") for day in range(days)]
+    templates = [t for t in TRANSACTION_TYPES if not t[1].startswith("interco")]
+
+    def book(entity, date, description, category, amount, is_incoming):
+        txns = books[entity]
+        txns.append({
+            "journal_no": f"JE-{1001 + len(txns)}",
+            "date": date,
+            "description": description,
+            "category": category,
+            "amount": amount,
+            "is_incoming": is_incoming
+        })
+
+    for _ in range(flows):
+        payer, payee = rng.sample(entities, 2)
+        date = rng.choice(dates)
+        amount = round(rng.uniform(15000, 80000), 2)
+        book(payer, date, f"Intercompany payment to {payee}", "interco_payable", amount, False)
+        if rng.random() < missing_share:
+            continue
+        if rng.random() < short_paid_share:
+            amount = round(amount - rng.uniform(15, 50), 2)
+        book(payee, date, f"Intercompany transfer from {payer}", "interco_receivable", amount, True)
+
+    for entity in entities:
+        for _ in range(ordinary):
+            description, category, min_amt, max_amt, is_incoming = rng.choice(templates)
+            if "{}" in description:
+                description = description.format(rng.randint(1000, 9999))
+            book(entity, rng.choice(dates), description, category, round(rng.uniform(min_amt, max_amt), 2),
+                 is_incoming)
+
+    return books
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=len(ENTITIES), help="entities in the mock group")
+    parser.add_argument("--flows", type=int, default=200, help="intercompany flows across the group")
+    parser.add_argument("--ordinary", type=int, default=100, help="other transactions per entity")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="output workbook path")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    books = synthetic_group(args.entities, args.flows, args.ordinary, args.seed)
+    entity_lines = {entity: list(iter_journal_lines(txns)) for entity, txns in books.items()}
+
+    start_time = time.perf_counter()
+    postings = [posting for entity, lines in entity_lines.items() for posting in intercompany_postings(entity, lines)]
+    matches, unmatched = match_intercompany(postings)
+    match_time = time.perf_counter() - start_time
+    write_elimination_workbook(args.output, matches, unmatched)
+    elapsed = time.perf_counter() - start_time
+
+    reasons = {}
+    for _, reason in unmatched:
+        reason = "Counterparty booked a different amount" if reason.startswith("Counterparty booked") else reason
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    print(f"Entities: {len(books)}  Journal lines: {sum(len(lines) for lines in entity_lines.values()):,}")
+    print(f"Intercompany postings: {len(postings):,}  Matched pairs: {len(matches):,}")
+    print(f"Unmatched postings: {len(unmatched):,}")
+    for reason, count in reasons.items():
+        print(f"  {reason}: {count:,}")
+    print(f"Matched in {match_time:.2f}s, written to {args.output} in {elapsed:.2f}s total")
@@ -0,0 +1,166 @@
+"""
+Output sinks for journal and statement rows besides Excel and PDF.
+A sink receives row tuples in batches: CSV streams them to disk as they arrive, .npz
+collects them into one NumPy array per column, and .parquet (when pyarrow is installed)
+writes one row group per batch. One row stream can feed several sinks, and a workbook
+or PDF writer alongside them, without being generated twice.
+"""
+
+import csv
+import itertools
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Rows handed to the sinks per batch
+BATCH_ROWS = 65536
+
+# Value type of each journal and statement export column: amounts are numbers, the rest text.
+# Types are fixed up front so a batch that starts with empty cells cannot change a column's type.
+NUMBER = "number"
+TEXT = "text"
+COLUMN_TYPES = {
+    "Journal No": TEXT,
+    "Date": TEXT,
+    "GL Account": TEXT,
+    "Account Name": TEXT,
+    "Description": TEXT,
+    "Debit": NUMBER,
+    "Credit": NUMBER,
+    "Memo": TEXT,
+    "Amount": NUMBER,
+    "Balance": NUMBER,
+    "Currency": TEXT,
+}
+
+def _column_name(header):
+    """Array/column name for a header label ("Journal No" -> "journal_no")."""
+
+    return header.strip().lower().replace(" ", "_")
+
+def column_types(header):
+    """``COLUMN_TYPES`` entry for every header label; unknown labels raise ValueError."""
+
+    unknown = [label for label in header if label not in COLUMN_TYPES]
+    if unknown:
+        raise ValueError(f"No column type for {', '.join(unknown)}; pass types= to open_sink()")
+    return [COLUMN_TYPES[label] for label in header]
+
+class CsvSink:
+    """Stream rows to a CSV file with a header line; empty cells stay empty."""
+
+    def __init__(self, path, header, types):
+        self.path = path
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(header)
+
+    def write_batch(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class NpzSink:
+    """Collect rows into one array per column and save them as a compressed .npz on close.
+
+    Number columns become float64 with NaN for empty cells; text columns are stored
+    as strings. Each batch is converted to arrays as it arrives, so only the compact
+    column arrays are held until the file is written.
+    """
+
+    def __init__(self, path, header, types):
+        self.path = path
+        self.names = [_column_name(label) for label in header]
+        self.chunks = [[] for _ in header]
+        self.numeric = [column_type == NUMBER for column_type in types]
+
+    def write_batch(self, rows):
+        columns = list(zip(*rows))
+        if not columns:
+            return
+        for chunks, column, numeric in zip(self.chunks, columns, self.numeric):
+            if numeric:
+                chunks.append(np.array([np.nan if value is None else value for value in column], dtype=np.float64))
+            else:
+                chunks.append(np.array(["" if value is None else str(value) for value in column]))
+
+    def close(self):
+        np.savez_compressed(self.path, **{
+            name: np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float64 if numeric else str)
+            for name, chunks, numeric in zip(self.names, self.chunks, self.numeric)
+        })
+
+class ParquetSink:
+    """Write each batch as a Parquet row group with a float64/string schema (requires pyarrow)."""
+
+    def __init__(self, path, header, types):
+        if pq is None:
+            raise ImportError("Parquet output requires pyarrow; use a .csv or .npz sink instead")
+        self.path = path
+        self.schema = pa.schema([
+            (_column_name(label), pa.float64() if column_type == NUMBER else pa.string())
+            for label, column_type in zip(header, types)
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_batch(self, rows):
+        arrays = []
+        for column, field in zip(zip(*rows), self.schema):
+            if field.type == pa.string():
+                column = [None if value is None else str(value) for value in column]
+            arrays.append(pa.array(column, type=field.type))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+SINKS = {".csv": CsvSink, ".npz": NpzSink, ".parquet": ParquetSink}
+
+def open_sink(path, header, types=None):
+    """Open the sink matching the file extension of ``path``.
+
+    ``types`` gives NUMBER or TEXT per column and defaults to ``COLUMN_TYPES``.
+    """
+
+    if types is None:
+        types = column_types(header)
+    for extension, sink in SINKS.items():
+        if path.lower().endswith(extension):
+            return sink(path, header, types)
+    raise ValueError(f"No output sink for {path!r}; use one of {', '.join(SINKS)}")
+
+def tee_to_sinks(items, sinks, values=None, batch_size=BATCH_ROWS):
+    """Pass ``items`` through unchanged while writing them to every sink in batches.
+
+    ``values`` turns an item into its row tuple (items are rows already when omitted),
+    so a PDF or workbook writer can consume the stream while the sinks receive the
+    same rows. The sinks are closed once the stream is exhausted.
+    """
+
+    items = iter(items)
+    try:
+        while True:
+            batch = list(itertools.islice(items, batch_size))
+            if not batch:
+                break
+            rows = batch if values is None else [values(item) for item in batch]
+            for sink in sinks:
+                sink.write_batch(rows)
+            yield from batch
+    finally:
+        for sink in sinks:
+            sink.close()
+
+def write_to_sinks(rows, sinks, values=None, batch_size=BATCH_ROWS):
+    """Write a row stream to all sinks; returns the number of rows written."""
+
+    count = 0
+    for _ in tee_to_sinks(rows, sinks, values, batch_size):
+        count += 1
+    return count
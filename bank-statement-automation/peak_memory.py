@@ -0,0 +1,28 @@
+"""
+Peak memory of the current process for the throughput printouts of the export scripts.
+The ``resource`` module only exists on POSIX systems, so it is imported on first use and
+callers skip their "Peak RSS" line where it is unavailable (e.g. on Windows).
+"""
+
+import sys
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def print_peak_rss():
+    """Print the "Peak RSS" line, if the platform reports it."""
+
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"Peak RSS: {peak:,.1f} MB")
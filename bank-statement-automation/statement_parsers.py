@@ -0,0 +1,334 @@
+"""
+Streaming parsers for bank statement files (SWIFT MT940 and ISO 20022 camt.053).
+Entries are yielded one at a time in the row shape used by generate_bank_statement_pdf.py
+(date, description, amount, balance, currency), so multi-GB daily files parse in constant memory.
+"""
+
+from datetime import datetime
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from peak_memory import print_peak_rss
+
+# MT940 field tag at the start of a line, e.g. ":61:" or ":60F:"
+MT940_TAG = re.compile(r":(\d{2}[A-Z]?):(.*)")
+
+# :61: statement line: value date, optional entry date, (R)C/(R)D mark, optional funds code,
+# amount with a decimal comma, transaction type, then references / supplementary details
+MT940_STATEMENT_LINE = re.compile(
+    r"(?P<date>\d{6})(?P<entry_date>\d{4})?(?P<mark>R?[CD])(?P<funds>[A-Z])?"
+    r"(?P<amount>\d+,\d{0,2})(?P<type>[NFS][A-Z0-9]{3})(?P<reference>[^\n]*)"
+)
+
+# :60F: / :62F: balance: C/D mark, date, currency, amount
+MT940_BALANCE = re.compile(r"(?P<mark>[CD])(?P<date>\d{6})(?P<currency>[A-Z]{3})(?P<amount>\d+,\d{0,2})")
+
+# Structured :86: subfields such as "?20" or "?32"
+MT940_SUBFIELD = re.compile(r"\?\d{2}")
+
+CAMT_OPENING_CODES = {"OPBD", "PRCD"}
+
+def _mt940_cents(amount):
+    """Integer cents for an MT940 amount with a decimal comma (e.g. "1234,5")."""
+
+    units, _, fraction = amount.partition(",")
+    return int(units) * 100 + int((fraction + "00")[:2])
+
+def _mt940_date(value):
+    """dd.mm.yyyy label for an MT940 YYMMDD date."""
+
+    return f"{value[4:6]}.{value[2:4]}.20{value[0:2]}"
+
+def _mt940_fields(lines):
+    """Group MT940 lines into (tag, value) fields; continuation lines are joined with newlines.
+
+    The end of each message ("-" or "-}") is reported as the pseudo-field ("-", "").
+    """
+
+    tag = None
+    value = []
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        match = MT940_TAG.match(line)
+        end = line.rstrip() in ("-", "-}")
+
+        if match or end:
+            if tag is not None:
+                yield tag, "\n".join(value)
+            if match:
+                tag, value = match.group(1), [match.group(2)]
+            else:
+                tag, value = None, []
+                yield "-", ""
+        elif tag is not None:
+            value.append(line)
+        # Anything else is block framing ({1:...}{2:...}{4:) outside a field
+
+    if tag is not None:
+        yield tag, "\n".join(value)
+
+def parse_mt940(path, encoding="latin-1"):
+    """Yield statement rows from an MT940 file, one ``:61:``/``:86:`` pair at a time.
+
+    A small state machine over the field stream: ``:60F:``/``:60M:`` sets the running
+    balance and currency, ``:61:`` opens an entry and ``:86:`` completes it with its
+    description. Entries without ``:86:`` fall back to the ``:61:`` reference.
+    """
+
+    balance_cents = None
+    currency = None
+    pending = None
+
+    def row(entry, description):
+        return {
+            "date": entry["date"],
+            "description": description,
+            "amount": entry["cents"] / 100,
+            "balance": entry["balance_cents"] / 100,
+            "currency": currency,
+        }
+
+    with open(path, encoding=encoding) as f:
+        for tag, value in _mt940_fields(f):
+            if tag == "86" and pending is not None:
+                description = " ".join(MT940_SUBFIELD.sub(" ", value).split())
+                yield row(pending, description or pending["reference"])
+                pending = None
+                continue
+
+            if pending is not None:
+                yield row(pending, pending["reference"])
+                pending = None
+
+            if tag in ("60F", "60M"):
+                match = MT940_BALANCE.match(value)
+                if match is None:
+                    raise ValueError(f"Malformed MT940 opening balance: {value!r}")
+                balance_cents = _mt940_cents(match.group("amount"))
+                if match.group("mark") == "D":
+                    balance_cents = -balance_cents
+                currency = match.group("currency")
+
+            elif tag == "61":
+                match = MT940_STATEMENT_LINE.match(value)
+                if match is None:
+                    raise ValueError(f"Malformed MT940 statement line: {value!r}")
+                if balance_cents is None:
+                    raise ValueError("MT940 statement line before any :60F:/:60M: opening balance")
+
+                # Debits and reversed credits reduce the balance
+                cents = _mt940_cents(match.group("amount"))
+                if match.group("mark") in ("D", "RC"):
+                    cents = -cents
+                balance_cents += cents
+
+                details = value.partition("\n")[2]
+                pending = {
+                    "date": _mt940_date(match.group("date")),
+                    "cents": cents,
+                    "balance_cents": balance_cents,
+                    "reference": " ".join(details.split()) or match.group("reference").strip(),
+                }
+
+    if pending is not None:
+        yield row(pending, pending["reference"])
+
+def _camt_cents(amount_element, indicator):
+    """Signed integer cents for a camt ``Amt`` element and its CRDT/DBIT indicator."""
+
+    units, _, fraction = amount_element.text.strip().partition(".")
+    cents = int(units) * 100 + int((fraction + "00")[:2])
+    return -cents if indicator == "DBIT" else cents
+
+def parse_camt053(path):
+    """Yield statement rows from a camt.053 file with incremental XML parsing.
+
+    Each ``Bal`` and ``Ntry`` element is handled when it closes and is then removed
+    from its ``Stmt``, so memory does not grow with the number of entries. The opening
+    balance (OPBD, or PRCD when that is all the bank sends) starts the running balance.
+    """
+
+    ns = None
+    statement = None
+    balance_cents = None
+    currency = None
+
+    for event, elem in iterparse(path, events=("start", "end")):
+        if event == "start":
+            if ns is None:
+                ns = elem.tag[:elem.tag.index("}") + 1] if elem.tag.startswith("{") else ""
+                stmt_tag, bal_tag, ntry_tag = f"{ns}Stmt", f"{ns}Bal", f"{ns}Ntry"
+            if elem.tag == stmt_tag:
+                statement = elem
+                balance_cents = None
+            continue
+
+        tag = elem.tag
+
+        if tag == bal_tag:
+            code = elem.findtext(f"{ns}Tp/{ns}CdOrPrtry/{ns}Cd")
+            if code in CAMT_OPENING_CODES and balance_cents is None:
+                amount = elem.find(f"{ns}Amt")
+                balance_cents = _camt_cents(amount, elem.findtext(f"{ns}CdtDbtInd"))
+                currency = amount.get("Ccy")
+
+        elif tag == ntry_tag:
+            if balance_cents is None:
+                raise ValueError("camt.053 entry before any OPBD/PRCD opening balance")
+
+            amount = elem.find(f"{ns}Amt")
+            cents = _camt_cents(amount, elem.findtext(f"{ns}CdtDbtInd"))
+            balance_cents += cents
+
+            booking_date = elem.findtext(f"{ns}BookgDt/{ns}Dt") or elem.findtext(f"{ns}BookgDt/{ns}DtTm")
+            description = (
+                elem.findtext(f"{ns}NtryDtls/{ns}TxDtls/{ns}RmtInf/{ns}Ustrd")
+                or elem.findtext(f"{ns}NtryDtls/{ns}TxDtls/{ns}AddtlTxInf")
+                or elem.findtext(f"{ns}AddtlNtryInf")
+                or ""
+            )
+
+            yield {
+                "date": f"{booking_date[8:10]}.{booking_date[5:7]}.{booking_date[0:4]}",
+                "description": " ".join(description.split()),
+                "amount": cents / 100,
+                "balance": balance_cents / 100,
+                "currency": amount.get("Ccy") or currency,
+            }
+
+        else:
+            continue
+
+        # Balances and entries are direct children of Stmt; dropping each one once it has
+        # been handled keeps the tree from growing with the number of entries
+        if statement is not None:
+            statement.remove(elem)
+
+def detect_format(path):
+    """Guess "camt053" or "mt940" from the first non-blank characters of the file."""
+
+    with open(path, "rb") as f:
+        head = f.read(512).lstrip()
+    return "camt053" if head.startswith(b"<") else "mt940"
+
+def parse_statement_file(path, file_format=None):
+    """Yield statement rows from an MT940 or camt.053 file (format detected when not given)."""
+
+    file_format = file_format or detect_format(path)
+    if file_format == "mt940":
+        return parse_mt940(path)
+    if file_format == "camt053":
+        return parse_camt053(path)
+    raise ValueError(f"Unknown statement format: {file_format}")
+
+def iter_journal_rows(transactions, first_journal_no=1001, classifier=None):
+    """Turn statement rows into the transaction dicts ``create_excel()`` posts.
+
+    Parsed files carry no GL category; with a ``gl_classifier.GLClassifier`` the
+    description picks one, and unmatched receipts go to Accounts Receivable and
+    unmatched payments to Accounts Payable.
+    """
+
+    for journal_no, txn in enumerate(transactions, first_journal_no):
+        category = classifier.classify(txn["description"]) if classifier else None
+        yield {
+            "journal_no": f"JE-{journal_no}",
+            "date": txn["date"],
+            "description": txn["description"],
+            "category": category or ("ar" if txn["amount"] >= 0 else "ap"),
+            "amount": abs(txn["amount"]),
+            "is_incoming": txn["amount"] >= 0
+        }
+
+def write_mt940(path, transactions, opening_balance, account_number, currency):
+    """Write statement rows as a single MT940 message (used to build sample files)."""
+
+    def amount(value):
+        return f"{abs(value):.2f}".replace(".", ",")
+
+    def mark(value):
+        return "D" if value < 0 else "C"
+
+    def yymmdd(label):
+        return label[8:10] + label[3:5] + label[0:2]
+
+    balance = opening_balance
+    with open(path, "w", encoding="latin-1", newline="\r\n") as f:
+        f.write(f":20:STMT{datetime.now():%y%m%d}\n:25:{account_number.replace(' ', '')}\n:28C:00001/001\n")
+        f.write(f":60F:{mark(opening_balance)}241130{currency}{amount(opening_balance)}\n")
+        for txn in transactions:
+            balance = txn["balance"]
+            f.write(f":61:{yymmdd(txn['date'])}{mark(txn['amount'])}{amount(txn['amount'])}NTRFNONREF\n")
+            f.write(f":86:{txn['description']}\n")
+        f.write(f":62F:{mark(balance)}241231{currency}{amount(balance)}\n-\n")
+
+def write_camt053(path, transactions, opening_balance, account_number, currency):
+    """Write statement rows as a camt.053.001.02 document (used to build sample files)."""
+
+    def balance_xml(code, value, date):
+        return (f"<Bal><Tp><CdOrPrtry><Cd>{code}</Cd></CdOrPrtry></Tp>"
+                f"<Amt Ccy=\"{currency}\">{abs(value):.2f}</Amt>"
+                f"<CdtDbtInd>{'DBIT' if value < 0 else 'CRDT'}</CdtDbtInd><Dt><Dt>{date}</Dt></Dt></Bal>\n")
+
+    balance = opening_balance
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt>'
+                f"<GrpHdr><MsgId>STMT{datetime.now():%Y%m%d}</MsgId></GrpHdr>\n"
+                f"<Stmt><Id>1</Id><Acct><Id><IBAN>{account_number.replace(' ', '')}</IBAN></Id></Acct>\n")
+        f.write(balance_xml("OPBD", opening_balance, "2024-11-30"))
+        for txn in transactions:
+            balance = txn["balance"]
+            date = f"{txn['date'][6:10]}-{txn['date'][3:5]}-{txn['date'][0:2]}"
+            f.write(f"<Ntry><Amt Ccy=\"{currency}\">{abs(txn['amount']):.2f}</Amt>"
+                    f"<CdtDbtInd>{'DBIT' if txn['amount'] < 0 else 'CRDT'}</CdtDbtInd><Sts>BOOK</Sts>"
+                    f"<BookgDt><Dt>{date}</Dt></BookgDt><ValDt><Dt>{date}</Dt></ValDt>"
+                    f"<NtryDtls><TxDtls><RmtInf><Ustrd>{escape(txn['description'])}</Ustrd></RmtInf>"
+                    f"</TxDtls></NtryDtls></Ntry>\n")
+        f.write(balance_xml("CLBD", balance, "2024-12-31"))
+        f.write("</Stmt></BkToCstmrStmt></Document>\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", help="MT940 or camt.053 file to parse")
+    parser.add_argument("--format", choices=["mt940", "camt053"], help="file format (default: detect)")
+    parser.add_argument("--synthetic", type=int, metavar="ROWS",
+                        help="write ROWS mock transactions in --format to a temporary file and parse it")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from generate_bank_statement_pdf import ACCOUNT_NUMBER, CURRENCY, OPENING_BALANCE, synthetic_transactions
+
+        file_format = args.format or "mt940"
+        fd, path = tempfile.mkstemp(suffix=".xml" if file_format == "camt053" else ".sta")
+        os.close(fd)
+        writer = write_camt053 if file_format == "camt053" else write_mt940
+        writer(path, synthetic_transactions(args.synthetic, seed=42), OPENING_BALANCE, ACCOUNT_NUMBER, CURRENCY)
+        print(f"Sample file: {path} ({os.path.getsize(path) / 1e6:,.1f} MB)")
+    elif args.path:
+        file_format = args.format
+        path = args.path
+    else:
+        parser.error("give a statement file or --synthetic ROWS")
+
+    start_time = time.perf_counter()
+    count = 0
+    last = None
+    for last in parse_statement_file(path, file_format):
+        count += 1
+    elapsed = time.perf_counter() - start_time
+
+    if args.synthetic:
+        os.remove(path)
+
+    print(f"Parsed entries: {count:,}")
+    if last is not None:
+        print(f"Closing balance: {last['currency']} {last['balance']:,.2f}")
+    print(f"Throughput: {count / elapsed if elapsed else 0:,.0f} entries/sec ({elapsed:.1f}s)")
+    print_peak_rss()
@@ -0,0 +1,36 @@
+import pytest
+
+from gl_classifier import GLClassifier, compile_rules, load_rules
+
+
+def test_rules_with_backreferences_and_inline_flags_keep_their_meaning():
+    rules = [
+        ("keyword", "Payroll", "payroll"),
+        ("regex", r"\b(\w+) \1\b", "fx_gain_loss"),
+        ("regex", r"(?i)bank fee", "bank_fees"),
+        ("regex", r"INV-\d{4}", "ar"),
+    ]
+    pattern, _, standalone = compile_rules(rules)
+    assert [index for index, _, _ in standalone] == [1, 2]
+
+    classifier = GLClassifier(rules)
+
+    assert classifier.classify("Payroll payroll run") == "payroll"
+    assert classifier.classify("Refund refund INV-1234") == "fx_gain_loss"
+    assert classifier.classify("INV-1234 refund refund") == "ar"
+    assert classifier.classify("Monthly BANK FEE") == "bank_fees"
+    assert classifier.classify("Nothing here") is None
+
+
+def test_invalid_regex_is_reported_with_its_rule():
+    with pytest.raises(ValueError, match="rule 2"):
+        GLClassifier([("keyword", "Payroll", "payroll"), ("regex", "(unclosed", "ar")])
+
+
+def test_cache_evicts_least_recently_used_descriptions():
+    classifier = GLClassifier(load_rules(), cache_size=2)
+
+    for description in ["Payroll transfer", "Bank fee", "Payroll transfer", "Customer payment", "Payroll transfer"]:
+        classifier.classify(description)
+
+    assert classifier.report()["cache_hit_rate"] == pytest.approx(2 / 5)
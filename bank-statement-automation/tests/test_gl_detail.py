@@ -0,0 +1,61 @@
+import openpyxl
+
+from generate_journal_entries_excel import (
+    GL_CODES,
+    columns_from_rows,
+    generate_transactions,
+    generate_transactions_columnar,
+    post_journal_lines,
+)
+from gl_detail_report import OPENING_BALANCES, create_gl_detail_report, gl_detail
+
+
+def test_running_balances_restart_at_each_account_opening_balance():
+    lines = post_journal_lines(generate_transactions_columnar(seed=11, per_day=(5, 5)))
+    opening_balances = dict(OPENING_BALANCES, **{"20000": -12345.67})
+
+    detail = gl_detail(lines, opening_balances)
+    order = detail["order"].tolist()
+    codes = GL_CODES[lines["category"][order]].tolist()
+
+    # Report order: by GL code, then date, then journal number
+    keys = list(zip(codes, lines["date"][order].tolist(), lines["journal_no"][order].tolist()))
+    assert keys == sorted(keys)
+
+    # Brute force: walk the lines, resetting the balance at every new account
+    expected = []
+    balance = None
+    for position, line in enumerate(order):
+        if position == 0 or codes[position] != codes[position - 1]:
+            balance = round(opening_balances.get(codes[position], 0) * 100)
+        balance += int(lines["debit_cents"][line]) - int(lines["credit_cents"][line])
+        expected.append(balance)
+    assert detail["balance_cents"].tolist() == expected
+
+    for account in detail["accounts"]:
+        assert account["closing"] == expected[account["end"] - 1]
+        assert account["opening"] + account["debits"] - account["credits"] == account["closing"]
+
+
+def test_no_lines():
+    lines = post_journal_lines(generate_transactions_columnar(seed=11, days=0))
+
+    detail = gl_detail(lines)
+
+    assert detail["accounts"] == []
+    assert len(detail["balance_cents"]) == 0
+
+
+def test_report_from_row_transactions_uses_their_descriptions(tmp_path):
+    transactions = generate_transactions()
+    lines = post_journal_lines(columns_from_rows(transactions))
+    output_file = tmp_path / "gl.xlsx"
+
+    detail = create_gl_detail_report(lines, output_file, verbose=False)
+
+    workbook = openpyxl.load_workbook(output_file, read_only=True)
+    account = detail["accounts"][0]
+    sheet = workbook.worksheets[1]
+    rows = list(sheet.iter_rows(min_row=3, max_row=2 + account["end"] - account["start"], values_only=True))
+    expected = [lines["description"][line] for line in detail["order"][account["start"]:account["end"]].tolist()]
+    assert [row[2] for row in rows] == expected
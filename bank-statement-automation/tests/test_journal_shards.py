@@ -0,0 +1,78 @@
+import numpy as np
+import openpyxl
+import pytest
+
+from generate_journal_entries_excel import (
+    SHARD_OVERHEAD_ROWS,
+    columns_from_rows,
+    create_excel_sharded,
+    generate_transactions_columnar,
+    iter_columnar_rows,
+    iter_journal_lines,
+    iter_posted_lines,
+    plan_shards,
+    post_journal_lines,
+)
+
+
+def test_plan_shards_never_splits_a_journal():
+    line_counts = np.random.default_rng(3).integers(1, 40, size=2_000)
+    max_rows = 100
+    capacity = max_rows - SHARD_OVERHEAD_ROWS
+
+    shards = plan_shards(line_counts, max_rows)
+
+    # Consecutive journal ranges covering every journal exactly once
+    assert shards[0][0] == 0 and shards[-1][1] == len(line_counts)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(shards, shards[1:]))
+
+    for start, end in shards:
+        assert end > start
+        assert line_counts[start:end].sum() <= capacity
+        # Shards are filled: the next journal would not have fit
+        if end < len(line_counts):
+            assert line_counts[start:end + 1].sum() > capacity
+
+
+def test_plan_shards_rejects_a_journal_larger_than_a_sheet():
+    with pytest.raises(ValueError):
+        plan_shards([2, 98, 2], max_rows=100)
+
+    assert plan_shards([2, 97, 2], max_rows=100) == [(0, 1), (1, 2), (2, 3)]
+    assert plan_shards([], max_rows=100) == []
+
+
+def test_sharded_export_accepts_row_transactions(tmp_path):
+    columns = generate_transactions_columnar(seed=5, per_day=(3, 3))
+    rows = list(iter_columnar_rows(columns))
+
+    converted = columns_from_rows(rows)
+    assert converted["journal_no"].tolist() == columns["journal_no"].tolist()
+    assert converted["amount_cents"].tolist() == columns["amount_cents"].tolist()
+
+    create_excel_sharded(columns, tmp_path / "columns.xlsx", max_rows=40, workers=2, verbose=False)
+    create_excel_sharded(rows, tmp_path / "rows.xlsx", max_rows=40, workers=2, verbose=False)
+
+    expected = openpyxl.load_workbook(tmp_path / "columns.xlsx")
+    actual = openpyxl.load_workbook(tmp_path / "rows.xlsx")
+    assert actual.sheetnames == expected.sheetnames
+    for name in expected.sheetnames:
+        assert list(actual[name].values) == list(expected[name].values)
+
+
+def test_zero_amount_lines_post_like_row_lines(tmp_path):
+    rows = [
+        {"journal_no": "JE-1001", "date": "02.12.2024", "description": "Zero receipt", "category": "ar",
+         "amount": 0.0, "is_incoming": True},
+        {"journal_no": "JE-1002", "date": "02.12.2024", "description": "Zero payment", "category": "ap",
+         "amount": 0.0, "is_incoming": False},
+        {"journal_no": "JE-1003", "date": "03.12.2024", "description": "Bank fee", "category": "bank_fees",
+         "amount": 12.5, "is_incoming": False},
+    ]
+
+    assert list(iter_posted_lines(post_journal_lines(columns_from_rows(rows)))) == list(iter_journal_lines(rows))
+
+    create_excel_sharded(rows, tmp_path / "zero.xlsx", verbose=False)
+    sheet = openpyxl.load_workbook(tmp_path / "zero.xlsx")["Journal Entries 1"]
+    totals = [row for row in sheet.values if "TOTALS" in row]
+    assert totals and totals[0][5:7] == (12.5, 12.5)
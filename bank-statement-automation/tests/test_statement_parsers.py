@@ -0,0 +1,65 @@
+from generate_bank_statement_pdf import ACCOUNT_NUMBER, CURRENCY, OPENING_BALANCE, synthetic_transactions
+from statement_parsers import (
+    detect_format,
+    parse_camt053,
+    parse_mt940,
+    parse_statement_file,
+    write_camt053,
+    write_mt940,
+)
+
+
+def test_mt940_round_trip(tmp_path):
+    rows = list(synthetic_transactions(500, seed=7))
+    path = tmp_path / "statement.sta"
+    write_mt940(path, rows, OPENING_BALANCE, ACCOUNT_NUMBER, CURRENCY)
+
+    assert detect_format(path) == "mt940"
+    assert list(parse_mt940(path)) == rows
+
+
+def test_camt053_round_trip(tmp_path):
+    rows = list(synthetic_transactions(500, seed=7))
+    path = tmp_path / "statement.xml"
+    write_camt053(path, rows, OPENING_BALANCE, ACCOUNT_NUMBER, CURRENCY)
+
+    assert detect_format(path) == "camt053"
+    assert list(parse_statement_file(path)) == list(parse_camt053(path)) == rows
+
+
+def test_mt940_reversals_and_missing_details(tmp_path):
+    path = tmp_path / "statement.sta"
+    path.write_text(
+        ":20:STMT\n:25:CH9300762011623852957\n:28C:00001/001\n"
+        ":60F:C241130CHF1000,00\n"
+        ":61:2412021202D250,50NTRFNONREF//B1\n:86:Supplier payment\n"
+        ":61:241203RC100,NTRFREF2\n"
+        ":61:241204C75,25NMSCREF3\n:86:?20Interest ?21income\n"
+        ":62F:C241231CHF724,75\n-\n",
+        encoding="latin-1",
+    )
+
+    rows = list(parse_mt940(path))
+
+    assert [row["date"] for row in rows] == ["02.12.2024", "03.12.2024", "04.12.2024"]
+    assert [row["amount"] for row in rows] == [-250.50, -100.00, 75.25]
+    assert [row["balance"] for row in rows] == [749.50, 649.50, 724.75]
+    assert [row["description"] for row in rows] == ["Supplier payment", "REF2", "Interest income"]
+    assert {row["currency"] for row in rows} == {"CHF"}
+
+
+def test_mt940_details_continuation_starting_with_a_hyphen(tmp_path):
+    path = tmp_path / "statement.sta"
+    path.write_text(
+        ":20:STMT\n:25:CH9300762011623852957\n:28C:00001/001\n"
+        ":60F:C241130CHF1000,00\n"
+        ":61:2412021202D250,50NTRFNONREF\n:86:Supplier payment\n- invoice 4711\n"
+        ":61:2412031203C100,00NTRFREF2\n:86:Customer payment\n"
+        ":62F:C241231CHF849,50\n-}\n",
+        encoding="latin-1",
+    )
+
+    rows = list(parse_mt940(path))
+
+    assert [row["description"] for row in rows] == ["Supplier payment - invoice 4711", "Customer payment"]
+    assert [row["balance"] for row in rows] == [749.50, 849.50]
@@ -0,0 +1,19 @@
+import numpy as np
+import openpyxl
+
+import xlsx_stream_writer as xlsx
+
+
+def test_cells_with_control_characters_and_numpy_values_stay_readable(tmp_path):
+    path = tmp_path / "cells.xlsx"
+    rows = [
+        ("Payment\x0bref\x1f42", "_x0041_ literal", " padded ", np.True_, np.float64(1.5), np.nan),
+        ("plain", None, "", np.False_, np.int64(7), 2.25),
+    ]
+
+    xlsx.write_workbook(path, [{"name": "Cells", "column_styles": [xlsx.STYLE_TEXT] * 6, "rows": rows}])
+
+    values = list(openpyxl.load_workbook(path)["Cells"].values)
+    # Excel decodes _xHHHH_ escapes; openpyxl returns them as written
+    assert values[0] == ("Payment_x000B_ref_x001F_42", "_x005F_x0041_ literal", " padded ", True, 1.5, None)
+    assert values[1] == ("plain", None, None, False, 7, 2.25)
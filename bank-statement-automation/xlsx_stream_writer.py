@@ -0,0 +1,245 @@
+"""
+Minimal streaming .xlsx writer for large ledger exports.
+Rows are formatted straight into SpreadsheetML and written into the zip entry for each sheet,
+with a fixed styles.xml covering the header, border, centre, currency and bold styles of the
+journal workbook. No per-cell objects are created, so memory does not depend on the row count.
+"""
+
+from xml.sax.saxutils import escape
+import math
+import numbers
+import re
+import shutil
+import zipfile
+
+import numpy as np
+from openpyxl.utils import get_column_letter
+
+# Cell style ids (indices into cellXfs in STYLES_XML)
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1
+STYLE_CENTER = 2
+STYLE_TEXT = 3
+STYLE_AMOUNT = 4
+STYLE_BOLD = 5
+STYLE_BOLD_AMOUNT = 6
+
+# Rows buffered before each write into the zip entry
+FLUSH_ROWS = 4096
+
+# Rows per worksheet in Excel 2007 and later
+EXCEL_MAX_ROWS = 1_048_576
+
+# Characters XML 1.0 does not allow, written as Excel's _xHHHH_ escapes instead; a literal
+# "_xHHHH_" in the text has its underscore escaped so Excel does not decode it
+_XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]|_(?=x[0-9A-Fa-f]{4}_)")
+
+def _encode_illegal(match):
+    """Excel's _xHHHH_ escape for one character."""
+
+    return f"_x{ord(match.group()):04X}_"
+
+STYLES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="1"><numFmt numFmtId="164" formatCode="#,##0.00"/></numFmts>
+<fonts count="3">
+<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>
+<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/><family val="2"/></font>
+<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>
+</fonts>
+<fills count="3">
+<fill><patternFill patternType="none"/></fill>
+<fill><patternFill patternType="gray125"/></fill>
+<fill><patternFill patternType="solid"><fgColor rgb="FF2C3E50"/><bgColor rgb="FF2C3E50"/></patternFill></fill>
+</fills>
+<borders count="2">
+<border><left/><right/><top/><bottom/><diagonal/></border>
+<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>
+</borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="7">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="1" fillId="2" borderId="1" xfId="0" applyFont="1" applyFill="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="1" xfId="0" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="1" xfId="0" applyBorder="1"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="1" xfId="0" applyNumberFormat="1" applyBorder="1" applyAlignment="1"><alignment horizontal="right" vertical="center"/></xf>
+<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+<xf numFmtId="164" fontId="2" fillId="0" borderId="0" xfId="0" applyNumberFormat="1" applyFont="1" applyAlignment="1"><alignment horizontal="right" vertical="center"/></xf>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>
+"""
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+{sheets}
+</Types>
+"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>
+"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<bookViews><workbookView activeTab="0"/></bookViews>
+<sheets>{sheets}</sheets>
+</workbook>
+"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{sheets}
+<Relationship Id="rId{styles_id}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>
+"""
+
+def _cell_formatters(column_styles):
+    """One function per column that renders a value as a ``<c>`` element for a given row number."""
+
+    formatters = []
+
+    for col, style in enumerate(column_styles, 1):
+        letter = get_column_letter(col)
+        style_attr = f' s="{style}"' if style else ""
+
+        def fmt(value, row, letter=letter, style_attr=style_attr):
+            empty = f'<c r="{letter}{row}"{style_attr}/>' if style_attr else ""
+            if value is None or value == "":
+                return empty
+            if isinstance(value, str):
+                if "&" in value or "<" in value or ">" in value:
+                    value = escape(value)
+                if _XML_ILLEGAL.search(value):
+                    value = _XML_ILLEGAL.sub(_encode_illegal, value)
+                # Excel trims leading and trailing spaces unless told to keep them
+                space = ' xml:space="preserve"' if value[0].isspace() or value[-1].isspace() else ""
+                return f'<c r="{letter}{row}"{style_attr} t="inlineStr"><is><t{space}>{value}</t></is></c>'
+            if isinstance(value, (bool, np.bool_)):
+                return f'<c r="{letter}{row}"{style_attr} t="b"><v>{int(value)}</v></c>'
+            if isinstance(value, numbers.Integral):
+                return f'<c r="{letter}{row}"{style_attr}><v>{int(value)}</v></c>'
+
+            # float() also turns NumPy scalars into plain numbers; NaN and inf have no cell value
+            value = float(value)
+            if not math.isfinite(value):
+                return empty
+            return f'<c r="{letter}{row}"{style_attr}><v>{value!r}</v></c>'
+
+        formatters.append(fmt)
+
+    return formatters
+
+def _write_sheet(entry, sheet):
+    """Stream one sheet's XML into an open zip entry or file; returns the number of rows written."""
+
+    widths = "".join(
+        f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+        for i, width in enumerate(sheet.get("column_widths", []), 1)
+    )
+    pane = ('<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+            '<selection pane="bottomLeft" activeCell="A2" sqref="A2"/>') if sheet.get("header") else ""
+
+    entry.write((
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<sheetViews><sheetView workbookViewId="0">{pane}</sheetView></sheetViews>'
+        '<sheetFormatPr defaultRowHeight="15"/>'
+        + (f"<cols>{widths}</cols>" if widths else "")
+        + "<sheetData>"
+    ).encode("utf-8"))
+
+    buffer = []
+    row = 0
+
+    def write_row(formatters, values):
+        nonlocal row
+        row += 1
+        if row > EXCEL_MAX_ROWS:
+            raise ValueError(f"Sheet {sheet['name']!r} exceeds Excel's {EXCEL_MAX_ROWS:,} row limit")
+        buffer.append(f'<row r="{row}">' + "".join(fmt(value, row) for fmt, value in zip(formatters, values)) + "</row>")
+        if len(buffer) >= FLUSH_ROWS:
+            entry.write("".join(buffer).encode("utf-8"))
+            buffer.clear()
+
+    if sheet.get("header"):
+        write_row(_cell_formatters([STYLE_HEADER] * len(sheet["header"])), sheet["header"])
+
+    body = _cell_formatters(sheet["column_styles"])
+    for values in sheet["rows"]:
+        write_row(body, values)
+
+    # Footer rows are produced after the body, so they can carry totals accumulated from it
+    footer = sheet.get("footer")
+    for values, styles in (footer() if callable(footer) else footer or []):
+        if values:
+            write_row(_cell_formatters(styles), values)
+        else:
+            row += 1
+
+    buffer.append("</sheetData></worksheet>")
+    entry.write("".join(buffer).encode("utf-8"))
+
+    return row
+
+def write_sheet_part(path, sheet):
+    """Render one sheet's XML to a standalone file for ``write_workbook()`` to pick up later.
+
+    Lets worker processes render sheets in parallel; returns the number of rows written.
+    """
+
+    with open(path, "wb") as entry:
+        return _write_sheet(entry, sheet)
+
+def write_workbook(output_file, sheets):
+    """Write an .xlsx workbook, streaming each sheet's rows into its zip entry.
+
+    ``sheets`` is a list of dicts with ``name``, ``rows`` (an iterable of value
+    sequences), ``column_styles`` (one STYLE_* id per column) and optionally
+    ``header`` (frozen first row), ``column_widths`` and ``footer`` (a list of
+    ``(values, styles)`` rows, or a callable returning one, written after the body).
+    A sheet given as ``{"name": ..., "part": path}`` is copied from a file written
+    by ``write_sheet_part()``. ``output_file`` is a path or writable binary stream.
+    Returns rows per sheet (``None`` for copied parts).
+    """
+
+    rows_written = []
+
+    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
+        for index, sheet in enumerate(sheets, 1):
+            with zf.open(f"xl/worksheets/sheet{index}.xml", "w", force_zip64=True) as entry:
+                if "part" in sheet:
+                    with open(sheet["part"], "rb") as part:
+                        shutil.copyfileobj(part, entry, 1 << 20)
+                    rows_written.append(None)
+                else:
+                    rows_written.append(_write_sheet(entry, sheet))
+
+        sheet_ids = range(1, len(sheets) + 1)
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES.format(sheets="\n".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in sheet_ids
+        )))
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            f'<sheet name="{escape(sheet["name"], {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, sheet in zip(sheet_ids, sheets)
+        )))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(
+            sheets="\n".join(
+                f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                f'relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                for i in sheet_ids
+            ),
+            styles_id=len(sheets) + 1,
+        ))
+        zf.writestr("xl/styles.xml", STYLES_XML)
+
+    return rows_written
@@ -0,0 +1,189 @@
+"""
+Explain reconciliation differences that offset each other.
+A balance moved between sibling accounts in one system shows up as two differences that
+cancel; a move split across several accounts as a small group that cancels. Pairs are found
+with a hash lookup on the negated difference in cents, groups with a bounded meet-in-the-middle
+subset search within a category, and each discrepancy is annotated with its likely counterparts.
+"""
+
+from itertools import combinations
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+
+LABEL_COLUMN = "Account Code"
+GROUP_COLUMNS = ["Category"]
+
+# Largest offsetting group searched for, and open differences searched together per category
+MAX_GROUP_SIZE = 4
+MAX_GROUP_CANDIDATES = 400
+
+OFFSETTING_PAIR = "Offsetting pair"
+OFFSETTING_GROUP = "Offsetting group"
+SAME_DIFFERENCE = "Same difference"
+UNEXPLAINED = "Unexplained"
+
+
+def _match_pairs(rows, cents, groups, sign):
+    """Pair rows whose differences satisfy ``a == sign * b`` within the same group.
+
+    Open rows wait in a hash table keyed on (group, difference); each row probes it
+    for ``(group, sign * difference)`` and takes the earliest waiting row. Returns the
+    pairs and the rows left unpaired, both in row order.
+    """
+
+    waiting = {}
+    pairs = []
+
+    for row in rows:
+        candidates = waiting.get((groups[row], sign * cents[row]))
+        if candidates:
+            pairs.append((candidates.pop(0), row))
+        else:
+            waiting.setdefault((groups[row], cents[row]), []).append(row)
+
+    paired = {row for pair in pairs for row in pair}
+    return pairs, [row for row in rows if row not in paired]
+
+
+def _zero_sum_groups(cents, max_size=MAX_GROUP_SIZE):
+    """Disjoint subsets of 3 to ``max_size`` values summing to zero, smallest first.
+
+    Meet in the middle: sums of every subset of up to ``max_size // 2`` values go into
+    a hash table, then each subset forming the first half of a candidate group looks up
+    the negated sum of its remaining values. Taking the halves as the lower and upper
+    positions of the group makes them disjoint and finds each group once; values taken
+    by a group are skipped for the rest of the search.
+    """
+
+    n = len(cents)
+    half_sums = {}
+    for size in range(1, max_size // 2 + 1):
+        for combo in combinations(range(n), size):
+            half_sums.setdefault(sum(cents[i] for i in combo), []).append(combo)
+
+    used = set()
+    found = []
+    for total in range(3, max_size + 1):
+        first, second = total - total // 2, total // 2
+        for combo in combinations(range(n), first):
+            if used.intersection(combo):
+                continue
+            for rest in half_sums.get(-sum(cents[i] for i in combo), ()):
+                if len(rest) == second and rest[0] > combo[-1] and not used.intersection(rest):
+                    found.append(combo + rest)
+                    used.update(combo + rest)
+                    break
+
+    return found
+
+
+def _match_groups(rows, cents, groups, max_size, max_candidates):
+    """Take zero-sum groups out of the open rows of each group, ``max_candidates`` rows at a time."""
+
+    by_group = {}
+    for row in rows:
+        by_group.setdefault(groups[row], []).append(row)
+
+    matched = []
+    for members in by_group.values():
+        for start in range(0, len(members), max_candidates):
+            window = members[start:start + max_candidates]
+            if len(window) >= 3:
+                matched.extend(tuple(window[i] for i in subset)
+                               for subset in _zero_sum_groups([cents[row] for row in window], max_size))
+
+    grouped = {row for group in matched for row in group}
+    return matched, [row for row in rows if row not in grouped]
+
+
+def explain_differences(df, difference, label=LABEL_COLUMN, group=GROUP_COLUMNS, max_group_size=MAX_GROUP_SIZE,
+                        max_candidates=MAX_GROUP_CANDIDATES):
+    """Annotate each non-zero ``difference`` with the accounts it likely offsets.
+
+    Differences are matched in stages, each taking its matches out of the open set:
+
+    1. pairs cancelling within a ``group`` (e.g. sibling accounts in one category),
+    2. pairs cancelling across groups,
+    3. groups of 3 to ``max_group_size`` differences cancelling within a ``group``,
+       searched ``max_candidates`` open differences at a time,
+    4. pairs with the same difference (typically a subtotal repeating a child's).
+
+    Returns a copy of ``df`` with ``Counterpart`` (the ``label`` of the matched rows)
+    and ``Explanation`` (the kind of match, "Unexplained" if none) columns.
+    """
+
+    cents = np.rint(df[difference].fillna(0).to_numpy(dtype=np.float64) * 100).astype(np.int64).tolist()
+    within = pd.MultiIndex.from_frame(df[group]).factorize()[0].tolist() if group else [0] * len(df)
+    across = [0] * len(df)
+    rows = [row for row, value in enumerate(cents) if value != 0]
+
+    within_pairs, rows = _match_pairs(rows, cents, within, -1)
+    across_pairs, rows = _match_pairs(rows, cents, across, -1)
+    offsetting_groups, rows = _match_groups(rows, cents, within, max_group_size, max_candidates)
+    same_pairs, rows = _match_pairs(rows, cents, across, 1)
+
+    labels = df[label].astype(str).tolist()
+    counterpart = np.full(len(df), "", dtype=object)
+    explanation = np.full(len(df), "", dtype=object)
+    explanation[rows] = UNEXPLAINED
+
+    for matches, kind in ((within_pairs + across_pairs, OFFSETTING_PAIR), (offsetting_groups, OFFSETTING_GROUP),
+                          (same_pairs, SAME_DIFFERENCE)):
+        for match in matches:
+            for row in match:
+                counterpart[row] = ", ".join(labels[other] for other in match if other != row)
+                explanation[row] = kind
+
+    result = df.copy()
+    result["Counterpart"] = counterpart
+    result["Explanation"] = explanation
+    return result
+
+
+def synthetic_differences(num_accounts, open_share=0.05, categories=20, seed=None):
+    """Mock reconciliation with open differences, most of them planted offsetting pairs and groups."""
+
+    rng = np.random.default_rng(seed)
+    difference = np.zeros(num_accounts)
+    open_rows = rng.permutation(num_accounts)[:int(num_accounts * open_share)]
+    category = rng.integers(categories, size=num_accounts)
+
+    # Sizes 2 to 4 in turn; the odd rows left at the end keep a random unexplained difference
+    position = 0
+    for size in [2, 3, 4] * len(open_rows):
+        members = open_rows[position:position + size]
+        if len(members) < size:
+            break
+        amounts = np.round(rng.uniform(100, 100_000, size=size - 1), 2)
+        difference[members] = np.r_[amounts, -amounts.sum()]
+        category[members] = category[members[0]]
+        position += size
+    difference[open_rows[position:]] = np.round(rng.uniform(100, 100_000, size=len(open_rows) - position), 2)
+
+    return pd.DataFrame({
+        "Account Code": np.arange(100000, 100000 + num_accounts).astype(str),
+        "Category": [f"Category {c:02d}" for c in category],
+        "Difference": difference,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=100_000, help="accounts in the mock reconciliation")
+    parser.add_argument("--open-share", type=float, default=0.05, help="share of accounts with a difference")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    df = synthetic_differences(args.accounts, args.open_share, seed=args.seed)
+
+    start_time = time.perf_counter()
+    result = explain_differences(df, "Difference")
+    elapsed = time.perf_counter() - start_time
+
+    open_differences = int((df["Difference"] != 0).sum())
+    print(f"Accounts: {len(df):,}  Open differences: {open_differences:,}  Explained in {elapsed:.2f}s")
+    print(result.loc[result["Explanation"] != "", "Explanation"].value_counts().to_string())
@@ -4,12 +4,47 @@ Creates an account balance reconciliation report with balances from multiple sys
 and conditional formatting to highlight discrepancies.
 """
 
+import argparse
+import os
+
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.formatting.rule import FormulaRule
 
+from difference_explainer import UNEXPLAINED, explain_differences
+from hierarchy_rollup import ROLLUP_OK, account_hierarchy, load_parent_mapping, validate_rollups
+from reconciliation_engine import (
+    BUCKET_LARGE,
+    BUCKET_MATCH,
+    BUCKET_SMALL,
+    SMALL_DIFFERENCE_LIMIT,
+    pair_column,
+    reconcile_sources,
+)
+
+# The primary planning systems; their differences are the ones explained in the report
+EXPLAINED_PAIR = pair_column("IBM Planning Analytics", "OneStream")
+
+# Column widths for the text columns; every other column holds an amount
+TEXT_COLUMN_WIDTHS = {
+    "Account Code": 14,
+    "Account Name": 35,
+    "Category": 20,
+    "Outlier Source": 24,
+    "Status": 32,
+    "Bucket": 10,
+    "Counterpart": 16,
+    "Explanation": 18,
+}
+AMOUNT_COLUMN_WIDTH = 18
+
+# Parents that differ from the ones derived from the codes: the allowance for doubtful accounts
+# (1250) is a top-level contra account, not a child of Accounts Receivable (1200)
+MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "account_hierarchy_mapping.csv")
+
 
 def create_reconciliation_data():
     """Create sample account reconciliation data with intentional discrepancies."""
@@ -105,22 +140,38 @@ def create_reconciliation_data():
         (-250_000.00, -250_000.00),       # Match
     ]
 
-    # Build the data with system balances and differences
-    data = []
-    for i, account in enumerate(accounts):
-        system_y, system_z = balances[i]
-        diff = round(system_y - system_z, 2)
+    # SAP and the data warehouse mostly carry the IBM balances; these are where they differ
+    sap_differences = {"1320": 490_000.00, "1540": 655_000.00}
+    warehouse_differences = {"1320": 490_000.00, "3300": 8_750_000.00}
+    warehouse_missing = {"1110"}  # Petty cash is not loaded into the warehouse
+
+    # Each system's extract is keyed on Account Code; the engine aligns them by key, not position
+    chart = pd.DataFrame(accounts)
+    ibm_balances = [system_y for system_y, _ in balances]
+    warehouse_extract = chart.assign(Balance=[warehouse_differences.get(code, balance)
+                                              for code, balance in zip(chart["Account Code"], ibm_balances)])
+
+    extracts = {
+        "IBM Planning Analytics": chart.assign(Balance=ibm_balances),
+        "OneStream": chart.assign(Balance=[system_z for _, system_z in balances]),
+        "SAP S/4HANA": chart.assign(Balance=[sap_differences.get(code, balance)
+                                             for code, balance in zip(chart["Account Code"], ibm_balances)]),
+        "Data Warehouse": warehouse_extract[~warehouse_extract["Account Code"].isin(warehouse_missing)],
+    }
+
+    return reconcile_sources(extracts)
 
-        data.append({
-            "Account Code": account["Account Code"],
-            "Account Name": account["Account Name"],
-            "Category": account["Category"],
-            "IBM Planning Analytics": system_y,
-            "OneStream": system_z,
-            "Difference": diff,
-        })
 
-    return pd.DataFrame(data)
+def difference_columns(df):
+    """Pairwise difference columns of a reconciliation, followed by the largest difference."""
+
+    return [column for column in df.columns if " vs " in column] + ["Max Difference"]
+
+
+def source_columns(df):
+    """Balance columns of the reconciled systems, in source order."""
+
+    return list(df.columns[df.columns.get_loc("Category") + 1:df.columns.get_loc("Consensus")])
 
 
 def apply_formatting(ws):
@@ -152,13 +203,17 @@ def apply_formatting(ws):
         cell.alignment = header_alignment
         cell.border = thin_border
 
-    # Set column widths
-    ws.column_dimensions['A'].width = 14
-    ws.column_dimensions['B'].width = 35
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 22
-    ws.column_dimensions['E'].width = 18
-    ws.column_dimensions['F'].width = 15
+    # Set column widths; amount columns are every column that is not a text column
+    headers = [cell.value for cell in ws[1]]
+    amount_columns = set()
+    difference_letters = []
+    for column, header in enumerate(headers, start=1):
+        letter = get_column_letter(column)
+        ws.column_dimensions[letter].width = TEXT_COLUMN_WIDTHS.get(header, AMOUNT_COLUMN_WIDTH)
+        if header not in TEXT_COLUMN_WIDTHS:
+            amount_columns.add(column)
+        if " vs " in header or header == "Max Difference":
+            difference_letters.append(letter)
 
     # Format data rows
     for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
@@ -166,38 +221,33 @@ def apply_formatting(ws):
             cell.border = thin_border
             cell.alignment = Alignment(vertical="center")
 
-            # Number formatting for columns D, E, F (system balances and difference)
-            if cell.column >= 4:
+            # Number formatting for the system balances, consensus and differences
+            if cell.column in amount_columns:
                 cell.number_format = number_format
                 cell.alignment = Alignment(horizontal="right", vertical="center")
 
-    # Add conditional formatting for the Difference column (column F)
-    # Green for exact match (0)
-    ws.conditional_formatting.add(
-        'F2:F100',
-        FormulaRule(
-            formula=['$F2=0'],
-            fill=green_fill
-        )
-    )
-
-    # Yellow for small differences (absolute value <= 10000)
-    ws.conditional_formatting.add(
-        'F2:F100',
-        FormulaRule(
-            formula=['AND($F2<>0, ABS($F2)<=10000)'],
-            fill=yellow_fill
+    # Add conditional formatting to every difference column
+    last_row = max(ws.max_row, 100)
+    for letter in difference_letters:
+        cells = f'{letter}2:{letter}{last_row}'
+
+        # Green for exact match (0)
+        ws.conditional_formatting.add(cells, FormulaRule(formula=[f'${letter}2=0'], fill=green_fill))
+
+        # Yellow for small differences (absolute value <= 10000)
+        ws.conditional_formatting.add(
+            cells,
+            FormulaRule(
+                formula=[f'AND(${letter}2<>0, ABS(${letter}2)<={SMALL_DIFFERENCE_LIMIT})'],
+                fill=yellow_fill
+            )
         )
-    )
 
-    # Red for big differences (absolute value > 10000)
-    ws.conditional_formatting.add(
-        'F2:F100',
-        FormulaRule(
-            formula=['ABS($F2)>10000'],
-            fill=red_fill
+        # Red for big differences (absolute value > 10000)
+        ws.conditional_formatting.add(
+            cells,
+            FormulaRule(formula=[f'ABS(${letter}2)>{SMALL_DIFFERENCE_LIMIT}'], fill=red_fill)
         )
-    )
 
     # Freeze the header row
     ws.freeze_panes = 'A2'
@@ -206,38 +256,54 @@ def apply_formatting(ws):
     ws.row_dimensions[1].height = 30
 
 
-def create_summary_sheet(wb, df):
-    """Create a summary sheet with reconciliation statistics."""
+def create_summary_sheet(wb, df, rollups):
+    """Create a summary sheet with reconciliation statistics and the ``validate_rollups()`` result."""
 
     ws = wb.create_sheet("Summary")
 
     # Calculate statistics
     total_accounts = len(df)
-    matched = len(df[df['Difference'] == 0])
-    small_diff = len(df[(df['Difference'] != 0) & (abs(df['Difference']) <= 10000)])
-    big_diff = len(df[abs(df['Difference']) > 10000])
-
-    total_diff = df['Difference'].sum()
+    buckets = df['Bucket'].value_counts()
+    matched = int(buckets.get(BUCKET_MATCH, 0))
+    small_diff = int(buckets.get(BUCKET_SMALL, 0))
+    big_diff = int(buckets.get(BUCKET_LARGE, 0))
+    missing_in_a_system = int((df['Status'] != "All sources").sum())
+    outliers_found = int(((df['Outlier Source'] != "") & (df['Outlier Source'] != "No majority")).sum())
+    no_majority = int((df['Outlier Source'] == "No majority").sum())
+    broken_rollups = int((rollups['Rollup Status'] != ROLLUP_OK).sum())
+    explained = int(((df['Explanation'] != "") & (df['Explanation'] != UNEXPLAINED)).sum())
+    unexplained = int((df['Explanation'] == UNEXPLAINED).sum())
 
     # Build summary data
     summary_data = [
         ["RECONCILIATION SUMMARY", ""],
         ["", ""],
         ["Report Date:", "January 2020"],
-        ["Systems Compared:", "IBM Planning Analytics vs OneStream"],
+        ["Systems Compared:", ", ".join(source_columns(df))],
         ["", ""],
         ["STATISTICS", ""],
         ["Total Accounts Reviewed:", total_accounts],
         ["Accounts Matched (Green):", matched],
         ["Small Discrepancies (Yellow):", small_diff],
         ["Large Discrepancies (Red):", big_diff],
+        ["Accounts Missing in a System:", missing_in_a_system],
+        ["Outlier System Identified:", outliers_found],
+        ["No Majority Balance:", no_majority],
+        [f"Explained Differences ({EXPLAINED_PAIR}):", explained],
+        [f"Unexplained Differences ({EXPLAINED_PAIR}):", unexplained],
+        ["Parent Balances Not Matching Children:", broken_rollups],
         ["", ""],
-        ["Total Difference:", total_diff],
+        ["TOTAL DIFFERENCES", ""],
+    ]
+    total_rows = range(len(summary_data) + 1, len(summary_data) + len(difference_columns(df)))
+    summary_data += [[f"{column}:", float(df[column].sum())] for column in difference_columns(df)[:-1]]
+    summary_data += [
         ["", ""],
         ["DISCREPANCY THRESHOLDS", ""],
         ["Match (Green):", "Difference = $0"],
-        ["Small (Yellow):", "Difference <= $10,000"],
-        ["Large (Red):", "Difference > $10,000"],
+        ["Small (Yellow):", f"Difference <= ${SMALL_DIFFERENCE_LIMIT:,}"],
+        ["Large (Red):", f"Difference > ${SMALL_DIFFERENCE_LIMIT:,}"],
+        ["Account Bucket:", "Largest difference between any two systems"],
     ]
 
     for row in summary_data:
@@ -248,36 +314,84 @@ def create_summary_sheet(wb, df):
     section_font = Font(bold=True, size=11)
 
     ws['A1'].font = header_font
-    ws['A6'].font = section_font
-    ws['A14'].font = section_font
+    for row in ws.iter_rows(min_col=1, max_col=1):
+        if row[0].value in ("STATISTICS", "TOTAL DIFFERENCES", "DISCREPANCY THRESHOLDS"):
+            row[0].font = section_font
+
+    ws.column_dimensions['A'].width = 62
+    ws.column_dimensions['B'].width = 45
+
+    # Format the pairwise difference totals with number format
+    for row in total_rows:
+        ws[f'B{row}'].number_format = '#,##0.00'
+
+
+def create_hierarchy_sheet(wb, rollups):
+    """Create a sheet checking each parent account against the sum of its children per system."""
 
-    ws.column_dimensions['A'].width = 30
-    ws.column_dimensions['B'].width = 35
+    ws = wb.create_sheet("Hierarchy Check")
+    for row in dataframe_to_rows(rollups.astype(object).where(rollups.notna(), None), index=False, header=True):
+        ws.append(row)
+
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_fill = PatternFill(start_color="2F5496", end_color="2F5496", fill_type="solid")
+    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    for letter, width in zip("ABCDEFGH", [14, 35, 24, 18, 18, 18, 18, 26]):
+        ws.column_dimensions[letter].width = width
+
+    # Amounts in D to G; rows whose parent balance does not match its children are red
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for cell in row[3:7]:
+            cell.number_format = '#,##0.00'
+        if row[7].value != ROLLUP_OK:
+            for cell in row:
+                cell.fill = red_fill
+
+    ws.freeze_panes = 'A2'
+    ws.row_dimensions[1].height = 30
 
-    # Format the total difference with number format
-    ws['B12'].number_format = '#,##0.00'
 
+def check_rollups(df, mapping_file=MAPPING_FILE):
+    """Check parent balances against their children in every system; the tree is built once.
 
-def main():
+    Parents listed in ``mapping_file`` (see ``hierarchy_rollup.load_parent_mapping()``)
+    override the ones derived from the account codes; None derives them all.
+    """
+
+    parents = load_parent_mapping(mapping_file) if mapping_file else None
+    return validate_rollups(df, source_columns(df), account_hierarchy(df['Account Code'], parents))
+
+
+def main(mapping_file=MAPPING_FILE):
     """Generate the reconciliation Excel file."""
 
-    # Create data
-    df = create_reconciliation_data()
+    # Create data, then explain differences that offset each other
+    df = explain_differences(create_reconciliation_data(), EXPLAINED_PAIR)
 
     # Create workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Account Reconciliation"
 
-    # Write data to worksheet
-    for row in dataframe_to_rows(df, index=False, header=True):
+    # Write data to worksheet; missing balances and consensus values become empty cells
+    for row in dataframe_to_rows(df.astype(object).where(df.notna(), None), index=False, header=True):
         ws.append(row)
 
     # Apply formatting
     apply_formatting(ws)
 
-    # Create summary sheet
-    create_summary_sheet(wb, df)
+    # Check parent balances against their children
+    rollups = check_rollups(df, mapping_file)
+
+    # Create summary and hierarchy check sheets
+    create_summary_sheet(wb, df, rollups)
+    create_hierarchy_sheet(wb, rollups)
 
     # Save the file
     output_path = "/Users/przemyslawkepka/Desktop/GIT_NEW/pk-data-sol-website-mockups/financial-data-reconciliation/account_reconciliation_jan2020.xlsx"
@@ -287,10 +401,24 @@ def main():
     # Print summary
     print("\nReconciliation Summary:")
     print(f"Total accounts: {len(df)}")
-    print(f"Matched: {len(df[df['Difference'] == 0])}")
-    print(f"Small discrepancies: {len(df[(df['Difference'] != 0) & (abs(df['Difference']) <= 10000)])}")
-    print(f"Large discrepancies: {len(df[abs(df['Difference']) > 10000])}")
+    print(f"Matched: {(df['Bucket'] == BUCKET_MATCH).sum()}")
+    print(f"Small discrepancies: {(df['Bucket'] == BUCKET_SMALL).sum()}")
+    print(f"Large discrepancies: {(df['Bucket'] == BUCKET_LARGE).sum()}")
+    print(f"Missing in a system: {(df['Status'] != 'All sources').sum()}")
+    print("Outlier systems:")
+    for _, row in df[df['Outlier Source'] != ""].iterrows():
+        print(f"  {row['Account Code']} {row['Account Name']}: {row['Outlier Source']}")
+    print(f"Parent balances not matching children: {(rollups['Rollup Status'] != ROLLUP_OK).sum()}")
+    print(f"Explained differences ({EXPLAINED_PAIR}):")
+    for _, row in df[df['Counterpart'] != ""].iterrows():
+        print(f"  {row['Account Code']} {row['Account Name']}: {row['Explanation']} with {row['Counterpart']}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mapping", metavar="FILE", default=MAPPING_FILE,
+                        help="CSV of child -> parent account codes (Account Code, Parent Code) for the rollup check "
+                             "(default: account_hierarchy_mapping.csv)")
+    args = parser.parse_args()
+
+    main(args.mapping)
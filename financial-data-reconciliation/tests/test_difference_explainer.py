@@ -0,0 +1,63 @@
+import numpy as np
+
+from difference_explainer import (
+    OFFSETTING_PAIR,
+    SAME_DIFFERENCE,
+    UNEXPLAINED,
+    _match_pairs,
+    _zero_sum_groups,
+    explain_differences,
+)
+from generate_reconciliation_excel import EXPLAINED_PAIR, create_reconciliation_data
+
+
+def sample_differences():
+    df = create_reconciliation_data()
+    cents = np.rint(df[EXPLAINED_PAIR].fillna(0).to_numpy() * 100).astype(np.int64).tolist()
+    categories = df["Category"].tolist()
+    return df, cents, categories
+
+
+def test_match_pairs_on_sample_data():
+    df, cents, categories = sample_differences()
+    codes = df["Account Code"].tolist()
+    rows = [row for row, value in enumerate(cents) if value != 0]
+
+    pairs, rest = _match_pairs(rows, cents, categories, -1)
+
+    assert [(codes[a], codes[b]) for a, b in pairs] == [("1210", "1220"), ("1540", "1550"), ("2210", "2220")]
+    assert all(cents[a] == -cents[b] and categories[a] == categories[b] for a, b in pairs)
+    assert sorted(rest + [row for pair in pairs for row in pair]) == rows
+
+    same, _ = _match_pairs(rest, cents, [0] * len(cents), 1)
+    assert [(codes[a], codes[b]) for a, b in same] == [("1300", "1320"), ("2100", "2120")]
+
+
+def test_zero_sum_groups_are_disjoint_and_cancel():
+    _, cents, _ = sample_differences()
+    open_cents = [value for value in cents if value != 0]
+    # Plant a three-way and a four-way split among the sample differences
+    values = open_cents + [70_000, -25_000, -45_000, 1_000, 2_000, 3_000, -6_000]
+
+    groups = _zero_sum_groups(values)
+
+    assert all(3 <= len(group) <= 4 and sum(values[i] for i in group) == 0 for group in groups)
+    members = [i for group in groups for i in group]
+    assert len(members) == len(set(members))
+    assert {tuple(values[i] for i in group) for group in groups} >= {(70_000, -25_000, -45_000)}
+    assert any(sorted(values[i] for i in group) == [-6_000, 1_000, 2_000, 3_000] for group in groups)
+
+
+def test_zero_sum_groups_ignore_pairs():
+    assert _zero_sum_groups([500, -500, 1_200, 700]) == []
+
+
+def test_explain_differences_on_sample_data():
+    df = explain_differences(create_reconciliation_data(), EXPLAINED_PAIR)
+    explained = df[df["Explanation"] != ""].set_index("Account Code")
+
+    assert explained.loc["1210", "Counterpart"] == "1220"
+    assert explained.loc["1220", "Explanation"] == OFFSETTING_PAIR
+    assert explained.loc["2120", "Explanation"] == SAME_DIFFERENCE
+    assert (explained["Explanation"] != UNEXPLAINED).all()
+    assert set(explained.index) == set(df.loc[df[EXPLAINED_PAIR].fillna(0) != 0, "Account Code"])
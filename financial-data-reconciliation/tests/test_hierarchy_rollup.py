@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from generate_reconciliation_excel import check_rollups, create_reconciliation_data, source_columns
+from hierarchy_rollup import (
+    KEY_COLUMN,
+    MAPPING_COLUMNS,
+    ROLLUP_OK,
+    account_hierarchy,
+    load_parent_mapping,
+    synthetic_chart,
+    validate_rollups,
+)
+
+
+def test_mapping_file_overrides_derived_parents(tmp_path):
+    codes = create_reconciliation_data()[KEY_COLUMN].tolist()
+    mapping_file = tmp_path / "parents.csv"
+    pd.DataFrame({MAPPING_COLUMNS[0]: ["1600", "1250"], MAPPING_COLUMNS[1]: ["1500", ""]}).to_csv(
+        mapping_file, index=False)
+
+    parents = load_parent_mapping(mapping_file)
+    hierarchy = account_hierarchy(codes, parents)
+    derived = account_hierarchy(codes)
+
+    assert parents == {"1600": "1500", "1250": None}
+    parent_codes = {code: codes[p] if p >= 0 else None for code, p in zip(codes, hierarchy["parent"].tolist())}
+    assert parent_codes["1600"] == "1500"
+    assert parent_codes["1250"] is None
+    assert parent_codes["1210"] == "1200"
+
+    changed = [code for code, new, old in zip(codes, hierarchy["parent"], derived["parent"]) if new != old]
+    assert changed == ["1250", "1600"]
+
+
+def test_periods_checked_as_one_matrix_match_per_period_checks():
+    codes, balances = synthetic_chart(levels=2, fanout=4, periods=5, broken_share=0.3, seed=7)
+    hierarchy = account_hierarchy(codes)
+    periods = [f"2020-{period + 1:02d}" for period in range(balances.shape[1])]
+    df = pd.concat([pd.DataFrame({KEY_COLUMN: codes}), pd.DataFrame(balances, columns=periods)], axis=1)
+
+    result = validate_rollups(df, periods, hierarchy)
+
+    expected = pd.concat([validate_rollups(df[[KEY_COLUMN, period]], [period], hierarchy) for period in periods],
+                         ignore_index=True)
+    key = ["Account Code", "System"]
+    pd.testing.assert_frame_equal(result.sort_values(key, ignore_index=True),
+                                  expected.sort_values(key, ignore_index=True))
+    assert np.any(result["Rollup Difference"] != 0)
+
+
+def test_sample_reconciliation_has_no_false_accounts_receivable_break():
+    df = create_reconciliation_data()
+
+    rollups = check_rollups(df)
+
+    receivable = rollups[rollups["Account Code"] == "1200"]
+    assert len(receivable) == len(source_columns(df))
+    assert (receivable["Rollup Status"] == ROLLUP_OK).all()
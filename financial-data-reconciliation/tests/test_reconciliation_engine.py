@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from reconciliation_engine import (
+    BUCKET_LARGE,
+    BUCKET_MATCH,
+    BUCKET_SMALL,
+    join_keys,
+    pair_column,
+    reconcile,
+    reconcile_sources,
+)
+
+
+def extract(codes, balances, names=None):
+    frame = pd.DataFrame({"Account Code": codes, "Balance": balances})
+    if names is not None:
+        frame["Account Name"] = names
+    return frame
+
+
+def test_join_keys_matches_keys_across_extracts():
+    first = pd.DataFrame({"Account Code": ["1100", "1200", "1300"], "Entity": ["CH", "CH", "DE"]})
+    second = pd.DataFrame({"Account Code": ["1300", "1100", "1100"], "Entity": ["DE", "DE", "CH"]})
+
+    (first_codes, second_codes), num_keys = join_keys([first, second], ["Account Code", "Entity"])
+
+    assert num_keys == 4
+    assert first_codes.tolist() == [0, 1, 2]
+    assert second_codes.tolist() == [2, 3, 0]
+
+
+def test_join_keys_rejects_missing_keys():
+    first = pd.DataFrame({"Account Code": ["1100", "1200"]})
+    second = pd.DataFrame({"Account Code": ["1200", np.nan, "1100"]})
+
+    with pytest.raises(ValueError, match="Extract 1 has a missing Account Code key in row 1"):
+        join_keys([first, second])
+
+
+def test_reconcile_sources_consensus_outliers_and_missing_keys():
+    codes = ["1100", "1200", "1300", "1400"]
+    extracts = {
+        "IBM": extract(codes, [100.00, 500.00, 300.00, 1.00], ["Cash", "Receivables", "Inventory", "Prepaid"]),
+        "OneStream": extract(codes, [100.00, 500.00, 300.00, 2.00]),
+        "SAP": extract(["1300", "1200", "1100", "1400", "2100"], [300.00, 500.00, 100.00, 3.00, 50.00]),
+        "DW": extract(["1100", "1200", "1400"], [100.00, 25_500.00, 4.00]),
+    }
+
+    result = reconcile_sources(extracts).set_index("Account Code")
+
+    # Rows keep the first extract's order, then keys only later extracts have
+    assert result.index.tolist() == ["1100", "1200", "1300", "1400", "2100"]
+    assert result["Account Name"].tolist()[:4] == ["Cash", "Receivables", "Inventory", "Prepaid"]
+    assert pd.isna(result.loc["2100", "Account Name"])
+
+    # Full agreement
+    assert result.loc["1100", "Consensus"] == 100.00
+    assert result.loc["1100", "Outlier Source"] == ""
+    assert result.loc["1100", "Status"] == "All sources"
+    assert result.loc["1100", "Max Difference"] == 0
+    assert result.loc["1100", "Bucket"] == BUCKET_MATCH
+
+    # One outlier source against a three-source majority
+    assert result.loc["1200", "Consensus"] == 500.00
+    assert result.loc["1200", "Outlier Source"] == "DW"
+    assert result.loc["1200", pair_column("IBM", "DW")] == -25_000.00
+    assert result.loc["1200", "Max Difference"] == 25_000.00
+    assert result.loc["1200", "Bucket"] == BUCKET_LARGE
+
+    # A key missing from one source: empty balance there, counted as zero in the differences
+    assert np.isnan(result.loc["1300", "DW"])
+    assert result.loc["1300", "Status"] == "Missing in DW"
+    assert result.loc["1300", "Consensus"] == 300.00
+    assert result.loc["1300", "Outlier Source"] == ""
+    assert result.loc["1300", pair_column("SAP", "DW")] == 300.00
+    assert result.loc["1300", "Bucket"] == BUCKET_SMALL
+
+    # Every source disagrees
+    assert np.isnan(result.loc["1400", "Consensus"])
+    assert result.loc["1400", "Outlier Source"] == "No majority"
+    assert result.loc["1400", "Max Difference"] == 3.00
+
+    assert result.loc["2100", "Status"] == "Only in SAP"
+    assert result.loc["2100", "Consensus"] == 50.00
+
+
+def test_reconcile_two_sources_status_and_difference():
+    left = extract(["1100", "1200", "1300"], [100.00, 250.00, 75.00], ["Cash", "Receivables", "Inventory"])
+    right = extract(["1200", "1100", "1400"], [200.00, 100.00, 40.00], ["Receivables", "Cash", "Prepaid"])
+
+    result = reconcile(left, right, "Ledger", "Planning")
+
+    assert result.columns.tolist() == ["Account Code", "Account Name", "Ledger", "Planning", "Difference", "Status",
+                                       "Bucket"]
+    assert result["Account Code"].tolist() == ["1100", "1200", "1300", "1400"]
+    assert result["Status"].tolist() == ["Both", "Both", "Only in Ledger", "Only in Planning"]
+    assert result["Difference"].tolist() == [0.00, 50.00, 75.00, -40.00]
+    assert result["Bucket"].tolist() == [BUCKET_MATCH, BUCKET_SMALL, BUCKET_SMALL, BUCKET_SMALL]
+    assert np.isnan(result.loc[2, "Planning"]) and np.isnan(result.loc[3, "Ledger"])